@@ -1,19 +1,15 @@
 from http.server import BaseHTTPRequestHandler
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
 import json
 import os
 import sys
+import threading
 
 # Add the cloud_orchestrator directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'cloud_orchestrator'))
 
-class handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        html = """
+INDEX_HTML = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -128,7 +124,26 @@ class handler(BaseHTTPRequestHandler):
     </div>
 
     <script>
-        async function submitRequest() {
+        function resetButton() {
+            const submitBtn = document.getElementById('submitBtn');
+            submitBtn.disabled = false;
+            submitBtn.textContent = '🤖 Generate Infrastructure Plan';
+        }
+
+        function addLine(text) {
+            const line = document.createElement('div');
+            line.textContent = text;
+            document.getElementById('result').appendChild(line);
+        }
+
+        const PROGRESS = {
+            intent: data => '🧭 Intent parsed: ' + (data.goal || '') + ' [' + (data.hints || []).join(', ') + ']',
+            dag: data => '🔗 DAG built: ' + Object.keys(data).join(', '),
+            tool_call: data => '🛠️ Step ' + data.step + ': ' + data.action,
+            quota: data => '📏 Quota ' + data.status + ': ' + (data.message || ''),
+        };
+
+        function submitRequest() {
             const prompt = document.getElementById('prompt').value;
             const submitBtn = document.getElementById('submitBtn');
             const result = document.getElementById('result');
@@ -142,7 +157,43 @@ class handler(BaseHTTPRequestHandler):
             submitBtn.textContent = '🔄 Processing...';
             result.style.display = 'block';
             result.innerHTML = '<div class="loading"><div class="spinner"></div>Generating your infrastructure plan...</div>';
-            
+
+            if (!window.EventSource) {
+                processRequest(prompt);
+                return;
+            }
+
+            // Progress arrives as Server-Sent Events; fall back to a single POST if streaming is unavailable
+            let received = false;
+            const source = new EventSource('/api/stream?prompt=' + encodeURIComponent(prompt));
+            Object.keys(PROGRESS).forEach(name => source.addEventListener(name, e => {
+                if (!received) {
+                    received = true;
+                    result.innerHTML = '';
+                }
+                addLine(PROGRESS[name](JSON.parse(e.data)));
+            }));
+            source.addEventListener('result', e => {
+                source.close();
+                addLine(JSON.parse(e.data).summary);
+                resetButton();
+            });
+            source.addEventListener('error', e => {
+                source.close();
+                if (e.data) {
+                    addLine('❌ Error: ' + JSON.parse(e.data).error);
+                    resetButton();
+                } else if (!received) {
+                    processRequest(prompt);
+                } else {
+                    addLine('❌ Connection lost');
+                    resetButton();
+                }
+            });
+        }
+
+        async function processRequest(prompt) {
+            const result = document.getElementById('result');
             try {
                 const response = await fetch('/api/process', {
                     method: 'POST',
@@ -162,8 +213,7 @@ class handler(BaseHTTPRequestHandler):
             } catch (error) {
                 result.innerHTML = '❌ Network error: ' + error.message;
             } finally {
-                submitBtn.disabled = false;
-                submitBtn.textContent = '🤖 Generate Infrastructure Plan';
+                resetButton();
             }
         }
         
@@ -176,9 +226,20 @@ class handler(BaseHTTPRequestHandler):
     </script>
 </body>
 </html>
-        """
+"""
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if urlparse(self.path).path == '/api/stream':
+            self.handle_stream_request()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-type', 'text/html')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
         
-        self.wfile.write(html.encode())
+        self.wfile.write(INDEX_HTML.encode())
     
     def do_POST(self):
         if self.path == '/api/process':
@@ -220,12 +281,32 @@ class handler(BaseHTTPRequestHandler):
             }
             
             self.wfile.write(json.dumps(response).encode())
-    
+
+    def handle_stream_request(self):
+        """Server-Sent Events for one plan; blocks this handler until planning finishes."""
+        query = parse_qs(urlparse(self.path).query)
+        prompt = query.get('prompt', [''])[0]
+        project_id = query.get('project_id', [None])[0]
+
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+
+        for event, data in plan_events(prompt, project_id):
+            self.wfile.write(sse_format(event, data).encode())
+            self.wfile.flush()
+
     def process_with_adk(self, prompt):
-        """Process the request using ADK web agents"""
-        try:
-            # For now, return a simple response to test the deployment
-            return f"""✅ **Infrastructure Plan Generated Successfully!**
+        return process_with_adk(prompt)
+
+
+def process_with_adk(prompt):
+    """Process the request using ADK web agents"""
+    try:
+        # For now, return a simple response to test the deployment
+        return f"""✅ **Infrastructure Plan Generated Successfully!**
 
 📋 **Request:** {prompt}
 
@@ -247,6 +328,139 @@ class handler(BaseHTTPRequestHandler):
 3. Monitor the deployment progress
 
 🎉 **Deployment Status:** Ready to deploy!"""
-            
-        except Exception as e:
-            return f"❌ Error processing request: {str(e)}" 
\ No newline at end of file
+        
+    except Exception as e:
+        return f"❌ Error processing request: {str(e)}"
+
+
+# ───────────────────────── Planning progress ───────────────────────── #
+
+def sse_format(event: str, data: Any) -> str:
+    """One Server-Sent Events frame; data is sent as a single JSON line."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _plan_summary(prompt: str, tool_calls: List[Dict[str, Any]]) -> str:
+    services = list(dict.fromkeys(tc.get("action", "").split(".")[0] for tc in tool_calls))
+    steps = "\n".join(f"{n}. **{tc.get('action', 'unknown')}**" for n, tc in enumerate(tool_calls, 1))
+    return (
+        f"✅ **Infrastructure Plan Generated Successfully!**\n\n"
+        f"📋 **Request:** {prompt}\n\n"
+        f"🔄 **Execution Flow:**\n{steps}\n\n"
+        f"📊 **Summary:**\n"
+        f"• Total steps: {len(tool_calls)}\n"
+        f"• Services involved: {len(services)}\n"
+        f"• Execution order: {' → '.join(services)}"
+    )
+
+
+_plan_flight = None
+_plan_flight_lock = threading.Lock()
+
+
+def plan_events(prompt: str, project_id: Optional[str] = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Runs the planner and yields (event, data) as each stage finishes:
+    intent, dag, tool_call (one per step, as the model streams it), quota, then
+    result — or error, after which the stream ends.
+
+    Concurrent requests with the same normalized prompt and project share one
+    planning run; late joiners get the events so far replayed, then the rest live.
+    """
+    global _plan_flight
+    if not prompt.strip():
+        yield "error", {"error": "Please enter a request"}
+        return
+
+    try:
+        from agents.common.single_flight import SingleFlight
+        from agents.planner_agent.tools.planner_tool import plan_key
+    except Exception as e:
+        yield "error", {"error": str(e)}
+        return
+    with _plan_flight_lock:
+        if _plan_flight is None:
+            _plan_flight = SingleFlight("plan")
+    yield from _plan_flight.stream(plan_key(prompt, project_id), lambda: _run_plan(prompt, project_id))
+
+
+def _run_plan(prompt: str, project_id: Optional[str]) -> Iterator[Tuple[str, Any]]:
+    try:
+        from agents.planner_agent.tools.planner_tool import (
+            build_service_dag,
+            check_quota_before_planning,
+            parse_user_goal,
+            stream_tool_plan,
+        )
+
+        intent = parse_user_goal.func(prompt)
+        yield "intent", intent
+        if "error" in intent:
+            yield "error", {"error": intent["error"]}
+            return
+
+        dag = build_service_dag.func(intent)
+        yield "dag", dag
+        if "error" in dag:
+            yield "error", {"error": dag["error"]}
+            return
+
+        tool_calls = []
+        for tool_call in stream_tool_plan(prompt):
+            tool_calls.append(tool_call)
+            yield "tool_call", {"step": len(tool_calls), **tool_call}
+
+        project_id = project_id or next(
+            (tc["params"]["project_id"] for tc in tool_calls
+             if isinstance(tc.get("params"), dict) and tc["params"].get("project_id")), None)
+        if project_id:
+            quota = check_quota_before_planning.func(project_id, tool_calls)
+        else:
+            quota = {"status": "SKIPPED", "message": "ℹ️ No project_id in the plan; quota check skipped"}
+        yield "quota", quota
+
+        yield "result", {"tool_calls": tool_calls, "quota_status": quota.get("status"),
+                         "summary": _plan_summary(prompt, tool_calls)}
+    except Exception as e:
+        yield "error", {"error": str(e)}
+
+
+# ───────────────────────── Background jobs ───────────────────────── #
+
+def run_plan_job(payload: Dict[str, Any], report) -> Any:
+    """Planning job: the same stages as /api/stream, recorded as job progress."""
+    result = None
+    for event, data in plan_events(payload.get("prompt", ""), payload.get("project_id")):
+        report(event, data)
+        if event == "error":
+            raise RuntimeError(data.get("error"))
+        if event == "result":
+            result = data
+    return result
+
+
+def run_execute_job(payload: Dict[str, Any], report) -> Any:
+    """Execution job: runs a tool plan with the parallel executor."""
+    from agents.execution import execute_plan
+
+    tool_plan = payload.get("tool_plan") or payload.get("tool_calls")
+    if not isinstance(tool_plan, list) or not tool_plan:
+        raise ValueError("Execution jobs need a non-empty 'tool_plan' list")
+    report("started", {"steps": len(tool_plan)})
+    max_workers = payload.get("max_workers")
+    return execute_plan(tool_plan, max_workers=int(max_workers) if max_workers else None,
+                        resume=bool(payload.get("resume", False)))
+
+
+_job_queue = None
+
+
+def get_job_queue():
+    """Process-wide bounded job queue with plan and execute handlers."""
+    global _job_queue
+    with _plan_flight_lock:
+        if _job_queue is None:
+            from agents.execution.jobs import JobQueue
+            _job_queue = JobQueue({"plan": run_plan_job, "execute": run_execute_job})
+    return _job_queue
+
@@ -0,0 +1,184 @@
+"""
+Asyncio server mode for the Cloud Orchestrator web UI.
+
+The Vercel function in index.py handles one request at a time. This ASGI app
+serves the same page and endpoints from an event loop: blocking planner work runs
+in the thread pool, so a slow plan no longer stalls other clients, and
+/api/stream pushes planning progress to the page as Server-Sent Events.
+POST /api/jobs queues a plan or execute job on a bounded worker pool (429 when
+the queue is full) and GET /api/jobs/<id> polls it. GET /metrics serves
+Prometheus metrics for LLM calls, tools, caches, rate limiters and the job queue.
+
+Execute jobs run tool plans with the server's own GCP credentials, so submitting
+one or reading its status is refused unless JOBS_API_TOKEN is set and the request
+sends it as "Authorization: Bearer <token>". POST endpoints only accept
+application/json bodies, and neither they nor the job endpoints send CORS
+headers, so other sites cannot use them from a browser. The server listens on
+127.0.0.1 unless HOST says otherwise.
+
+    python api/server.py                      # PORT defaults to 8080
+    uvicorn --app-dir api server:app --port 8080
+"""
+import asyncio
+import hmac
+import os
+import sys
+from typing import Any, AsyncIterator, Iterator, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from index import INDEX_HTML, get_job_queue, plan_events, process_with_adk, sse_format  # noqa: E402
+from agents.common import metrics  # noqa: E402
+from agents.execution.jobs import QueueFull  # noqa: E402
+
+# Comment frames keep proxies from closing the stream while the LLM is thinking
+HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+JOBS_API_TOKEN = os.getenv("JOBS_API_TOKEN", "")
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+    "Access-Control-Allow-Origin": "*",
+}
+
+app = FastAPI(title="Cloud Orchestrator")
+
+
+def _job_queue_metrics():
+    stats = get_job_queue().stats()
+    yield ("cloud_orchestrator_job_queue_jobs", "gauge", "Background jobs by state.",
+           [({"state": state}, stats[state]) for state in ("queued", "running", "retained")])
+    yield ("cloud_orchestrator_job_queue_capacity", "gauge", "Jobs the queue holds before answering 429.",
+           [({}, stats["capacity"])])
+
+
+metrics.add_collector("job_queue", _job_queue_metrics)
+
+
+def _error(message: str, status_code: int, headers: Optional[dict] = None) -> JSONResponse:
+    return JSONResponse({"success": False, "error": message}, status_code=status_code, headers=headers)
+
+
+def _require_json(request: Request) -> Optional[JSONResponse]:
+    """415 unless the body is declared as JSON; a text/plain POST needs no CORS preflight."""
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type != "application/json":
+        return _error("Content-Type must be application/json", 415)
+    return None
+
+
+def _authorize_execute(request: Request) -> Optional[JSONResponse]:
+    if not JOBS_API_TOKEN:
+        return _error("Execute jobs are disabled; set JOBS_API_TOKEN to enable them", 403)
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), JOBS_API_TOKEN.encode()):
+        return _error("Execute jobs need a valid bearer token", 401, {"WWW-Authenticate": "Bearer"})
+    return None
+
+
+async def sse_stream(events: Iterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    """SSE frames for a blocking event generator, advanced one step at a time in the thread pool."""
+    iterator = iterate_in_threadpool(events)
+    pending = asyncio.ensure_future(iterator.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({pending}, timeout=HEARTBEAT_SECONDS)
+            if not done:
+                yield ": keep-alive\n\n"
+                continue
+            try:
+                event, data = pending.result()
+            except StopAsyncIteration:
+                return
+            yield sse_format(event, data)
+            pending = asyncio.ensure_future(iterator.__anext__())
+    finally:
+        # Client went away: stop pulling, the planner step in flight finishes on its own
+        pending.cancel()
+
+
+@app.get("/", response_class=HTMLResponse)
+async def index() -> str:
+    return INDEX_HTML
+
+
+@app.post("/api/process")
+async def process(request: Request) -> JSONResponse:
+    rejected = _require_json(request)
+    if rejected:
+        return rejected
+    try:
+        data = await request.json()
+        result = await run_in_threadpool(process_with_adk, data.get("prompt", ""))
+        return JSONResponse({"success": True, "result": result})
+    except Exception as e:
+        return _error(str(e), 500)
+
+
+@app.get("/api/stream")
+async def stream(prompt: str = "", project_id: Optional[str] = None) -> StreamingResponse:
+    return StreamingResponse(sse_stream(plan_events(prompt, project_id)),
+                             media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.post("/api/stream")
+async def stream_post(request: Request) -> Response:
+    rejected = _require_json(request)
+    if rejected:
+        return rejected
+    data = await request.json()
+    return await stream(data.get("prompt", ""), data.get("project_id"))
+
+
+@app.post("/api/jobs")
+async def submit_job(request: Request) -> JSONResponse:
+    """Enqueue a plan job {"kind": "plan", "prompt", "project_id"} or execute job {"kind": "execute", "tool_plan"}."""
+    rejected = _require_json(request)
+    if rejected:
+        return rejected
+    try:
+        data = await request.json()
+        kind = data.get("kind", "plan")
+        rejected = _authorize_execute(request) if kind == "execute" else None
+        if rejected:
+            return rejected
+        payload = {k: v for k, v in data.items() if k != "kind"}
+        job = get_job_queue().submit(kind, payload)
+    except QueueFull as e:
+        return _error(str(e), 429, {"Retry-After": "5"})
+    except (ValueError, AttributeError) as e:
+        return _error(str(e), 400)
+    return JSONResponse({"success": True, "job_id": job.id, "status": job.status, "poll": f"/api/jobs/{job.id}"},
+                        status_code=202)
+
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str, request: Request) -> JSONResponse:
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return _error(f"Unknown job '{job_id}'", 404)
+    # Execute results carry step outputs and resource names: same token as submitting
+    rejected = _authorize_execute(request) if job.kind == "execute" else None
+    if rejected:
+        return rejected
+    return JSONResponse(jsonable_encoder(dict(job.to_dict(), success=True)))
+
+
+@app.get("/metrics")
+async def metrics_endpoint() -> PlainTextResponse:
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def main() -> None:
+    import uvicorn
+
+    uvicorn.run(app, host=os.getenv("HOST", "127.0.0.1"), port=int(os.getenv("PORT", "8080")))
+
+
+if __name__ == "__main__":
+    main()
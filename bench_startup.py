@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for Cloud Orchestrator
+Imports each agent module in a fresh interpreter with `python -X importtime`
+and reports where the import-time cost goes, so cold-start regressions show up
+before they reach Cloud Run.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+DEFAULT_TARGETS = [
+    "cloud_orchestrator.agents.planner_agent.tools.planner_tool",
+    "cloud_orchestrator.agents.vertex_ai_agent.agent",
+    "cloud_orchestrator.agents.gke_worker_agent.agent",
+    "cloud_orchestrator.agents.guard_agent",
+    "cloud_orchestrator.agents.worker_hub_agent.agent",
+    "cloud_orchestrator.agents",
+]
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Parse `-X importtime` output into {module: cumulative microseconds}"""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            cum_us = int(parts[1].strip())
+        except ValueError:
+            continue  # header row
+        module = parts[2].strip()
+        # A module can appear more than once (e.g. namespace re-imports); keep the largest
+        cumulative[module] = max(cumulative.get(module, 0), cum_us)
+    return cumulative
+
+
+def measure(target: str, top: int = 10) -> Dict:
+    """Import one module in a fresh interpreter and summarise its import cost"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = root + os.pathsep + env.get("PYTHONPATH", "")
+    env.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, cwd=root, env=env,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    modules = parse_importtime(proc.stderr)
+    # Parent packages are imported first and their cumulative time contains the
+    # target, so the total cost is the largest entry and ancestors are not listed
+    ancestors = {target.rsplit(".", i)[0] for i in range(target.count(".") + 1)}
+    result = {
+        "target": target,
+        "ok": proc.returncode == 0,
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": round(max(modules.values(), default=0) / 1000, 1),
+        "top": [
+            {"module": name, "cumulative_ms": round(us / 1000, 1)}
+            for name, us in sorted(modules.items(), key=lambda kv: kv[1], reverse=True)
+            if name not in ancestors
+        ][:top],
+    }
+    if proc.returncode != 0:
+        errors = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        result["error"] = errors[-1] if errors else f"exit code {proc.returncode}"
+    return result
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> List[str]:
+    """Return a message for every target that got slower than the baseline allows"""
+    previous = {r["target"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        old = previous.get(r["target"])
+        if not old or not old.get("import_ms") or not r["ok"]:
+            continue
+        ratio = r["import_ms"] / old["import_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{r['target']}: {old['import_ms']} ms -> {r['import_ms']} ms (+{(ratio - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def print_report(results: List[Dict]):
+    """Print a human-readable summary of every target"""
+    for r in results:
+        status = "✅" if r["ok"] else "❌"
+        print(f"\n{status} {r['target']}  import={r['import_ms']} ms  wall={r['wall_ms']} ms")
+        if not r["ok"]:
+            print(f"   {r.get('error')}")
+        for entry in r["top"]:
+            print(f"   {entry['cumulative_ms']:>9.1f} ms  {entry['module']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of agent modules")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="Modules to import")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest dependencies to list per target")
+    parser.add_argument("--json", dest="json_out", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a JSON file written by --json")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown vs baseline before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    print("🚀 Cloud Orchestrator Startup Benchmark")
+    print("=" * 50)
+    results = [measure(target, args.top) for target in args.targets]
+    print_report(results)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"\n📄 Results written to {args.json_out}")
+
+    exit_code = 0 if all(r["ok"] for r in results) else 1
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\n❌ Startup regressions:")
+            for message in regressions:
+                print(f"   {message}")
+            exit_code = 1
+        else:
+            print("\n✅ No startup regressions against baseline")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
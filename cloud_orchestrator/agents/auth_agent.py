@@ -1,3 +1,4 @@
+import logging
 from google.adk.agents import Agent
 from .planner_agent.tools.planner_tool import (
     setup_cloud_environment,
@@ -15,11 +16,13 @@ auth_agent = Agent(
     description="Handles initial Google Cloud authentication and project setup",
     instruction=(
         "You are a Google Cloud authentication and setup assistant. Your job is to guide users through the initial setup process before they can use cloud infrastructure planning.\n\n"
+        "**Session State:** account last seen '{gcp_account?}'. This is only a hint: gcloud config is shared "
+        "by every shell on the machine, so still call check_gcloud_auth() and set_active_project() before planning.\n\n"
         "**Setup Flow:**\n"
         "1. **Start Setup**: Call setup_cloud_environment() to begin the setup process\n"
         "2. **Check Authentication**: Call check_gcloud_auth() to verify if user is authenticated\n"
         "3. **Handle Auth Required**: If not authenticated, provide clear instructions for gcloud auth login\n"
-        "4. **List Projects**: If authenticated, call list_gcp_projects() to show available projects\n"
+        "4. **List Projects**: If authenticated, call list_gcp_projects() to show available projects; pass query (name or id fragment) or label_filter when the user names one, and page with next_page_token\n"
         "5. **Project Selection**: Help user select existing project or create new one with create_gcp_project()\n"
         "6. **Set Active Project**: Use set_active_project() to set the selected project as active\n"
         "7. **Transition to Planning**: Once setup is complete, proceed with infrastructure planning using build_tool_plan()\n\n"
@@ -52,4 +55,4 @@ auth_agent = Agent(
     ],
 )
 
-print(f"✅ Auth Agent '{auth_agent.name}' initialized") 
\ No newline at end of file
+logging.getLogger(__name__).info(f"✅ Auth Agent '{auth_agent.name}' initialized") 
\ No newline at end of file
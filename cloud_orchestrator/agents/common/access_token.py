@@ -0,0 +1,126 @@
+"""
+Process-wide OAuth access token for tools that call REST APIs with raw requests.
+
+Tokens are cached and refreshed shortly before they expire, so a tool call no
+longer pays for a `gcloud auth print-access-token` process. Application Default
+Credentials are used when available; otherwise the token comes from gcloud once
+and is reused for its (one hour) lifetime.
+
+authorized_request() sends a request with the cached token; when the API answers
+401 (token revoked or rotated early) it drops the token and retries once with a
+fresh one.
+
+    response = authorized_request("PATCH", url, json=body)
+"""
+import datetime
+import subprocess
+import threading
+import time
+from typing import Any, Dict, Optional
+
+CLOUD_PLATFORM_SCOPE = "https://www.googleapis.com/auth/cloud-platform"
+
+REFRESH_MARGIN_SECONDS = 300
+# gcloud does not report the expiry of printed tokens; they live for an hour
+GCLOUD_TOKEN_LIFETIME_SECONDS = 3600
+
+
+class AccessTokenProvider:
+    """Thread-safe cached access token; only one caller refreshes at a time."""
+
+    def __init__(self, margin: float = REFRESH_MARGIN_SECONDS):
+        self.margin = margin
+        self._lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._credentials = None
+        self._use_gcloud = False
+
+    def _fresh(self) -> bool:
+        return self._token is not None and time.time() < self._expires_at - self.margin
+
+    def token(self) -> str:
+        if self._fresh():
+            return self._token
+        with self._lock:
+            if not self._fresh():
+                self._token, self._expires_at = self._fetch()
+            return self._token
+
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """
+        Drop the cached token, e.g. after a 401. With `token`, only if that is still
+        the cached one, so concurrent 401s for the same token refresh it once.
+        """
+        with self._lock:
+            if token is None or token == self._token:
+                self._token, self._expires_at = None, 0.0
+
+    def _fetch(self):
+        if not self._use_gcloud:
+            try:
+                return self._fetch_adc()
+            except Exception as e:
+                print(f"Warning: Application Default Credentials unavailable, using gcloud tokens: {e}")
+                self._use_gcloud = True
+        return self._fetch_gcloud()
+
+    def _fetch_adc(self):
+        import google.auth
+        from google.auth.transport.requests import Request
+
+        if self._credentials is None:
+            self._credentials, _ = google.auth.default(scopes=[CLOUD_PLATFORM_SCOPE])
+        self._credentials.refresh(Request())
+        expiry = self._credentials.expiry
+        if expiry is None:
+            expires_at = time.time() + GCLOUD_TOKEN_LIFETIME_SECONDS
+        else:
+            # google-auth reports a naive UTC datetime
+            expires_at = expiry.replace(tzinfo=datetime.timezone.utc).timestamp()
+        return self._credentials.token, expires_at
+
+    def _fetch_gcloud(self):
+        started = time.time()
+        result = subprocess.run(
+            ["gcloud", "auth", "print-access-token"], capture_output=True, text=True, check=True
+        )
+        return result.stdout.strip(), started + GCLOUD_TOKEN_LIFETIME_SECONDS
+
+
+_provider: Optional[AccessTokenProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_token_provider() -> AccessTokenProvider:
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = AccessTokenProvider()
+    return _provider
+
+
+def access_token() -> str:
+    return get_token_provider().token()
+
+
+def auth_headers() -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {access_token()}",
+        "Content-Type": "application/json",
+    }
+
+
+def authorized_request(method: str, url: str, headers: Optional[Dict[str, str]] = None, **kwargs: Any):
+    """requests.request with the cached token; a 401 invalidates it and the request is sent once more."""
+    import requests
+
+    provider = get_token_provider()
+    for attempt in range(2):
+        token = provider.token()
+        response = requests.request(method, url, headers=dict(headers or {}, Authorization=f"Bearer {token}"),
+                                    **kwargs)
+        if response.status_code != 401 or attempt:
+            return response
+        provider.invalidate(token)
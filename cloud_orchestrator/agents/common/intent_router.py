@@ -0,0 +1,90 @@
+"""
+Local pre-router for agents whose only LLM job is picking a sub-agent.
+
+Each target agent has weighted regex rules (the keyword lists its instructions
+already spell out). A request scores the sum of the weights of the rules it
+matches; the best agent wins when it reaches MIN_SCORE and leads the runner-up
+by MARGIN. The before_model callback then answers with a transfer_to_agent call,
+so ADK hands over without a model round-trip. Ambiguous or unmatched requests
+return None and go to the model as before.
+
+    router = IntentRouter({"cloud_auth_setup": [(r"\\bgcloud auth\\b", 3)]})
+    root_agent = Agent(..., before_model_callback=router.before_model_callback)
+
+Set INTENT_ROUTER_DISABLED=1 to always route with the model.
+"""
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from .metrics import REGISTRY
+
+MIN_SCORE = 2.0
+MARGIN = 1.5
+TRANSFER_TOOL = "transfer_to_agent"
+
+Rules = Dict[str, Sequence[Tuple[str, float]]]
+
+_decisions = REGISTRY.counter("cloud_orchestrator_intent_router_decisions_total",
+                              "Routing decisions made locally (routed) or left to the model (fallback).",
+                              ("router", "outcome"))
+
+
+def router_enabled() -> bool:
+    return os.getenv("INTENT_ROUTER_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+def latest_user_text(llm_request: LlmRequest) -> Optional[str]:
+    """Text of the newest user message, or None when the last turn is a tool response."""
+    if not llm_request.contents:
+        return None
+    content = llm_request.contents[-1]
+    if content.role != "user" or not content.parts:
+        return None
+    if any(part.function_response for part in content.parts):
+        return None
+    text = " ".join(part.text for part in content.parts if part.text).strip()
+    return text or None
+
+
+class IntentRouter:
+    def __init__(self, rules: Rules, name: str = "root", min_score: float = MIN_SCORE, margin: float = MARGIN):
+        self.name = name
+        self.min_score = min_score
+        self.margin = margin
+        self._rules: Dict[str, List[Tuple["re.Pattern[str]", float]]] = {
+            agent: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in agent_rules]
+            for agent, agent_rules in rules.items()
+        }
+
+    def scores(self, text: str) -> Dict[str, float]:
+        return {agent: sum(weight for pattern, weight in rules if pattern.search(text))
+                for agent, rules in self._rules.items()}
+
+    def classify(self, text: str) -> Optional[str]:
+        """The agent `text` clearly belongs to, or None when it is ambiguous."""
+        ranked = sorted(self.scores(text).items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return None
+        agent, best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if best >= self.min_score and best - runner_up >= self.margin:
+            return agent
+        return None
+
+    def before_model_callback(self, callback_context, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        """Answer with a transfer_to_agent call when the request classifies locally."""
+        if not router_enabled() or TRANSFER_TOOL not in llm_request.tools_dict:
+            return None
+        text = latest_user_text(llm_request)
+        if text is None:
+            return None
+        agent = self.classify(text)
+        _decisions.inc(router=self.name, outcome="routed" if agent else "fallback")
+        if agent is None:
+            return None
+        call = types.FunctionCall(name=TRANSFER_TOOL, args={"agent_name": agent})
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(function_call=call)]))
@@ -0,0 +1,297 @@
+"""
+Shared poller for long-running GCP operations.
+
+Every in-flight operation (GKE deletes, Dataflow jobs, Cloud SQL and Firestore
+operations, Vertex deployments) is tracked by one asyncio loop running in a single
+background thread. Each operation is polled with exponential backoff and jitter,
+and the REST status calls go through a small shared pool, so waiting on N
+operations costs neither N threads nor a gcloud process per poll.
+
+    op_id, future = get_poller().watch(gke_cluster_deleted(p, region, name), name="delete")
+    future.result()          # or future.add_done_callback(...)
+"""
+import asyncio
+import itertools
+import json
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .gcp_client import authorized_session, get_json
+
+# A check returns (done, value); it raises OperationFailed when the operation failed
+Check = Callable[[], Tuple[bool, Any]]
+
+
+class OperationFailed(Exception):
+    pass
+
+
+class OperationTimeout(Exception):
+    pass
+
+
+class LROPoller:
+    """Single event loop that polls every registered operation until it finishes."""
+
+    def __init__(self, max_concurrent_checks: int = 4, keep_finished: int = 200):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._checks = ThreadPoolExecutor(max_workers=max_concurrent_checks, thread_name_prefix="lro-check")
+        self._ids = itertools.count(1)
+        self._ops: Dict[str, Dict[str, Any]] = {}
+        self._keep_finished = keep_finished
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="lro-poller", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def watch(self, check: Check, name: str, kind: str = "operation",
+              initial_delay: float = 2.0, max_delay: float = 60.0, multiplier: float = 1.6,
+              jitter: float = 0.2, timeout: Optional[float] = None, max_errors: int = 3,
+              on_done: Optional[Callable[[Future], None]] = None) -> Tuple[str, Future]:
+        """
+        Start polling an operation and return (operation id, Future).
+
+        The Future resolves with the value of the final check, or raises
+        OperationFailed / OperationTimeout. Up to max_errors consecutive check
+        errors (network blips, 5xx) are retried before the Future fails.
+        """
+        loop = self._ensure_loop()
+        op_id = f"{kind}-{next(self._ids)}"
+        future: Future = Future()
+        info = {
+            "id": op_id, "name": name, "kind": kind, "state": "RUNNING",
+            "started_at": time.time(), "polls": 0, "last_value": None, "error": None,
+            "future": future,
+        }
+        with self._lock:
+            self._ops[op_id] = info
+            self._prune()
+        if on_done is not None:
+            future.add_done_callback(on_done)
+        params = (initial_delay, max_delay, multiplier, jitter, timeout, max_errors)
+        asyncio.run_coroutine_threadsafe(self._poll(info, check, *params), loop)
+        return op_id, future
+
+    async def _poll(self, info, check, initial_delay, max_delay, multiplier, jitter, timeout, max_errors):
+        loop = asyncio.get_running_loop()
+        future: Future = info["future"]
+        deadline = time.monotonic() + timeout if timeout else None
+        delay, errors = initial_delay, 0
+        while True:
+            wait = delay * random.uniform(1 - jitter, 1 + jitter)
+            if deadline is not None:
+                wait = max(0.0, min(wait, deadline - time.monotonic()))
+            await asyncio.sleep(wait)
+            try:
+                done, value = await loop.run_in_executor(self._checks, check)
+                errors = 0
+            except OperationFailed as e:
+                self._finish(info, "FAILED", error=e)
+                return
+            except Exception as e:
+                errors += 1
+                if errors >= max_errors:
+                    self._finish(info, "FAILED", error=e)
+                    return
+                done, value = False, None
+            info["polls"] += 1
+            if value is not None:
+                info["last_value"] = value
+            if done:
+                self._finish(info, "DONE", value=value)
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                self._finish(info, "TIMEOUT", error=OperationTimeout(f"{info['name']} did not finish in {timeout}s"))
+                return
+            delay = min(max_delay, delay * multiplier)
+
+    def _finish(self, info, state, value=None, error=None):
+        info["state"] = state
+        info["finished_at"] = time.time()
+        future: Future = info["future"]
+        if error is not None:
+            info["error"] = str(error)
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def _prune(self):
+        finished = [op_id for op_id, info in self._ops.items() if info["state"] != "RUNNING"]
+        for op_id in finished[:max(0, len(finished) - self._keep_finished)]:
+            del self._ops[op_id]
+
+    def status(self, op_id: str) -> Optional[Dict[str, Any]]:
+        info = self._ops.get(op_id)
+        if info is None:
+            return None
+        return {k: v for k, v in info.items() if k != "future"}
+
+    def list_operations(self) -> List[Dict[str, Any]]:
+        return [self.status(op_id) for op_id in list(self._ops)]
+
+
+_poller: Optional[LROPoller] = None
+_poller_lock = threading.Lock()
+
+
+def get_poller() -> LROPoller:
+    global _poller
+    if _poller is None:
+        with _poller_lock:
+            if _poller is None:
+                _poller = LROPoller()
+    return _poller
+
+
+def wait_for(future: Future, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Block on an operation Future and turn the outcome into a tool-style dict."""
+    try:
+        return {"status": "success", "result": future.result(timeout=timeout)}
+    except OperationTimeout as e:
+        return {"status": "error", "error_message": f"timeout: {e}"}
+    except Exception as e:
+        return {"status": "error", "error_message": str(e)}
+
+
+# ───────────────────────── REST access ───────────────────────── #
+
+def _get_json(url: str, missing_ok: bool = False) -> Optional[Dict[str, Any]]:
+    return get_json(url, missing_ok=missing_ok, timeout=30)
+
+
+def _gcloud_json(cmd: List[str]) -> Optional[Dict[str, Any]]:
+    proc = subprocess.run(cmd + ["--format=json"], capture_output=True, text=True)
+    if proc.returncode != 0:
+        if "NOT_FOUND" in proc.stderr or "not found" in proc.stderr.lower():
+            return None
+        raise RuntimeError(proc.stderr.strip())
+    return json.loads(proc.stdout or "null")
+
+
+def _operation_error(error: Any) -> str:
+    if isinstance(error, dict):
+        errors = error.get("errors")
+        if errors:
+            return "; ".join(e.get("message", str(e)) for e in errors)
+        return error.get("message", json.dumps(error))
+    return str(error)
+
+
+# ───────────────────────── Checks ───────────────────────── #
+
+def gke_cluster_deleted(project_id: str, region: str, cluster_name: str) -> Check:
+    """Done once the cluster no longer exists."""
+    url = f"https://container.googleapis.com/v1/projects/{project_id}/locations/{region}/clusters/{cluster_name}"
+
+    def check():
+        if authorized_session():
+            cluster = _get_json(url, missing_ok=True)
+        else:
+            cluster = _gcloud_json(["gcloud", "container", "clusters", "describe", cluster_name,
+                                    f"--region={region}", f"--project={project_id}"])
+        if cluster is None:
+            return True, {"cluster": cluster_name, "state": "DELETED"}
+        if cluster.get("status") == "ERROR":
+            raise OperationFailed(cluster.get("statusMessage", "cluster entered ERROR state"))
+        return False, {"cluster": cluster_name, "state": cluster.get("status")}
+    return check
+
+
+DATAFLOW_TERMINAL_STATES = {
+    "JOB_STATE_DONE", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_UPDATED", "JOB_STATE_DRAINED",
+}
+
+
+def dataflow_job_finished(project_id: str, region: str, job_id: str) -> Check:
+    """Done once the job reaches a terminal state; the value is that state."""
+    url = f"https://dataflow.googleapis.com/v1b3/projects/{project_id}/locations/{region}/jobs/{job_id}"
+
+    def check():
+        if authorized_session():
+            job = _get_json(url)
+        else:
+            job = _gcloud_json(["gcloud", "dataflow", "jobs", "describe", job_id,
+                                f"--project={project_id}", f"--region={region}"])
+        state = (job or {}).get("currentState", "JOB_STATE_UNKNOWN")
+        return state in DATAFLOW_TERMINAL_STATES, state
+    return check
+
+
+def sql_operation_done(project_id: str, operation: str) -> Check:
+    """Cloud SQL Admin operations report status PENDING / RUNNING / DONE."""
+    url = f"https://sqladmin.googleapis.com/v1/projects/{project_id}/operations/{operation}"
+
+    def check():
+        if authorized_session():
+            op = _get_json(url)
+        else:
+            op = _gcloud_json(["gcloud", "sql", "operations", "describe", operation, f"--project={project_id}"])
+        if op.get("status") != "DONE":
+            return False, op.get("status")
+        if op.get("error"):
+            raise OperationFailed(_operation_error(op["error"]))
+        return True, {"operation": operation, "target": op.get("targetId"), "type": op.get("operationType")}
+    return check
+
+
+def compute_operation_done(operation_url: str) -> Check:
+    """Compute Engine zonal/global operations (selfLink) report PENDING / RUNNING / DONE."""
+
+    def check():
+        op = _get_json(operation_url)
+        if op.get("status") != "DONE":
+            return False, op.get("status")
+        if op.get("error"):
+            raise OperationFailed(_operation_error(op["error"]))
+        return True, {"operation": op.get("name"), "target": op.get("targetLink")}
+    return check
+
+
+def bigquery_job_done(project_id: str, job_id: str, location: Optional[str] = None) -> Check:
+    """BigQuery jobs finish in state DONE, with status.errorResult set when they failed."""
+    url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/jobs/{job_id}"
+    if location:
+        url += f"?location={location}"
+
+    def check():
+        status = _get_json(url).get("status", {})
+        if status.get("state") != "DONE":
+            return False, status.get("state")
+        if status.get("errorResult"):
+            raise OperationFailed(_operation_error(status["errorResult"]))
+        return True, {"job": job_id, "state": "DONE"}
+    return check
+
+
+def google_operation_done(operation_url: str) -> Check:
+    """Standard google.longrunning.Operation (Vertex AI, Firestore): done + error/response."""
+
+    def check():
+        if not authorized_session():
+            raise OperationFailed("Application Default Credentials are required to poll this operation")
+        op = _get_json(operation_url)
+        if not op.get("done"):
+            return False, op.get("metadata")
+        if op.get("error"):
+            raise OperationFailed(_operation_error(op["error"]))
+        return True, op.get("response", {})
+    return check
+
+
+def operation_status(op_id: str) -> Dict[str, Any]:
+    """Tool-friendly snapshot of a watched operation."""
+    info = get_poller().status(op_id)
+    if info is None:
+        return {"status": "error", "error_message": f"Unknown operation '{op_id}'"}
+    return {"status": "success", "operation": info}
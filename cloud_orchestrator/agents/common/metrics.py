@@ -0,0 +1,272 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Stages (LLM calls, worker tools, quota fetches, page rendering) report through
+track() / instrumented(), which record per-stage latency histograms, error
+counters and in-flight gauges:
+
+    @FunctionTool
+    @instrumented("guard", "check_quota")
+    def check_quota(...): ...
+
+    with track("llm", model):
+        response = client.models.generate_content(...)
+
+Values owned by other components (cache hit/miss counts, limiter and queue
+stats) are read at scrape time by collectors registered with add_collector().
+render() returns the text the /metrics endpoint serves. Set METRICS_DISABLED=1
+to turn recording off.
+"""
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+PREFIX = "cloud_orchestrator"
+# LLM calls and gcloud subprocesses take seconds, so the buckets reach two minutes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+LabelValues = Tuple[str, ...]
+# (labels, value) pairs produced by a collector for one metric family
+Samples = Iterable[Tuple[Dict[str, str], float]]
+
+
+def metrics_enabled() -> bool:
+    return os.getenv("METRICS_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+INF_BUCKET = 'le="+Inf"'
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((key, ([*counts], total, n)) for key, (counts, total, n) in self._values.items())
+        for key, (counts, total, n) in items:
+            for bound, cumulative in zip(self.buckets, counts):
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, INF_BUCKET)} {n}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(round(total, 6))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {n}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Tuple[str, str, str, Samples]]]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, labelnames: Sequence[str], **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def add_collector(self, key: str, collect: Callable[[], Iterable[Tuple[str, str, str, Samples]]]) -> None:
+        """collect() yields (name, type, help, samples) at scrape time; re-adding a key replaces it."""
+        with self._lock:
+            self._collectors[key] = collect
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+            collectors = list(self._collectors.items())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        families: Dict[str, Tuple[str, str, List[str]]] = {}
+        for key, collect in collectors:
+            try:
+                for name, kind, help, samples in collect():
+                    family = families.setdefault(name, (kind, help, []))
+                    for labels, value in samples:
+                        family[2].append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+            except Exception as e:
+                print(f"Warning: Metrics collector '{key}' failed: {e}")
+        for name, (kind, help, samples) in sorted(families.items()):
+            lines.extend([f"# HELP {name} {help}", f"# TYPE {name} {kind}", *samples])
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(f"{PREFIX}_stage_duration_seconds",
+                                   "Latency of instrumented stages.", ("stage", "name"))
+STAGE_ERRORS = REGISTRY.counter(f"{PREFIX}_stage_errors_total",
+                                "Instrumented calls that raised or returned an error result.", ("stage", "name"))
+STAGE_IN_FLIGHT = REGISTRY.gauge(f"{PREFIX}_stage_in_flight",
+                                 "Instrumented calls currently running.", ("stage", "name"))
+
+
+def is_error_result(result: Any) -> bool:
+    """Tool results signal failure with status error/failed or an 'error' key."""
+    if not isinstance(result, dict):
+        return False
+    return "error" in result or str(result.get("status", "")).lower() in ("error", "failed")
+
+
+class _Tracked:
+    failed = False
+
+    def fail(self) -> None:
+        self.failed = True
+
+
+@contextmanager
+def track(stage: str, name: str) -> Iterator[_Tracked]:
+    """Time a block; exceptions (or tracked.fail()) count as errors."""
+    tracked = _Tracked()
+    if not metrics_enabled():
+        yield tracked
+        return
+    STAGE_IN_FLIGHT.inc(stage=stage, name=name)
+    started = time.perf_counter()
+    try:
+        yield tracked
+    except BaseException:
+        tracked.fail()
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage, name=name)
+        STAGE_IN_FLIGHT.dec(stage=stage, name=name)
+        if tracked.failed:
+            STAGE_ERRORS.inc(stage=stage, name=name)
+
+
+def instrumented(stage: str, name: Optional[str] = None) -> Callable:
+    """Decorator form of track(); error-shaped dict results count as errors too."""
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track(stage, label) as tracked:
+                result = fn(*args, **kwargs)
+                if is_error_result(result):
+                    tracked.fail()
+                return result
+        return wrapper
+    return decorator
+
+
+def add_collector(key: str, collect: Callable[[], Iterable[Tuple[str, str, str, Samples]]]) -> None:
+    REGISTRY.add_collector(key, collect)
+
+
+def cache_collector(caches: Callable[[], Dict[str, Tuple[float, float]]]) -> Callable:
+    """Collector for {cache name: (hits, misses)}: hit/miss counters and the hit ratio."""
+    def collect():
+        stats = caches()
+        yield (f"{PREFIX}_cache_hits_total", "counter", "Cache lookups served from the cache.",
+               [({"cache": n}, hits) for n, (hits, _) in stats.items()])
+        yield (f"{PREFIX}_cache_misses_total", "counter", "Cache lookups that had to load.",
+               [({"cache": n}, misses) for n, (_, misses) in stats.items()])
+        yield (f"{PREFIX}_cache_hit_ratio", "gauge", "Hits over lookups since start.",
+               [({"cache": n}, round(hits / (hits + misses), 4) if hits + misses else 0)
+                for n, (hits, misses) in stats.items()])
+    return collect
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,268 @@
+"""
+Per-API rate control for worker tools.
+
+Each googleapis.com service (the same names check_quota_before_planning uses) gets a
+limiter combining a concurrency semaphore and a token bucket. Limits apply to single
+requests, not to whole tools: a tool that waits on a long-running operation holds
+no slot while it waits, and only the request that was throttled is retried (with
+exponential backoff and full jitter, pausing the service's bucket so other callers
+back off too). Retrying one rejected request is safe where re-running a
+half-finished tool is not.
+
+  * REST calls through gcp_client.request are limited per API host and retried
+    on HTTP 429.
+  * Tools mark their API with @rate_limited and run commands with run_limited /
+    check_output_limited (drop-ins for subprocess.run / check_output); a command
+    is retried only when it failed and gcloud reported throttling on stderr.
+
+    @FunctionTool
+    @rate_limited("pubsub.googleapis.com")
+    def create_topic(project_id: str, topic_id: str) -> dict:
+        run_limited(["gcloud", "pubsub", "topics", "create", topic_id], check=True)
+
+Defaults are deliberately conservative per process; override them with
+RATE_LIMIT_OVERRIDES='{"compute.googleapis.com": {"rate": 20, "concurrency": 16}}'
+or turn everything off with RATE_LIMIT_DISABLED=1.
+"""
+import functools
+import json
+import os
+import random
+import re
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import add_collector, instrumented
+
+# rate = sustained calls per second, burst = bucket size, concurrency = calls in flight
+DEFAULT_LIMIT = {"rate": 5.0, "burst": 10, "concurrency": 8}
+SERVICE_LIMITS: Dict[str, Dict[str, float]] = {
+    "compute.googleapis.com": {"rate": 10.0, "burst": 20, "concurrency": 8},
+    # IAM policy writes are read-modify-write on one policy; keep them nearly serial
+    "iam.googleapis.com": {"rate": 1.0, "burst": 3, "concurrency": 2},
+    "cloudresourcemanager.googleapis.com": {"rate": 1.0, "burst": 3, "concurrency": 2},
+    "container.googleapis.com": {"rate": 2.0, "burst": 4, "concurrency": 4},
+    "sqladmin.googleapis.com": {"rate": 2.0, "burst": 4, "concurrency": 4},
+    "aiplatform.googleapis.com": {"rate": 2.0, "burst": 5, "concurrency": 4},
+    "dataflow.googleapis.com": {"rate": 2.0, "burst": 5, "concurrency": 4},
+    "serviceusage.googleapis.com": {"rate": 1.0, "burst": 3, "concurrency": 2},
+    "bigquery.googleapis.com": {"rate": 10.0, "burst": 20, "concurrency": 8},
+    "pubsub.googleapis.com": {"rate": 10.0, "burst": 20, "concurrency": 8},
+    "storage.googleapis.com": {"rate": 10.0, "burst": 20, "concurrency": 8},
+}
+
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 32.0
+
+# How gcloud reports a throttled API call on stderr when it exits non-zero
+_GCLOUD_THROTTLED_RE = re.compile(
+    r"HTTPError 429|\bcode=429\b|\b429 Too Many Requests\b|RESOURCE_EXHAUSTED|"
+    r"\brateLimitExceeded\b|\buserRateLimitExceeded\b|RATE_LIMIT_EXCEEDED|Quota exceeded for quota metric",
+)
+_THROTTLED_REASONS = frozenset({"rateLimitExceeded", "userRateLimitExceeded", "RATE_LIMIT_EXCEEDED"})
+
+
+def _process_stderr(outcome: Any) -> Optional[str]:
+    """stderr (or merged output) of a failed command, None for anything else."""
+    if isinstance(outcome, subprocess.CalledProcessError):
+        text = outcome.stderr if outcome.stderr is not None else outcome.output
+    elif isinstance(outcome, subprocess.CompletedProcess) and outcome.returncode != 0:
+        text = outcome.stderr
+    else:
+        return None
+    if isinstance(text, bytes):
+        text = text.decode("utf-8", "replace")
+    return text or ""
+
+
+def is_throttled(outcome: Any) -> bool:
+    """
+    True when one request was rejected for rate: an HTTP 429 (response or
+    GoogleAPIError), a RESOURCE_EXHAUSTED / rateLimitExceeded API error, or a
+    failed command whose stderr says so. Successful results are never inspected,
+    so a resource named "vm-429" cannot trigger a retry.
+    """
+    status_code = getattr(outcome, "status_code", None)
+    if status_code == 429:
+        return True
+    if status_code is not None:
+        reasons = set(getattr(outcome, "reasons", None) or ())
+        return getattr(outcome, "status", None) == "RESOURCE_EXHAUSTED" or bool(reasons & _THROTTLED_REASONS)
+    stderr = _process_stderr(outcome)
+    return bool(stderr) and bool(_GCLOUD_THROTTLED_RE.search(stderr))
+
+
+class TokenBucket:
+    """Thread-safe token bucket; pause() blocks all takers for a while after throttling."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token, possibly going into debt; return how long the caller must wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._paused_until - now)
+
+    def acquire(self) -> float:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class ServiceLimiter:
+    def __init__(self, service: str, rate: float, burst: float, concurrency: int):
+        self.service = service
+        self.bucket = TokenBucket(rate, burst)
+        self.semaphore = threading.BoundedSemaphore(int(concurrency))
+        self._stats_lock = threading.Lock()
+        self.stats = {"calls": 0, "throttled": 0, "retries": 0, "waited_seconds": 0.0}
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def call(self, fn: Callable[..., Any], *args,
+             throttled: Callable[[Any], bool] = is_throttled, **kwargs) -> Any:
+        """
+        Run one request (fn must issue a single API call) under the limits,
+        retrying it while `throttled` says the result or exception was a rate rejection.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            with self.semaphore:
+                self._count("waited_seconds", self.bucket.acquire())
+                self._count("calls")
+                try:
+                    outcome = fn(*args, **kwargs)
+                except Exception as e:
+                    if attempt == MAX_RETRIES or not throttled(e):
+                        raise
+                    outcome = e
+                else:
+                    if attempt == MAX_RETRIES or not throttled(outcome):
+                        return outcome
+            # Throttled: back off outside the semaphore and slow everyone else down too
+            self._count("throttled")
+            self._count("retries")
+            delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+            self.bucket.pause(delay)
+            time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+_limiters: Dict[str, ServiceLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _overrides() -> Dict[str, Dict[str, float]]:
+    raw = os.getenv("RATE_LIMIT_OVERRIDES")
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        print(f"Warning: Ignoring invalid RATE_LIMIT_OVERRIDES: {e}")
+        return {}
+
+
+def rate_limiting_enabled() -> bool:
+    return os.getenv("RATE_LIMIT_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+def get_limiter(service: str) -> ServiceLimiter:
+    limiter = _limiters.get(service)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(service)
+            if limiter is None:
+                config = dict(DEFAULT_LIMIT, **SERVICE_LIMITS.get(service, {}))
+                config.update(_overrides().get(service, {}))
+                limiter = ServiceLimiter(service, config["rate"], config["burst"], config["concurrency"])
+                _limiters[service] = limiter
+    return limiter
+
+
+def limiter_stats() -> Dict[str, Dict[str, float]]:
+    return {service: dict(limiter.stats) for service, limiter in list(_limiters.items())}
+
+
+def _limiter_metrics():
+    stats = limiter_stats()
+    for key, name, help in (
+        ("calls", "calls_total", "Attempts made through the rate limiter."),
+        ("throttled", "throttled_total", "Attempts that came back throttled."),
+        ("retries", "retries_total", "Retries after throttling."),
+        ("waited_seconds", "wait_seconds_total", "Time spent waiting for rate-limit tokens."),
+    ):
+        yield (f"cloud_orchestrator_rate_limit_{name}", "counter", help,
+               [({"service": service}, s[key]) for service, s in stats.items()])
+
+
+add_collector("rate_limit", _limiter_metrics)
+
+
+_current = threading.local()
+
+
+def current_service() -> Optional[str]:
+    """API of the @rate_limited tool running on this thread, if any."""
+    return getattr(_current, "service", None)
+
+
+def rate_limited(service: str) -> Callable:
+    """
+    Mark the decorated tool as calling `service`: run_limited / check_output_limited
+    inside it go through that service's limiter. The tool itself is neither
+    throttled nor retried. Latency, errors and in-flight calls are recorded per
+    tool under the "tool" stage.
+    """
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            previous, _current.service = current_service(), service
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _current.service = previous
+        return instrumented("tool", fn.__name__)(wrapper)
+    return decorator
+
+
+def limited(service: Optional[str], fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    fn(*args, **kwargs) as one request against `service`; runs directly when there
+    is none. `throttled` may replace is_throttled for results only the caller can read.
+    """
+    throttled = kwargs.pop("throttled", is_throttled)
+    if service is None or not rate_limiting_enabled():
+        return fn(*args, **kwargs)
+    return get_limiter(service).call(fn, *args, throttled=throttled, **kwargs)
+
+
+def run_limited(*args, **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run, limited and retried as one request of the current tool's API."""
+    return limited(current_service(), subprocess.run, *args, **kwargs)
+
+
+def check_output_limited(*args, **kwargs) -> Any:
+    """subprocess.check_output, limited and retried as one request of the current tool's API."""
+    return limited(current_service(), subprocess.check_output, *args, **kwargs)
@@ -0,0 +1,150 @@
+"""
+Cached view of the APIs enabled on each project.
+
+The enabled-service list is fetched once per project (REST when ADC is
+available, `gcloud services list` otherwise) and kept for a few minutes, so
+tools check membership in memory instead of running `gcloud services enable`
+on every call. Missing APIs are enabled in one batch; enable_apis_for_plan does
+that for a whole tool plan before execution starts.
+"""
+import os
+import subprocess
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .gcp_client import SERVICE_USAGE_API, request, rest_available
+
+ENABLED_SERVICES_TTL_SECONDS = float(os.getenv("ENABLED_SERVICES_TTL_SECONDS", "600"))
+# serviceusage batchEnable accepts at most 20 services per call
+BATCH_ENABLE_LIMIT = 20
+
+
+class ServiceRegistry:
+    def __init__(self, ttl: float = ENABLED_SERVICES_TTL_SECONDS):
+        self.ttl = ttl
+        self._enabled: Dict[str, Tuple[Set[str], float]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, project_id: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(project_id, threading.Lock())
+
+    def enabled_services(self, project_id: str, refresh: bool = False) -> Set[str]:
+        cached = self._enabled.get(project_id)
+        if not refresh and cached and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+        with self._lock(project_id):
+            cached = self._enabled.get(project_id)
+            if refresh or not cached or time.monotonic() - cached[1] >= self.ttl:
+                cached = (self._list_enabled(project_id), time.monotonic())
+                self._enabled[project_id] = cached
+            return cached[0]
+
+    def is_enabled(self, project_id: str, api: str) -> bool:
+        return api in self.enabled_services(project_id)
+
+    def ensure_enabled(self, project_id: str, apis: Iterable[str]) -> List[str]:
+        """Enable whichever of `apis` are not enabled yet; returns the ones that were enabled."""
+        wanted = {api for api in apis if api}
+        missing = sorted(wanted - self.enabled_services(project_id))
+        if missing:
+            self.enable(project_id, missing)
+        return missing
+
+    def enable(self, project_id: str, apis: List[str]) -> None:
+        """Enable `apis` unconditionally (batched) and record them as enabled."""
+        with self._lock(project_id):
+            if rest_available():
+                for i in range(0, len(apis), BATCH_ENABLE_LIMIT):
+                    self._batch_enable_rest(project_id, apis[i:i + BATCH_ENABLE_LIMIT])
+            else:
+                subprocess.run(
+                    ["gcloud", "services", "enable", *apis, f"--project={project_id}"],
+                    check=True, capture_output=True, text=True,
+                )
+            cached = self._enabled.get(project_id)
+            if cached:
+                cached[0].update(apis)
+
+    def invalidate(self, project_id: Optional[str] = None) -> None:
+        if project_id is None:
+            self._enabled.clear()
+        else:
+            self._enabled.pop(project_id, None)
+
+    def _list_enabled(self, project_id: str) -> Set[str]:
+        if rest_available():
+            enabled, page_token = set(), None
+            while True:
+                params = {"filter": "state:ENABLED", "pageSize": 200}
+                if page_token:
+                    params["pageToken"] = page_token
+                page = request("GET", f"{SERVICE_USAGE_API}/projects/{project_id}/services", params=params)
+                enabled.update(s["config"]["name"] for s in page.get("services", []))
+                page_token = page.get("nextPageToken")
+                if not page_token:
+                    return enabled
+        result = subprocess.run(
+            ["gcloud", "services", "list", "--enabled", f"--project={project_id}", "--format=value(config.name)"],
+            check=True, capture_output=True, text=True,
+        )
+        return {line.strip() for line in result.stdout.splitlines() if line.strip()}
+
+    def _batch_enable_rest(self, project_id: str, apis: List[str]) -> None:
+        from .gcp_client import wait_operation
+        from .lro import google_operation_done
+
+        op = request("POST", f"{SERVICE_USAGE_API}/projects/{project_id}/services:batchEnable",
+                     body={"serviceIds": apis})
+        if not op.get("done"):
+            wait_operation(google_operation_done(f"{SERVICE_USAGE_API}/{op['name']}"),
+                           name=f"enable {', '.join(apis)}", kind="serviceusage", timeout=300)
+        if op.get("error"):
+            raise RuntimeError(op["error"].get("message", str(op["error"])))
+
+
+_registry: Optional[ServiceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_service_registry() -> ServiceRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ServiceRegistry()
+    return _registry
+
+
+def ensure_enabled(project_id: str, apis: Iterable[str]) -> List[str]:
+    return get_service_registry().ensure_enabled(project_id, apis)
+
+
+def apis_by_project(tool_plan: List[Dict[str, Any]]) -> Dict[str, Set[str]]:
+    """{project_id: {api, ...}} for every step that names a project and maps to an API."""
+    from ..planner_agent.tools.capability_index import api_for_action, get_capability_index
+
+    index = get_capability_index()
+    needed: Dict[str, Set[str]] = {}
+    for step in tool_plan:
+        action = step.get("action") or ""
+        project_id = (step.get("params") or {}).get("project_id")
+        spec = index.spec(action)
+        api = (spec.api if spec is not None else None) or api_for_action(action)
+        if project_id and api:
+            needed.setdefault(project_id, set()).add(api)
+    return needed
+
+
+def enable_apis_for_plan(tool_plan: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Enable, in one batch per project, every API the plan's steps will call."""
+    enabled: Dict[str, List[str]] = {}
+    errors: Dict[str, str] = {}
+    for project_id, apis in apis_by_project(tool_plan).items():
+        try:
+            enabled[project_id] = ensure_enabled(project_id, apis)
+        except Exception as e:
+            errors[project_id] = str(e)
+    return {"status": "error" if errors else "success", "enabled": enabled, "errors": errors}
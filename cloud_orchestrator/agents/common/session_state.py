@@ -0,0 +1,76 @@
+"""
+TTL cache in ADK session state for values that are slow to look up.
+
+check_gcloud_auth stores the account `gcloud auth list` reported in the session,
+next to a `<key>_cached_at` timestamp. gcloud's config is global to the machine,
+so a later turn only reuses the account while it is fresh and gcloud's config
+files still name it; reading those files is done in-process, so a hit starts
+no gcloud at all. The value stays a plain state entry, so agent instructions
+can show it as {gcp_account?}.
+
+Tools get the state through the tool_context argument ADK injects; without one
+(called outside a session) every lookup misses and nothing is stored.
+"""
+import configparser
+import os
+import time
+from typing import Any, Optional
+
+ACCOUNT_KEY = "gcp_account"
+
+AUTH_STATE_TTL_SECONDS = float(os.getenv("AUTH_STATE_TTL_SECONDS", "900"))
+
+
+def _stamp_key(key: str) -> str:
+    return f"{key}_cached_at"
+
+
+def get_cached(tool_context: Any, key: str, ttl: float) -> Optional[Any]:
+    """The value stored under `key` if it is younger than `ttl` seconds, else None."""
+    if tool_context is None:
+        return None
+    state = tool_context.state
+    stored_at = state.get(_stamp_key(key))
+    if stored_at is None or time.time() - stored_at >= ttl:
+        return None
+    return state.get(key)
+
+
+def put_cached(tool_context: Any, key: str, value: Any) -> None:
+    if tool_context is None:
+        return
+    # Wall-clock time: session state outlives the process when sessions are persisted
+    tool_context.state[key] = value
+    tool_context.state[_stamp_key(key)] = time.time()
+
+
+def _gcloud_config_dir() -> str:
+    if os.getenv("CLOUDSDK_CONFIG"):
+        return os.environ["CLOUDSDK_CONFIG"]
+    if os.name == "nt":
+        return os.path.join(os.getenv("APPDATA", ""), "gcloud")
+    return os.path.join(os.path.expanduser("~"), ".config", "gcloud")
+
+
+def gcloud_account() -> Optional[str]:
+    """
+    The account gcloud is set to use, read from its config files the way gcloud
+    resolves it (CLOUDSDK_CORE_ACCOUNT, then [core] account of the active
+    configuration). None when unset, e.g. after `gcloud auth revoke`.
+    """
+    if os.getenv("CLOUDSDK_CORE_ACCOUNT"):
+        return os.environ["CLOUDSDK_CORE_ACCOUNT"]
+    config_dir = _gcloud_config_dir()
+    name = os.getenv("CLOUDSDK_ACTIVE_CONFIG_NAME", "")
+    if not name:
+        try:
+            with open(os.path.join(config_dir, "active_config")) as f:
+                name = f.read().strip()
+        except OSError:
+            pass
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read(os.path.join(config_dir, "configurations", f"config_{name or 'default'}"))
+    except configparser.Error:
+        return None
+    return parser.get("core", "account", fallback="").strip() or None
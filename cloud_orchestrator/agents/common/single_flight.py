@@ -0,0 +1,116 @@
+"""
+In-flight request coalescing.
+
+Concurrent callers with the same key share one execution instead of each running
+it: do() for plain calls, stream() for generators whose items every caller should
+see. Nothing is kept once the execution finishes, so a later call runs again
+(pair with a cache for that).
+
+    _plans = SingleFlight()
+    plan = _plans.do(("set up a pipeline", "my-project"), build_plan, prompt)
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+
+
+class _Broadcast:
+    """Items from one producer, replayed in full to every subscriber."""
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+
+    def publish(self, item: Any) -> None:
+        with self._cond:
+            self.items.append(item)
+            self._cond.notify_all()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        with self._cond:
+            self.done, self.error = True, error
+            self._cond.notify_all()
+
+    def subscribe(self) -> Iterator[Any]:
+        position = 0
+        while True:
+            with self._cond:
+                while position >= len(self.items) and not self.done:
+                    self._cond.wait()
+                if position >= len(self.items):
+                    if self.error is not None:
+                        raise self.error
+                    return
+                item = self.items[position]
+            position += 1
+            yield item
+
+
+class SingleFlight:
+    def __init__(self, name: str = "single-flight"):
+        self.name = name
+        self._calls: Dict[Hashable, Future] = {}
+        self._streams: Dict[Hashable, _Broadcast] = {}
+        self._lock = threading.Lock()
+        self._stats = {"executions": 0, "shared": 0}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """fn(*args, **kwargs), or the result of the identical call already in flight."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self._stats["executions"] += 1
+            else:
+                self._stats["shared"] += 1
+        if not leader:
+            return future.result()
+        try:
+            value = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stream(self, key: Hashable, factory: Callable[[], Iterable[Any]]) -> Iterator[Any]:
+        """
+        Items of factory(), produced once per key while in flight.
+
+        The producer runs on its own thread, so it finishes for the remaining
+        subscribers even if the caller that started it stops reading.
+        """
+        with self._lock:
+            broadcast = self._streams.get(key)
+            if broadcast is None:
+                broadcast = self._streams[key] = _Broadcast()
+                self._stats["executions"] += 1
+                threading.Thread(target=self._produce, args=(key, broadcast, factory),
+                                 name=f"{self.name}-stream", daemon=True).start()
+            else:
+                self._stats["shared"] += 1
+        return broadcast.subscribe()
+
+    def _produce(self, key: Hashable, broadcast: _Broadcast, factory: Callable[[], Iterable[Any]]) -> None:
+        error = None
+        try:
+            for item in factory():
+                broadcast.publish(item)
+        except BaseException as e:
+            error = e
+        finally:
+            with self._lock:
+                if self._streams.get(key) is broadcast:
+                    del self._streams[key]
+            broadcast.finish(error)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls) + len(self._streams))
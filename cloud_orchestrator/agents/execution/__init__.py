@@ -0,0 +1,3 @@
+from .executor import execute_plan
+from .jobs import JobQueue, QueueFull
+from .registry import ACTION_TOOLS, register_action, resolve_action
@@ -0,0 +1,276 @@
+"""
+Parallel executor for planner tool plans.
+
+A tool plan is a list of {"action": ..., "params": {...}} steps, as produced by
+expand_to_tool_plan or build_tool_plan. Dependencies come from each step's
+"depends_on" (step ids or service names) when the plan has them, otherwise from
+the canonical service edges the fast path uses. Steps run on a bounded thread pool
+as soon as their dependencies succeed, so wall time follows the longest dependency
+chain rather than the sum of all steps. A failed step fails only its dependents.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..common.service_registry import enable_apis_for_plan
+from ..planner_agent.tools.capability_index import get_capability_index
+from ..planner_agent.tools.dag_scheduler import describe_problems, schedule_dag, schedule_summary
+from ..planner_agent.tools.fast_path import fast_build_service_dag
+from .journal import ExecutionJournal, journal_enabled, params_hash, plan_hash
+from .registry import bind_params, resolve_action
+
+DEFAULT_MAX_WORKERS = 4
+
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def default_max_workers() -> int:
+    try:
+        return max(1, int(os.getenv("PLAN_EXECUTOR_MAX_WORKERS", DEFAULT_MAX_WORKERS)))
+    except ValueError:
+        return DEFAULT_MAX_WORKERS
+
+
+def _is_error(result: Any) -> bool:
+    """Worker tools report failure either with status=error or with an 'error' key."""
+    if not isinstance(result, dict):
+        return False
+    status = str(result.get("status", "")).lower()
+    if status in ("error", "failed", "failure"):
+        return True
+    return bool(result.get("error")) and status not in ("success", "ok", "complete")
+
+
+# ───────────────────────── Plan → step graph ───────────────────────── #
+
+def normalize_steps(tool_plan: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Give every step an id, a params dict and (if known) its service."""
+    index = get_capability_index()
+    steps, used = [], set()
+    for i, raw in enumerate(tool_plan):
+        action = raw.get("action", "")
+        step_id = str(raw.get("id") or f"{i + 1}:{action}")
+        while step_id in used:
+            step_id = f"{step_id}#{i + 1}"
+        used.add(step_id)
+        steps.append({
+            "id": step_id,
+            "action": action,
+            "params": dict(raw.get("params") or {}),
+            "service": raw.get("service") or index.service_for_action(action),
+            "depends_on": raw.get("depends_on"),
+        })
+    return steps
+
+
+def build_step_graph(steps: List[Dict[str, Any]]) -> Tuple[Dict[str, List[str]], List[str]]:
+    """
+    Return ({step id: [step ids it waits for]}, warnings).
+
+    Explicit depends_on entries may name a step id or a service. Plans without any
+    depends_on fall back to the canonical service edges; steps of the same service
+    keep their plan order, and steps whose service is unknown run after the step
+    before them.
+    """
+    by_service: Dict[str, List[str]] = {}
+    for step in steps:
+        if step["service"]:
+            by_service.setdefault(step["service"], []).append(step["id"])
+    ids = {step["id"] for step in steps}
+    graph: Dict[str, List[str]] = {}
+    warnings: List[str] = []
+
+    if any(step["depends_on"] is not None for step in steps):
+        for step in steps:
+            deps: List[str] = []
+            for dep in step["depends_on"] or []:
+                if dep in ids:
+                    targets = [dep]
+                elif dep in by_service:
+                    targets = by_service[dep]
+                else:
+                    warnings.append(f"{step['id']}: dependency '{dep}' is not in the plan, ignoring it")
+                    targets = []
+                deps.extend(t for t in targets if t != step["id"] and t not in deps)
+            graph[step["id"]] = deps
+        return graph, warnings
+
+    service_dag = fast_build_service_dag(by_service)
+    last_of_service: Dict[str, str] = {}
+    previous: Optional[str] = None
+    for step in steps:
+        svc = step["service"]
+        if svc is None:
+            deps = [previous] if previous else []
+        else:
+            deps = [sid for dep_svc in service_dag.get(svc, []) for sid in by_service[dep_svc]]
+            if svc in last_of_service:
+                deps.append(last_of_service[svc])
+            last_of_service[svc] = step["id"]
+        graph[step["id"]] = deps
+        previous = step["id"]
+    return graph, warnings
+
+
+# ───────────────────────── Execution ───────────────────────── #
+
+def run_step(step: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one step in the calling thread and return its record; never raises."""
+    record = {"id": step["id"], "action": step["action"], "service": step["service"]}
+    started = time.time()
+    try:
+        # Resolving imports the tool module, so import errors fail this step, not the plan
+        fn = resolve_action(step["action"])
+        if fn is None:
+            return dict(record, status=FAILED, error=f"No tool registered for action '{step['action']}'")
+
+        kwargs, missing, ignored = bind_params(fn, step["params"])
+        if ignored:
+            record["ignored_params"] = ignored
+        if missing:
+            return dict(record, status=FAILED, error=f"Missing required params: {', '.join(missing)}")
+
+        started = time.time()
+        result = fn(**kwargs)
+        status = FAILED if _is_error(result) else SUCCEEDED
+        record.update(status=status, result=result)
+    except Exception as e:
+        record.update(status=FAILED, error=f"{type(e).__name__}: {e}")
+    record["started_at"] = started
+    record["duration_s"] = round(time.time() - started, 3)
+    return record
+
+
+def execute_plan(tool_plan: List[Dict[str, Any]], max_workers: Optional[int] = None,
+                 resume: bool = False, journal: Optional[ExecutionJournal] = None,
+                 plan_id: Optional[str] = None, enable_apis: bool = True) -> Dict[str, Any]:
+    """
+    Execute a tool plan, running independent steps concurrently.
+
+    Every step is recorded in an ExecutionJournal (unless EXECUTION_JOURNAL_DISABLED
+    is set). With resume=True, steps the journal already shows as succeeded with the
+    same params are not run again and their earlier result is reused. With
+    enable_apis, every API the remaining steps call is enabled up front, batched
+    per project, instead of each tool enabling its own.
+
+    Returns a summary dict with per-step records in plan order, the schedule waves
+    and the critical path. Steps whose dependencies failed are reported as skipped.
+    """
+    steps = normalize_steps(tool_plan)
+    graph, warnings = build_step_graph(steps)
+    schedule = schedule_dag(graph)
+    problem = describe_problems(schedule)
+    if problem:
+        return {"status": "error", "message": f"❌ Plan cannot be executed: {problem}", "warnings": warnings}
+
+    by_id = {step["id"]: step for step in steps}
+    waiting = {sid: set(deps) for sid, deps in graph.items()}
+    dependents: Dict[str, List[str]] = {sid: [] for sid in graph}
+    for sid, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(sid)
+
+    if journal is None and journal_enabled():
+        try:
+            journal = ExecutionJournal(plan_id or plan_hash(steps))
+        except OSError as e:
+            print(f"Warning: Could not open execution journal: {e}")
+
+    records: Dict[str, Dict[str, Any]] = {}
+    if resume and journal is not None:
+        for sid, previous in journal.completed_steps().items():
+            step = by_id.get(sid)
+            if step is None or previous.get("params_hash") != params_hash(step["params"]):
+                continue
+            records[sid] = {
+                "id": sid, "action": step["action"], "service": step["service"],
+                "status": SUCCEEDED, "result": previous.get("result"), "resumed": True,
+                "duration_s": 0.0,
+            }
+    if journal is not None:
+        journal.run_started(steps, resumed=len(records))
+
+    apis_enabled: Dict[str, List[str]] = {}
+    if enable_apis:
+        pending = [step for step in steps if step["id"] not in records]
+        enablement = enable_apis_for_plan(pending)
+        apis_enabled = {p: apis for p, apis in enablement["enabled"].items() if apis}
+        for project_id, error in enablement["errors"].items():
+            warnings.append(f"Could not pre-enable APIs for {project_id}: {error}")
+
+    def submit(pool, running, sid):
+        if journal is not None:
+            journal.step_started(by_id[sid])
+        running[pool.submit(run_step, by_id[sid])] = sid
+
+    def release(sid) -> List[str]:
+        """Mark sid as satisfied for its dependents and return those now ready."""
+        ready = []
+        for child in dependents[sid]:
+            waiting[child].discard(sid)
+            if not waiting[child] and child not in records:
+                ready.append(child)
+        return ready
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max_workers or default_max_workers(),
+                            thread_name_prefix="plan-step") as pool:
+        running = {}
+        # Resumed steps count as done; walk them in order so their dependents unlock
+        ready = [sid for sid in schedule.order if not waiting[sid] and sid not in records]
+        for sid in schedule.order:
+            if sid in records:
+                ready.extend(child for child in release(sid) if child not in ready)
+        for sid in ready:
+            submit(pool, running, sid)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                sid = running.pop(future)
+                records[sid] = future.result()
+                if journal is not None:
+                    journal.step_finished(by_id[sid], records[sid])
+                if records[sid]["status"] != SUCCEEDED:
+                    continue
+                for child in release(sid):
+                    submit(pool, running, child)
+
+    # Anything that never ran sits downstream of a failure
+    for sid in schedule.order:
+        if sid not in records:
+            blocked_by = [dep for dep in graph[sid] if records[dep]["status"] != SUCCEEDED]
+            records[sid] = {
+                "id": sid, "action": by_id[sid]["action"], "service": by_id[sid]["service"],
+                "status": SKIPPED, "error": f"Skipped because {', '.join(blocked_by)} did not succeed",
+            }
+
+    ordered = [records[step["id"]] for step in steps]
+    counts = {s: sum(1 for r in ordered if r["status"] == s) for s in (SUCCEEDED, FAILED, SKIPPED)}
+    if counts[SUCCEEDED] == len(ordered):
+        status, message = "success", f"✅ All {len(ordered)} steps succeeded"
+    elif counts[SUCCEEDED]:
+        status, message = "partial", (f"⚠️ {counts[SUCCEEDED]} succeeded, {counts[FAILED]} failed, "
+                                      f"{counts[SKIPPED]} skipped")
+    else:
+        status, message = "error", f"❌ No steps succeeded ({counts[FAILED]} failed, {counts[SKIPPED]} skipped)"
+
+    summary = {
+        "status": status,
+        "message": message,
+        "steps": ordered,
+        "counts": counts,
+        "elapsed_s": round(time.time() - started, 3),
+        "schedule": schedule_summary(schedule),
+        "warnings": warnings,
+    }
+    if apis_enabled:
+        summary["apis_enabled"] = apis_enabled
+    if journal is not None:
+        journal.run_finished(summary)
+        summary.update(plan_id=journal.plan_id, journal_path=journal.path)
+    if resume:
+        summary["counts"]["resumed"] = sum(1 for r in ordered if r.get("resumed"))
+    return summary
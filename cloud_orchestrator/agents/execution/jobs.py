@@ -0,0 +1,146 @@
+"""
+Bounded background job queue for planning and execution requests.
+
+submit() puts a job on a fixed-size queue and returns at once with its id; a fixed
+pool of worker threads runs jobs in arrival order, and get() reports status,
+progress and the result. When the queue is full submit() raises QueueFull, so the
+HTTP layer can answer 429 instead of piling up open connections. Configure with:
+  JOB_QUEUE_SIZE=32        jobs waiting to run
+  JOB_WORKERS=4            jobs running at once
+  JOB_RETENTION_SECONDS=3600  how long finished jobs stay pollable
+"""
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_WORKERS = 4
+DEFAULT_RETENTION_SECONDS = 3600
+MAX_RETAINED_JOBS = 1000
+
+# A handler gets the job payload and a progress callback, and returns the result
+Handler = Callable[[Dict[str, Any], Callable[[str, Any], None]], Any]
+
+
+class QueueFull(Exception):
+    """Raised by submit() when the queue is saturated."""
+
+
+class Job:
+    def __init__(self, kind: str, payload: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress: List[Dict[str, Any]] = []
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+    def report(self, event: str, data: Any = None) -> None:
+        self.progress.append({"event": event, "data": data, "at": round(time.time(), 3)})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": list(self.progress),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+class JobQueue:
+    def __init__(self, handlers: Dict[str, Handler], queue_size: Optional[int] = None,
+                 workers: Optional[int] = None, retention_seconds: Optional[float] = None):
+        self.handlers = dict(handlers)
+        self.queue_size = queue_size or _env_int("JOB_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)
+        self.workers = workers or _env_int("JOB_WORKERS", DEFAULT_WORKERS)
+        self.retention_seconds = (retention_seconds if retention_seconds is not None
+                                  else float(os.getenv("JOB_RETENTION_SECONDS", DEFAULT_RETENTION_SECONDS)))
+        self._queue: "queue.Queue[Job]" = queue.Queue(maxsize=self.queue_size)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._running = 0
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind '{kind}'; expected one of {sorted(self.handlers)}")
+        self.start()
+        job = Job(kind, payload)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise QueueFull(f"Job queue is full ({self.queue_size} waiting)") from None
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"queued": self._queue.qsize(), "running": self._running,
+                    "capacity": self.queue_size, "workers": self.workers, "retained": len(self._jobs)}
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        for job_id, job in list(self._jobs.items()):
+            finished = job.finished_at is not None
+            if finished and (job.finished_at < cutoff or len(self._jobs) > MAX_RETAINED_JOBS):
+                del self._jobs[job_id]
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self._running += 1
+            job.status, job.started_at = RUNNING, time.time()
+            try:
+                job.result = self.handlers[job.kind](job.payload, job.report)
+                status = SUCCEEDED
+            except Exception as e:
+                job.error, status = str(e), FAILED
+            # Pollers that see a final status also see its finish time
+            job.finished_at = time.time()
+            job.status = status
+            with self._lock:
+                self._running -= 1
+            self._queue.task_done()
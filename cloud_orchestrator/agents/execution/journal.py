@@ -0,0 +1,174 @@
+"""
+Append-only JSONL journal for tool-plan executions.
+
+Each plan gets its own file, named after a hash of its steps, under
+EXECUTION_JOURNAL_DIR (default: <tmpdir>/cloud_orchestrator_journal). Every step
+writes a "started" and a "finished" record with its inputs, outputs, timing and
+status. A resumed run reads the file back and skips steps that already succeeded
+with the same params, so retrying after a crash only repeats the unfinished work.
+
+The directory is private to the user (0700, files 0600), and sensitive values are
+masked in params, results and errors before they are written.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+DEFAULT_JOURNAL_DIR = os.path.join(tempfile.gettempdir(), "cloud_orchestrator_journal")
+
+# Param name parts whose values are never written to disk ("data" is a secret payload)
+_SENSITIVE = frozenset({"password", "token", "credential", "credentials", "data", "payload", "key"})
+# name=value / --flag=value / "name": "value" pairs in free text (errors, command lines)
+_SENSITIVE_TEXT = re.compile(
+    r"(?i)((?:password|passwd|token|secret|credentials?|api[_-]?key)[\w-]*[\"']?\s*[=:]\s*[\"']?)[^\s\"',;&]+"
+)
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def params_hash(params: Dict[str, Any]) -> str:
+    return hashlib.sha256(_canonical(params).encode("utf-8")).hexdigest()[:16]
+
+
+def plan_hash(steps: List[Dict[str, Any]]) -> str:
+    """
+    Identify a plan by its step ids and actions. Params are left out so that filling
+    in a missing value and retrying still finds the earlier run; each step's own
+    params hash decides whether its previous result can be reused.
+    """
+    key = [[s["id"], s["action"]] for s in steps]
+    return hashlib.sha256(_canonical(key).encode("utf-8")).hexdigest()[:16]
+
+
+def _is_sensitive(name: Any) -> bool:
+    return bool(_SENSITIVE.intersection(str(name).lower().replace("-", "_").split("_")))
+
+
+def redact(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: ("***" if v is not None and _is_sensitive(k) else v) for k, v in params.items()}
+
+
+def redact_output(value: Any, secrets: List[str] = ()) -> Any:
+    """
+    Mask a tool result or error: values under sensitive keys, the step's own
+    sensitive param values wherever they appear, and name=value secrets in text.
+    """
+    if isinstance(value, dict):
+        return {k: ("***" if v is not None and _is_sensitive(k) else redact_output(v, secrets))
+                for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact_output(v, secrets) for v in value]
+    if isinstance(value, str):
+        for secret in secrets:
+            value = value.replace(secret, "***")
+        return _SENSITIVE_TEXT.sub(r"\1***", value)
+    return value
+
+
+def _secret_values(params: Dict[str, Any]) -> List[str]:
+    # Longest first so a secret containing another is masked whole; very short values would mask noise
+    values = {str(v) for k, v in params.items() if v is not None and _is_sensitive(k) and len(str(v)) >= 4}
+    return sorted(values, key=len, reverse=True)
+
+
+def journal_enabled() -> bool:
+    return os.getenv("EXECUTION_JOURNAL_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+class ExecutionJournal:
+    """One JSONL file per plan; safe to write from several executor threads."""
+
+    def __init__(self, plan_id: str, directory: Optional[str] = None):
+        self.plan_id = plan_id
+        self.directory = directory or os.getenv("EXECUTION_JOURNAL_DIR", DEFAULT_JOURNAL_DIR)
+        self.path = os.path.join(self.directory, f"{plan_id}.jsonl")
+        self.run_id = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        try:
+            # Tighten a directory left by an older version; fails harmlessly if another user owns it
+            os.chmod(self.directory, 0o700)
+        except OSError:
+            pass
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        record = dict(record, ts=time.time(), run_id=self.run_id, plan_id=self.plan_id)
+        line = json.dumps(record, default=str)
+        with self._lock:
+            try:
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                with os.fdopen(fd, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                # Losing the journal must not fail the provisioning step itself
+                print(f"Warning: Could not write execution journal {self.path}: {e}")
+
+    def run_started(self, steps: List[Dict[str, Any]], resumed: int) -> None:
+        self._append({"event": "run_started", "steps": len(steps), "resumed_steps": resumed})
+
+    def step_started(self, step: Dict[str, Any]) -> None:
+        self._append({
+            "event": "step_started",
+            "step_id": step["id"],
+            "action": step["action"],
+            "params": redact(step["params"]),
+            "params_hash": params_hash(step["params"]),
+        })
+
+    def step_finished(self, step: Dict[str, Any], record: Dict[str, Any]) -> None:
+        secrets = _secret_values(step["params"])
+        self._append({
+            "event": "step_finished",
+            "step_id": step["id"],
+            "action": step["action"],
+            "params_hash": params_hash(step["params"]),
+            "status": record.get("status"),
+            "started_at": record.get("started_at"),
+            "duration_s": record.get("duration_s"),
+            "result": redact_output(record.get("result"), secrets),
+            "error": redact_output(record.get("error"), secrets),
+        })
+
+    def run_finished(self, summary: Dict[str, Any]) -> None:
+        self._append({
+            "event": "run_finished",
+            "status": summary.get("status"),
+            "counts": summary.get("counts"),
+            "elapsed_s": summary.get("elapsed_s"),
+        })
+
+    def read(self) -> List[Dict[str, Any]]:
+        """All records, skipping a torn last line left by a crash mid-write."""
+        records = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return records
+
+    def completed_steps(self) -> Dict[str, Dict[str, Any]]:
+        """step id -> last successful finish record, keyed to the params it ran with."""
+        done: Dict[str, Dict[str, Any]] = {}
+        for record in self.read():
+            if record.get("event") != "step_finished":
+                continue
+            if record.get("status") == "succeeded":
+                done[record["step_id"]] = record
+            else:
+                done.pop(record["step_id"], None)
+        return done
@@ -0,0 +1,126 @@
+"""
+Maps planner actions (e.g. "pubsub.create_topic") to the worker FunctionTools that
+implement them. Tool modules are imported on first use, so loading the registry
+does not pull in every agent's dependencies.
+"""
+import importlib
+import inspect
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# action -> (module relative to cloud_orchestrator.agents, function name)
+ACTION_TOOLS: Dict[str, Tuple[str, str]] = {
+    # Compute Engine
+    "compute.create_vm": ("worker_hub_agent.tools.computeengine", "create_vm"),
+    "compute.delete_vm": ("worker_hub_agent.tools.computeengine", "delete_vm"),
+    "compute.get_external_ip": ("worker_hub_agent.tools.computeengine", "get_external_ip"),
+    "compute.snapshot_disk": ("worker_hub_agent.tools.computeengine", "snapshot_disk"),
+    # BigQuery
+    "bigquery.create_dataset": ("worker_hub_agent.tools.bigquery", "create_dataset"),
+    "bigquery.create_table": ("worker_hub_agent.tools.bigquery", "create_table"),
+    "bigquery.insert_json": ("worker_hub_agent.tools.bigquery", "insert_json"),
+    "bigquery.export_table_gcs": ("worker_hub_agent.tools.bigquery", "export_table_gcs"),
+    # Pub/Sub
+    "pubsub.create_topic": ("worker_hub_agent.tools.pubsub", "create_topic"),
+    "pubsub.create_subscription": ("worker_hub_agent.tools.pubsub", "create_subscription"),
+    "pubsub.publish": ("worker_hub_agent.tools.pubsub", "publish"),
+    "pubsub.pull": ("worker_hub_agent.tools.pubsub", "pull"),
+    # Dataflow
+    "dataflow.launch_flex_template": ("worker_hub_agent.tools.dataflow", "launch_flex_template"),
+    "dataflow.monitor_job": ("worker_hub_agent.tools.dataflow", "monitor_job"),
+    "dataflow.cancel_job": ("worker_hub_agent.tools.dataflow", "cancel_job"),
+    "dataflow.list_jobs": ("worker_hub_agent.tools.dataflow", "list_jobs"),
+    # IAM
+    "iam.create_sa": ("worker_hub_agent.tools.iam", "create_sa"),
+    "iam.grant_role": ("worker_hub_agent.tools.iam", "grant_role"),
+    "iam.delete_sa": ("worker_hub_agent.tools.iam", "delete_sa"),
+    # Cloud Storage
+    "storage.create_bucket": ("worker_hub_agent.tools.cloud_storage", "create_bucket"),
+    "storage.upload_blob": ("worker_hub_agent.tools.cloud_storage", "upload_to_bucket"),
+    "storage.set_lifecycle_rule": ("worker_hub_agent.tools.cloud_storage", "set_lifecycle_rule"),
+    # Cloud SQL
+    "cloudsql.create_instance": ("worker_hub_agent.tools.cloud_sql_fix", "create_sql_instance"),
+    "cloudsql.import_sql": ("worker_hub_agent.tools.cloud_sql_fix", "import_sql_data"),
+    "cloudsql.delete_instance": ("worker_hub_agent.tools.cloud_sql_fix", "delete_sql_instance"),
+    # Firestore
+    "firestore.create_db": ("worker_hub_agent.tools.firestore", "create_firestore_db"),
+    "firestore.set_ttl": ("worker_hub_agent.tools.firestore", "set_ttl"),
+    # Artifact Registry
+    "artifactregistry.create_repo": ("worker_hub_agent.tools.cloud_artifacts", "create_docker_repository"),
+    # Cloud Monitoring
+    "cloudmonitoring.create_dashboard": ("worker_hub_agent.tools.cloudmonitoring", "create_dashboard"),
+    "cloudmonitoring.create_alert": ("worker_hub_agent.tools.cloudmonitoring", "create_alert"),
+    # Secret Manager
+    "secretmanager.create_secret": ("worker_hub_agent.tools.secret_manager", "create_secret"),
+    "secretmanager.add_version": ("worker_hub_agent.tools.secret_manager", "add_version"),
+    # GKE Autopilot
+    "gke.create_cluster": ("gke_worker_agent.tools.gke", "create_cluster"),
+    "gke.helm_install": ("gke_worker_agent.tools.gke", "helm_install"),
+    "gke.scale_deployment": ("gke_worker_agent.tools.gke", "scale_deployment"),
+    "gke.delete_cluster": ("gke_worker_agent.tools.gke", "delete_cluster"),
+    # Vertex AI
+    "vertex.train_custom": ("vertex_ai_agent.tools.vertex", "train_custom"),
+    "vertex.deploy_endpoint": ("vertex_ai_agent.tools.vertex", "deploy_endpoint"),
+    "vertex.batch_predict": ("vertex_ai_agent.tools.vertex", "batch_predict"),
+    "vertex.delete_endpoint": ("vertex_ai_agent.tools.vertex", "delete_endpoint"),
+}
+
+_AGENTS_PACKAGE = __package__.rsplit(".", 1)[0]
+_resolved: Dict[str, Callable[..., Any]] = {}
+_resolve_lock = threading.Lock()
+
+
+def is_supported(action: str) -> bool:
+    return action in ACTION_TOOLS
+
+
+def resolve_action(action: str) -> Optional[Callable[..., Any]]:
+    """Return the plain function behind the FunctionTool for an action, or None."""
+    fn = _resolved.get(action)
+    if fn is not None:
+        return fn
+    target = ACTION_TOOLS.get(action)
+    if target is None:
+        return None
+    module_name, attr = target
+    with _resolve_lock:
+        if action not in _resolved:
+            module = importlib.import_module(f"{_AGENTS_PACKAGE}.{module_name}")
+            tool = getattr(module, attr)
+            # FunctionTool wraps the callable; plain functions are used as-is
+            _resolved[action] = getattr(tool, "func", tool)
+    return _resolved[action]
+
+
+def register_action(action: str, fn: Callable[..., Any]) -> None:
+    """Bind an action to a callable directly (tests, or tools outside the table)."""
+    with _resolve_lock:
+        _resolved[action] = getattr(fn, "func", fn)
+
+
+def bind_params(fn: Callable[..., Any], params: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str], List[str]]:
+    """
+    Match plan params against the function signature.
+
+    Returns (kwargs to pass, missing required names, ignored param names). A required
+    argument set to None counts as missing: the planner uses None for "fill me in".
+    """
+    signature = inspect.signature(fn)
+    accepts_kwargs = any(p.kind is inspect.Parameter.VAR_KEYWORD for p in signature.parameters.values())
+    kwargs, missing, ignored = {}, [], []
+    for name, param in signature.parameters.items():
+        if param.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+            continue
+        value = params.get(name)
+        if value is None:
+            if param.default is inspect.Parameter.empty and name != "tool_context":
+                missing.append(name)
+            continue
+        kwargs[name] = value
+    for name, value in params.items():
+        if name not in signature.parameters:
+            if accepts_kwargs:
+                kwargs[name] = value
+            else:
+                ignored.append(name)
+    return kwargs, missing, ignored
@@ -14,11 +14,14 @@ import subprocess, tempfile, os, time
 from typing import Dict, List
 from google.adk.tools import FunctionTool
 
+from ...common.lro import get_poller, gke_cluster_deleted, wait_for
+from ...common.rate_limit import check_output_limited, rate_limited
+
 
 def _sh(cmd: List[str]) -> str:
     """Run a shell command and capture stdout; raise with stderr on failure."""
     try:
-        return subprocess.check_output(cmd, text=True, stderr=subprocess.STDOUT)
+        return check_output_limited(cmd, text=True, stderr=subprocess.STDOUT)
     except subprocess.CalledProcessError as exc:
         raise RuntimeError(exc.output.strip()) from exc
 
@@ -32,6 +35,7 @@ def _get_credentials(project_id: str, cluster_name: str, region: str):
 
 
 @FunctionTool
+@rate_limited("container.googleapis.com")
 def create_cluster(
     project_id: str,
     cluster_name: str,
@@ -59,6 +63,7 @@ def create_cluster(
 
 
 @FunctionTool
+@rate_limited("container.googleapis.com")
 def helm_install(
     project_id: str,
     cluster_name: str,
@@ -93,6 +98,7 @@ def helm_install(
 
 
 @FunctionTool
+@rate_limited("container.googleapis.com")
 def scale_deployment(
     project_id: str,
     cluster_name: str,
@@ -113,6 +119,7 @@ def scale_deployment(
         return {"status": "error", "error_message": str(e)}
 
 @FunctionTool
+@rate_limited("container.googleapis.com")
 def delete_cluster(
     project_id: str,
     cluster_name: str,
@@ -123,23 +130,24 @@ def delete_cluster(
     try:
         _sh([
             "gcloud", "container", "clusters", "delete", cluster_name,
-            f"--region={region}", f"--project={project_id}", "--quiet"
+            f"--region={region}", f"--project={project_id}", "--quiet", "--async"
         ])
-    
-        deadline = time.time() + wait_seconds
-        while time.time() < deadline:
-            try:
-                _sh([
-                    "gcloud", "container", "clusters", "describe", cluster_name,
-                    f"--region={region}", f"--project={project_id}", "--format=value(name)"
-                ])
-                time.sleep(10)
-            except RuntimeError:
-                return {"status": "success", "message": "cluster deleted"}
-        return {"status": "error", "error_message": "timeout waiting for delete"}
     except RuntimeError as e:
         return {"status": "error", "error_message": str(e)}
 
+    # Deletion is tracked by the shared poller (REST + backoff) instead of a describe loop
+    op_id, future = get_poller().watch(
+        gke_cluster_deleted(project_id, region, cluster_name),
+        name=f"delete GKE cluster {cluster_name}", kind="gke",
+        initial_delay=10, max_delay=60, timeout=wait_seconds,
+    )
+    outcome = wait_for(future)
+    if outcome["status"] != "success":
+        if outcome["error_message"].startswith("timeout"):
+            return {"status": "error", "error_message": "timeout waiting for delete", "operation_id": op_id}
+        return {"status": "error", "error_message": outcome["error_message"], "operation_id": op_id}
+    return {"status": "success", "message": "cluster deleted", "operation_id": op_id}
+
 
 def get_tools():
     
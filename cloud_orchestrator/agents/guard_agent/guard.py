@@ -1,6 +1,14 @@
 # guard.py
+import logging
 from google.adk.agents import Agent
-from .tools.check import check_budget, check_quota, fetch_budget_list, enable_service_api
+from .tools.check import (
+    check_budget,
+    check_projected_budget,
+    check_quota,
+    enable_service_api,
+    estimate_plan_cost,
+    fetch_budget_list,
+)
 
 guard_agent = Agent(
     name="guard_agent_v1",
@@ -10,15 +18,17 @@ guard_agent = Agent(
         "You are a GCP budget and quota compliance agent. Your task is to validate whether a user’s GCP infrastructure plan "
         "complies with current budget constraints and service quotas.\n\n"
         "- Use 'check_budget' to verify if the daily or monthly spend is within allowed limits.\n"
+        "- Use 'estimate_plan_cost' to estimate the hourly and monthly cost of a tool plan before it runs.\n"
+        "- Use 'check_projected_budget' to verify that spend to date plus the plan's projected spend stays within budget.\n"
         "- Use 'check_quota' to determine whether the planned usage of services in each region is within quota limits.\n"
         "- Use 'fetch_budget_list' to retrieve all budgets under a billing account and return a dictionary of names → (limit, spent).\n"
         "- Use 'enable_service_api' to enable any particular service API.\n\n"
-        "⚠️ IMPORTANT: When the result from 'check_quota' or 'check_budget' is BLOCK or WARN, "
+        "⚠️ IMPORTANT: When the result from 'check_quota', 'check_budget' or 'check_projected_budget' is BLOCK or WARN, "
         "you must print the entire 'message' returned by the tool exactly as it is, without summarizing or rephrasing. "
         "This includes Markdown links, all line breaks, and symbols such as ✅ ❌ ⚠️. Preserve the full formatting.\n\n"
         "Always respond with a clear status: OK / WARN / BLOCK and then the full tool message verbatim."
     ),
-    tools=[check_budget, check_quota, fetch_budget_list, enable_service_api],
+    tools=[check_budget, check_projected_budget, estimate_plan_cost, check_quota, fetch_budget_list, enable_service_api],
 )
 
-print(f"✅ Agent '{guard_agent.name}' created using model gemini-2.0-flash")
\ No newline at end of file
+logging.getLogger(__name__).info(f"✅ Agent '{guard_agent.name}' created using model gemini-2.0-flash")
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Readers for the tool-call params both plan estimators look at.
+
+usage_estimator (quota) and cost_estimator (price) take a call's region, counts
+and machine types from here, so a call is priced in the same region and with
+the same shape its quota is checked for.
+"""
+from typing import Any, Mapping
+
+try:
+    from .machine_types import MachineShape, machine_shape
+except ImportError:
+    # check.py may be loaded as a top-level module; its siblings come along the same way
+    from machine_types import MachineShape, machine_shape
+
+DEFAULT_REGION = "us-central1"
+
+
+def zone_region(zone: str) -> str:
+    """'us-central1-a' -> 'us-central1'."""
+    parts = zone.strip().split("-")
+    return "-".join(parts[:2]) if len(parts) >= 3 else zone.strip()
+
+
+def call_region(params: Mapping[str, Any], default: str = DEFAULT_REGION) -> str:
+    for key in ("region", "location"):
+        value = params.get(key)
+        if isinstance(value, str) and value.strip() and value.strip() != "global":
+            return value.strip()
+    for key in ("zone", "workerZone", "worker_zone"):
+        value = params.get(key)
+        if isinstance(value, str) and value.strip():
+            return zone_region(value)
+    return default
+
+
+def number_param(params: Mapping[str, Any], keys, default: float) -> float:
+    """First param among keys that parses as a non-negative number."""
+    for key in keys:
+        try:
+            value = float(params[key])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if value >= 0:
+            return value
+    return default
+
+
+def shape_param(params: Mapping[str, Any], keys, default: str) -> MachineShape:
+    """Catalog shape for the first machine-type param; unknown types use the default."""
+    for key in keys:
+        value = params.get(key)
+        if isinstance(value, str) and value.strip():
+            shape = machine_shape(value)
+            if shape is not None:
+                return shape
+            print(f"Warning: Unknown machine type {value!r}, estimating as {default}")
+            break
+    return machine_shape(default)
@@ -1,55 +1,145 @@
+import os
 import subprocess
 import json
-from typing import Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
 from google.adk.tools.function_tool import FunctionTool
 import urllib.parse
 
-@FunctionTool
-def check_budget(project_id: str, billing_account_id: str) -> dict:
-    """
-    Verifies the project's daily/monthly spend against the active Budgets API entry.
-    Returns one of: OK / WARN / BLOCK based on spend ratio.
-    """
-    import subprocess
-    import json
+try:
+    from ...common import gcp_client
+    from ...common.access_token import authorized_request
+    from ...common.cache import TTLCache
+    from ...common.service_registry import ensure_enabled
+    from ...common.metrics import add_collector, cache_collector, instrumented, track
+except ImportError:
+    # Loaded as a top-level module via sys.path (planner fallback); no shared caches or metrics
+    import contextlib
+    gcp_client = None
+    authorized_request = None
+    ensure_enabled = None
+    add_collector = cache_collector = None
+
+    def instrumented(stage, name=None):
+        return lambda fn: fn
+
+    def track(stage, name):
+        return contextlib.nullcontext()
+
+    class TTLCache:
+        def __init__(self, ttl, maxsize=0):
+            pass
+
+        def get_or_load(self, key, loader):
+            return loader()
+
+        def invalidate(self, key=None):
+            pass
+
+try:
+    from .quota_snapshot import get_quota_store
+    from .cost_estimator import estimate_cost
+except ImportError:
+    from quota_snapshot import get_quota_store
+    from cost_estimator import estimate_cost
+
+
+def _enable_api(project_id: str, service: str) -> bool:
+    """Enable an API unless the cached registry already lists it; True if it was enabled now."""
+    if ensure_enabled is not None:
+        return bool(ensure_enabled(project_id, [service]))
+    subprocess.run(
+        ["gcloud", "services", "enable", service, f"--project={project_id}"],
+        check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    return True
 
-    try:
-        # Step 1: Resolve project number from ID
-        number_result = subprocess.run([
+
+PROJECT_NUMBER_TTL_SECONDS = 3600
+BUDGET_CACHE_TTL_SECONDS = float(os.getenv("BUDGET_CACHE_TTL_SECONDS", "300"))
+QUOTA_FETCH_TIMEOUT_SECONDS = 30
+SERVICE_USAGE_BETA_API = "https://serviceusage.googleapis.com/v1beta1"
+
+_project_numbers = TTLCache(ttl=PROJECT_NUMBER_TTL_SECONDS)
+_budget_indexes = TTLCache(ttl=BUDGET_CACHE_TTL_SECONDS)
+
+if add_collector is not None:
+    add_collector("guard_caches", cache_collector(lambda: {
+        "project_number": (_project_numbers.hits, _project_numbers.misses),
+        "budget_index": (_budget_indexes.hits, _budget_indexes.misses),
+    }))
+
+
+def _project_number(project_id: str) -> str:
+    """Project number for an ID; cached, and concurrent lookups share one gcloud call."""
+    def load():
+        result = subprocess.run([
             "gcloud", "projects", "describe", project_id,
             "--format=value(projectNumber)"
         ], check=True, stdout=subprocess.PIPE)
-        project_number = number_result.stdout.decode().strip()
-        full_project_ref = f"projects/{project_number}"
+        return result.stdout.decode().strip()
+    return _project_numbers.get_or_load(project_id, load)
+
+
+class BudgetIndex:
+    """Budgets of one billing account, indexed by the project they are scoped to."""
+
+    def __init__(self, budgets: list):
+        self.budgets = budgets
+        self._unscoped = []
+        self._by_project = {}
+        for position, budget in enumerate(budgets):
+            projects = budget.get("budgetFilter", {}).get("projects", [])
+            if not projects:
+                self._unscoped.append(position)
+            for project_ref in projects:
+                self._by_project.setdefault(project_ref, []).append(position)
+
+    def for_project(self, project_ref: str) -> list:
+        """Budgets that apply to `projects/<number>` (or to all projects), in listing order."""
+        positions = sorted(self._unscoped + self._by_project.get(project_ref, []))
+        return [self.budgets[p] for p in positions]
 
-        # Step 2: Enable billingbudgets API (safe to re-run)
-        subprocess.run([
-            "gcloud", "services", "enable", "billingbudgets.googleapis.com",
-            "--project", project_id
-        ], check=True)
 
-        # Step 3: List budgets under billing account
+def _budget_index(billing_account_id: str) -> BudgetIndex:
+    def load():
         result = subprocess.run([
             "gcloud", "billing", "budgets", "list",
-            "--billing-account", billing_account_id,
+            f"--billing-account={billing_account_id}",
             "--format=json"
         ], check=True, stdout=subprocess.PIPE)
+        return BudgetIndex(json.loads(result.stdout) or [])
+    return _budget_indexes.get_or_load(billing_account_id, load)
 
 
-        budgets = json.loads(result.stdout)
+@FunctionTool
+def check_budget(project_id: str, billing_account_id: str) -> dict:
+    """
+    Verifies the project's daily/monthly spend against the active Budgets API entry.
+    Returns one of: OK / WARN / BLOCK based on spend ratio.
+    """
+    import subprocess
+    import json
 
-        if not budgets:
+    try:
+        # Step 1: Resolve project number from ID (cached)
+        full_project_ref = f"projects/{_project_number(project_id)}"
+
+        # Step 2: Enable billingbudgets API (skipped when already enabled)
+        _enable_api(project_id, "billingbudgets.googleapis.com")
+
+        # Step 3: List budgets under billing account (cached per billing account)
+        index = _budget_index(billing_account_id)
+
+        if not index.budgets:
             return {
                 "status": "WARN",
                 "message": f"⚠️ No budgets found for billing account '{billing_account_id}'."
             }
 
-        # Step 4: Match budgets that apply to the project (or to all projects)
-        matched_budgets = []
-        for budget in budgets:
-            projects = budget.get("budgetFilter", {}).get("projects", [])
-            if not projects or full_project_ref in projects:
-                matched_budgets.append(budget)
+        # Step 4: Budgets that apply to the project (or to all projects)
+        matched_budgets = index.for_project(full_project_ref)
         
         def create_budget_if_missing():
             create_cmd = [
@@ -61,6 +151,7 @@ def check_budget(project_id: str, billing_account_id: str) -> dict:
                 "--format=json"
             ]
             subprocess.run(create_cmd, check=True)
+            _budget_indexes.invalidate(billing_account_id)
 
         if not matched_budgets:
             try:
@@ -97,35 +188,106 @@ def check_budget(project_id: str, billing_account_id: str) -> dict:
                 results.append(f"✅ OK: {name} usage is within limits — ${spent} / ${amount}")
 
         status = "BLOCK" if any("BLOCK" in r for r in results) else "WARN" if any("WARN" in r for r in results) else "OK"
-        print('horse',status)
-        print('horsemen',result)
         return {
             "status": status,
             "message": "\n".join(results)
         }
 
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         return {
             "status": "ERROR",
             "message": f"❌ Failed to check budget: {e}"
         }
 
+def _hours_left_in_month(now: datetime = None) -> float:
+    now = now or datetime.now(timezone.utc)
+    month_end = datetime(now.year + now.month // 12, now.month % 12 + 1, 1, tzinfo=timezone.utc)
+    return (month_end - now).total_seconds() / 3600
+
+
+@FunctionTool
+def estimate_plan_cost(tool_calls: List[Dict[str, Any]]) -> dict:
+    """
+    Estimates the hourly and monthly cost of a tool plan offline from the local pricing table.
+
+    Args:
+        tool_calls: Tool calls from build_tool_plan or the tool_plan from expand_to_tool_plan
+
+    Returns:
+        dict with status, message, hourly and monthly cost, and per-call items
+    """
+    try:
+        estimate = estimate_cost(tool_calls)
+    except Exception as e:
+        return {"status": "ERROR", "message": f"❌ Failed to estimate plan cost: {e}"}
+
+    lines = [f"💰 Estimated cost: ${estimate['hourly']:.2f}/hour, ${estimate['monthly']:.2f}/month "
+             f"(pricing {estimate['pricing_version']})"]
+    for item in estimate["items"]:
+        lines.append(f"• {item['action']} in {item['region']}: ${item['monthly']:.2f}/month ({item['detail']})")
+    if estimate["unpriced"]:
+        lines.append(f"ℹ️ Not priced (free tier or usage-billed): {', '.join(sorted(set(estimate['unpriced'])))}")
+    return dict(estimate, status="OK", message="\n".join(lines))
+
+
+@FunctionTool
+def check_projected_budget(project_id: str, billing_account_id: str, tool_calls: List[Dict[str, Any]]) -> dict:
+    """
+    Checks budgets against spend to date plus the plan's projected spend for the rest of the month.
+    Returns one of: OK / WARN / BLOCK based on the projected spend ratio.
+    """
+    try:
+        estimate = estimate_cost(tool_calls)
+        projected = round(estimate["hourly"] * _hours_left_in_month(), 2)
+
+        matched_budgets = _budget_index(billing_account_id).for_project(f"projects/{_project_number(project_id)}")
+        if not matched_budgets:
+            return {
+                "status": "WARN",
+                "message": f"⚠️ No budget applies to project `{project_id}`; plan would add ~${projected} this month.",
+                "projected_spend": projected
+            }
+
+        results = []
+        for budget in matched_budgets:
+            name = budget.get("displayName", "Unnamed Budget")
+            amount = float(budget.get("amount", {}).get("specifiedAmount", {}).get("units", 0))
+            spent = float(budget.get("amountSpent", {}).get("units", 0))
+            total = spent + projected
+            ratio = total / amount if amount > 0 else 0
+
+            if ratio >= 1.0:
+                results.append(f"❌ BLOCK: {name} would be exceeded — ${spent} spent + ~${projected} planned / ${amount}")
+            elif ratio >= 0.9:
+                results.append(f"⚠️ WARN: {name} would near its limit — ${spent} spent + ~${projected} planned / ${amount}")
+            else:
+                results.append(f"✅ OK: {name} stays within limits — ${spent} spent + ~${projected} planned / ${amount}")
+
+        status = "BLOCK" if any("BLOCK" in r for r in results) else "WARN" if any("WARN" in r for r in results) else "OK"
+        return {
+            "status": status,
+            "message": "\n".join(results),
+            "projected_spend": projected,
+            "estimate": estimate
+        }
+
+    except Exception as e:
+        return {
+            "status": "ERROR",
+            "message": f"❌ Failed to check projected budget: {e}"
+        }
+
 @FunctionTool
 def fetch_budget_list(billing_account_id: str) -> Dict[str, Tuple[float, float]]:
     """
     Returns a dictionary of budgets under a billing account in the form:
     { "Budget Name": (limit_amount, spent_amount) }
 
-    Uses `gcloud billing budgets list` under the hood.
+    Uses `gcloud billing budgets list` under the hood, cached per billing account
+    for BUDGET_CACHE_TTL_SECONDS.
     """
     try:
-        result = subprocess.run([
-            "gcloud", "billing", "budgets", "list",
-            f"--billing-account={billing_account_id}",
-            "--format=json"
-        ], check=True, stdout=subprocess.PIPE)
-
-        budgets = json.loads(result.stdout)
+        budgets = _budget_index(billing_account_id).budgets
         if not budgets:
             return {}
 
@@ -156,17 +318,18 @@ def enable_service_api(project_id: str, service_name: str) -> dict:
         dict with status and a message indicating success or failure
     """
     try:
-        subprocess.run([
-            "gcloud", "services", "enable", service_name,
-            "--project", project_id
-        ], check=True)
+        if not _enable_api(project_id, service_name):
+            return {
+                "status": "OK",
+                "message": f"ℹ️ API '{service_name}' is already enabled for project '{project_id}'."
+            }
 
         return {
             "status": "OK",
             "message": f"✅ Successfully enabled API '{service_name}' for project '{project_id}'."
         }
 
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         return {
             "status": "ERROR",
             "message": f"❌ Failed to enable API '{service_name}' for project '{project_id}'. Details: {e}"
@@ -234,7 +397,36 @@ def request_quota_increase(project_id: str, service: str, metric: str, region: s
 
     return f"📧 Option 2: To manually request a quota increase via email, [click here]({mailto_link}) or copy the link below:\n{mailto_link}"
 
+def _quota_access_token() -> str:
+    result = subprocess.run(
+        ["gcloud", "auth", "application-default", "print-access-token"],
+        capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+def _fetch_quota_metrics(project_id: str, service: str) -> list:
+    """Live consumerQuotaMetrics for one service; raises when the fetch fails."""
+    url = f"{SERVICE_USAGE_BETA_API}/projects/{project_id}/services/{service}/consumerQuotaMetrics"
+    params = {"view": "FULL"}
+    with track("quota_fetch", service):
+        if gcp_client is not None and gcp_client.rest_available():
+            # Pooled session, per-host rate limit and throttling retries
+            page = gcp_client.request("GET", url, params=params, timeout=QUOTA_FETCH_TIMEOUT_SECONDS)
+            return page.get("metrics", [])
+        if authorized_request is not None:
+            response = authorized_request("GET", url, params=params, timeout=QUOTA_FETCH_TIMEOUT_SECONDS)
+        else:
+            import requests
+
+            response = requests.get(url, params=params, headers={"Authorization": f"Bearer {_quota_access_token()}"},
+                                    timeout=QUOTA_FETCH_TIMEOUT_SECONDS)
+    if response.status_code != 200:
+        raise RuntimeError(response.text)
+    return response.json().get("metrics", [])
+
 @FunctionTool
+@instrumented("guard", "check_quota")
 def check_quota(project_id: str, planned_usage: Dict[str, Dict[str, Dict[str, float]]]) -> dict:
     """
     Checks if planned usage fits within quota for any GCP service using the Service Usage API.
@@ -247,87 +439,73 @@ def check_quota(project_id: str, planned_usage: Dict[str, Dict[str, Dict[str, fl
 
     Returns:
         dict with overall status and quota comparison messages
+
+    Limits and usage come from the quota snapshot store (at most
+    QUOTA_SNAPSHOT_MAX_AGE_SECONDS old, default 5 minutes).
     """
-    import requests
     import subprocess
     import json
 
-    def get_access_token():
-        result = subprocess.run(
-            ["gcloud", "auth", "application-default", "print-access-token"],
-            capture_output=True, text=True, check=True
-        )
-        return result.stdout.strip()
-
-    token = get_access_token()
-    headers = {"Authorization": f"Bearer {token}"}
+    store = get_quota_store(_fetch_quota_metrics)
     status_list = []
     details = []
 
-    for service, region_map in planned_usage.items():
-        # Enable API
+    def prepare(service):
+        """Enable the API and get its quota snapshot; returns (snapshot or None, detail lines)."""
+        notes = []
         try:
-            subprocess.run(
-                ["gcloud", "services", "enable", service, f"--project={project_id}"],
-                check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-            )
-            details.append(f"🔧 Enabled API for {service}")
+            if _enable_api(project_id, service):
+                notes.append(f"🔧 Enabled API for {service}")
+            else:
+                notes.append(f"ℹ️ API {service} already enabled.")
         except subprocess.CalledProcessError as e:
             if "already enabled" in e.stderr.lower():
-                details.append(f"ℹ️ API {service} already enabled.")
+                notes.append(f"ℹ️ API {service} already enabled.")
             else:
-                details.append(f"❌ BLOCK: Failed to enable API '{service}':\n{e.stderr}")
-                status_list.append("BLOCK")
-                continue
-
-        # Fetch quotas
-        url = f"https://serviceusage.googleapis.com/v1beta1/projects/{project_id}/services/{service}/consumerQuotaMetrics?view=FULL"
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            details.append(f"❌ BLOCK: Failed to fetch quota for {service}: {response.text}")
+                return None, notes + [f"❌ BLOCK: Failed to enable API '{service}':\n{e.stderr}"]
+        except Exception as e:
+            return None, notes + [f"❌ BLOCK: Failed to enable API '{service}':\n{e}"]
+
+        # Quotas come from the snapshot store; fetched live only when stale
+        try:
+            return store.get(project_id, service), notes
+        except Exception as e:
+            return None, notes + [f"❌ BLOCK: Failed to fetch quota for {service}: {e}"]
+
+    # Services are independent: enable and fetch them concurrently, report in order
+    services = list(planned_usage)
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(services)))) as pool:
+        prepared = list(pool.map(prepare, services))
+
+    for service, (snapshot, notes) in zip(services, prepared):
+        details.extend(notes)
+        if snapshot is None:
             status_list.append("BLOCK")
             continue
-        
-        quota_data = response.json().get("metrics", [])
 
-        for region, metrics in region_map.items():
+        for region, metrics in planned_usage[service].items():
             for metric, planned in metrics.items():
-                matched = False
-                for q in quota_data:
-                    normalized_qmetric = q.get("metric", "").split("/")[-1].lower()
-                    if metric.lower() == normalized_qmetric:
-                        for limit in q.get("consumerQuotaLimits", []):
-                            for bucket in limit.get("quotaBuckets", []):
-                                is_global_quota = not bucket.get("dimensions") or "region" not in bucket["dimensions"]
-                                bucket_region = bucket.get("dimensions", {}).get("region")
-                                if bucket_region == region or is_global_quota:
-                                    limit_val = float(bucket.get("effectiveLimit", 0))
-                                    usage = float(bucket.get("usage", 0)) if "usage" in bucket else 0.0
-                                    remaining = limit_val - usage
-                                    if limit_val == -1:
-                                        details.append(f"✅ OK: No enforced quota for {metric} in {region} (limit = -1)")
-                                        status_list.append("OK")
-                                    elif planned > limit_val:
-                                        details.append(f"❌ BLOCK: {planned} > limit {limit_val} for {metric} in {region}")
-                                        status_list.append("BLOCK")
-                                        details.append(f"🔗 Option 1: {suggest_quota_increase(project_id, service, metric, region)}")
-                                        details.append(request_quota_increase(project_id, service, metric, region, planned))
-                                    elif planned > remaining:
-                                        details.append(f"⚠️ WARN: {planned} > available {remaining} for {metric} in {region}")
-                                        status_list.append("WARN")
-                                    else:
-                                        details.append(f"✅ OK: {planned} ≤ available {remaining} for {metric} in {region}")
-                                        status_list.append("OK")
-
-                                    matched = True
-                                    break  # found region match, stop inner loop
-                            if matched:
-                                break  # matched one bucket, skip to next metric
-                    if matched:
-                        break
-                if not matched:
+                bucket = snapshot.lookup(metric, region)
+                if bucket is None:
                     details.append(f"⚠️ WARN: No match found for {metric} in {region}")
                     status_list.append("WARN")
+                    continue
+
+                limit_val, remaining = bucket.limit, bucket.headroom
+                if limit_val == -1:
+                    details.append(f"✅ OK: No enforced quota for {metric} in {region} (limit = -1)")
+                    status_list.append("OK")
+                elif planned > limit_val:
+                    details.append(f"❌ BLOCK: {planned} > limit {limit_val} for {metric} in {region}")
+                    status_list.append("BLOCK")
+                    details.append(f"🔗 Option 1: {suggest_quota_increase(project_id, service, metric, region)}")
+                    details.append(request_quota_increase(project_id, service, metric, region, planned))
+                elif planned > remaining:
+                    details.append(f"⚠️ WARN: {planned} > available {remaining} for {metric} in {region}")
+                    status_list.append("WARN")
+                else:
+                    details.append(f"✅ OK: {planned} ≤ available {remaining} for {metric} in {region}")
+                    status_list.append("OK")
 
     overall = "BLOCK" if "BLOCK" in status_list else "WARN" if "WARN" in status_list else "OK"
     return {
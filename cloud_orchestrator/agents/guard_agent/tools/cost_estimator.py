@@ -0,0 +1,223 @@
+"""
+Offline cost estimates for tool plans.
+
+estimate_cost(tool_calls) prices each call from pricing.yaml, a versioned table of
+on-demand list prices (Compute machine families, Cloud SQL, GKE Autopilot,
+Dataflow workers, Vertex training/prediction nodes, disks and storage classes),
+using the local machine-type catalog for vCPU/memory/GPU shapes. No API calls are
+made; the table is parsed once per process.
+
+Monthly figures assume the resources stay up for the whole month, so jobs
+(Dataflow, Dataproc, Vertex training) are an upper bound.
+"""
+import os
+import pathlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import yaml
+
+try:
+    from .call_params import call_region, number_param, shape_param
+    from .machine_types import MachineShape
+except ImportError:
+    # check.py may be loaded as a top-level module; its siblings come along the same way
+    from call_params import call_region, number_param, shape_param
+    from machine_types import MachineShape
+
+PRICING_PATH = pathlib.Path(os.getenv("PRICING_CATALOG_PATH", pathlib.Path(__file__).with_name("pricing.yaml")))
+
+_pricing: Optional[Dict[str, Any]] = None
+_pricing_lock = threading.Lock()
+
+
+def load_pricing(path: Optional[pathlib.Path] = None) -> Dict[str, Any]:
+    """Pricing table, parsed once; pass a path to load a different table uncached."""
+    global _pricing
+    if path is not None:
+        return yaml.safe_load(pathlib.Path(path).read_text())
+    if _pricing is None:
+        with _pricing_lock:
+            if _pricing is None:
+                _pricing = yaml.safe_load(PRICING_PATH.read_text())
+    return _pricing
+
+
+def region_multiplier(pricing: Mapping[str, Any], region: str) -> float:
+    multipliers = pricing.get("region_multipliers", {})
+    if region in multipliers:
+        return float(multipliers[region])
+    return float(multipliers.get("default", {}).get(region.split("-", 1)[0], 1.0))
+
+
+# ───────────────────────── Per-action pricing ───────────────────────── #
+# Each pricer returns (hourly, monthly-only) costs at us-central1 rates plus a short
+# detail string; monthly-only covers storage billed per GB month.
+
+Priced = Tuple[float, float, str]
+
+
+def _vm_hourly(pricing: Mapping[str, Any], shape: MachineShape) -> float:
+    compute = pricing["compute"]
+    rates = compute["families"].get(shape.family) or compute["families"][compute["default_family"]]
+    hourly = shape.vcpus * shape.cpu_share * rates["vcpu_hour"] + shape.memory_gb * rates["memory_gb_hour"]
+    if shape.gpus:
+        hourly += shape.gpus * compute["gpu_hour"].get(shape.gpu_type, 0)
+    return hourly
+
+
+def _disk_month(pricing: Mapping[str, Any], disk_type: Any, size_gb: float) -> float:
+    disks = pricing["disks"]
+    return size_gb * disks.get(str(disk_type or "pd-standard"), disks["pd-standard"])
+
+
+def _compute_vm(pricing, params) -> Priced:
+    shape = shape_param(params, ("machine_type",), "e2-micro")
+    count = number_param(params, ("count", "instance_count"), 1)
+    disk_gb = number_param(params, ("boot_disk_size_gb", "disk_size_gb"), 10)
+    hourly = _vm_hourly(pricing, shape) * count
+    monthly = _disk_month(pricing, params.get("boot_disk_type"), disk_gb) * count
+    return hourly, monthly, f"{int(count)} × {shape.name}, {disk_gb:g} GB disk"
+
+
+def _dataflow_job(pricing, params) -> Priced:
+    options = dict(params)
+    if isinstance(params.get("parameters"), Mapping):
+        options.update(params["parameters"])
+    shape = shape_param(options, ("workerMachineType", "machineType", "worker_machine_type", "machine_type"),
+                   "n1-standard-1")
+    workers = number_param(options, ("maxNumWorkers", "max_num_workers", "max_workers",
+                                "numWorkers", "num_workers"), 1) or 1
+    disk_gb = number_param(options, ("diskSizeGb", "disk_size_gb"), 250)
+    rates = pricing["dataflow"]
+    per_worker = (shape.vcpus * rates["vcpu_hour"] + shape.memory_gb * rates["memory_gb_hour"]
+                  + disk_gb * rates["pd_gb_hour"])
+    return per_worker * workers, 0.0, f"up to {int(workers)} × {shape.name} workers"
+
+
+def _dataproc_cluster(pricing, params) -> Priced:
+    master = shape_param(params, ("master_machine_type",), "n2-standard-4")
+    worker = shape_param(params, ("worker_machine_type", "machine_type"), "n2-standard-4")
+    masters = number_param(params, ("num_masters",), 1) or 1
+    workers = number_param(params, ("num_workers",), 2)
+    disk_gb = number_param(params, ("boot_disk_size_gb", "disk_size_gb"), 1000)
+    vcpus = master.vcpus * masters + worker.vcpus * workers
+    hourly = (_vm_hourly(pricing, master) * masters + _vm_hourly(pricing, worker) * workers
+              + vcpus * pricing["dataproc"]["vcpu_hour"])
+    monthly = _disk_month(pricing, "pd-standard", disk_gb) * (masters + workers)
+    return hourly, monthly, f"{int(masters)} × {master.name} + {int(workers)} × {worker.name}"
+
+
+def _cloudsql_instance(pricing, params) -> Priced:
+    rates = pricing["cloudsql"]
+    storage_gb = number_param(params, ("storage_size_gb", "storage_size"), 10)
+    monthly = storage_gb * rates["storage_gb_month"]
+    tier = str(params.get("tier") or "")
+    if tier in rates["shared_tiers"]:
+        return rates["shared_tiers"][tier], monthly, tier
+    if tier.startswith("db-custom-"):
+        _, _, vcpus, memory_mb = tier.split("-")[:4]
+        vcpus, memory_gb = float(vcpus), float(memory_mb) / 1024
+    else:
+        vcpus = number_param(params, ("cpu", "cpus"), 1)
+        memory_gb = number_param(params, ("memory_mb",), 3840) / 1024
+    hourly = vcpus * rates["vcpu_hour"] + memory_gb * rates["memory_gb_hour"]
+    return hourly, monthly, f"{vcpus:g} vCPU, {memory_gb:g} GB, {storage_gb:g} GB SSD"
+
+
+def _gke_autopilot(pricing, params) -> Priced:
+    rates = pricing["gke_autopilot"]
+    vcpus = number_param(params, ("pod_vcpus", "vcpus"), 0)
+    memory_gb = number_param(params, ("pod_memory_gb", "memory_gb"), 0)
+    hourly = rates["cluster_hour"] + vcpus * rates["pod_vcpu_hour"] + memory_gb * rates["pod_memory_gb_hour"]
+    return hourly, 0.0, f"cluster fee + {vcpus:g} vCPU / {memory_gb:g} GB pod requests"
+
+
+def _vertex_nodes(kind: str) -> Callable[[Mapping[str, Any], Mapping[str, Any]], Priced]:
+    def price(pricing, params) -> Priced:
+        rates = pricing["vertex"]
+        shape = shape_param(params, ("machine_type",), "n1-standard-4")
+        replicas = number_param(params, ("replica_count", "min_replica_count"), 1) or 1
+        gpus = number_param(params, ("accelerator_count",), shape.gpus)
+        accelerator = str(params.get("accelerator_type") or shape.gpu_type or "").lower()
+        accelerator = accelerator.replace("nvidia_tesla_", "").replace("nvidia_", "")
+        per_node = (shape.vcpus * rates[f"{kind}_vcpu_hour"] + shape.memory_gb * rates[f"{kind}_memory_gb_hour"]
+                    + gpus * rates["gpu_hour"].get(accelerator, 0))
+        return per_node * replicas, 0.0, f"{int(replicas)} × {shape.name} {kind} node"
+    return price
+
+
+def _storage_bucket(pricing, params) -> Priced:
+    classes = pricing["storage_classes"]
+    storage_class = str(params.get("storage_class") or "STANDARD").upper()
+    size_gb = number_param(params, ("size_gb", "expected_size_gb"), 0)
+    monthly = size_gb * classes.get(storage_class, classes["STANDARD"])
+    return 0.0, monthly, f"{size_gb:g} GB {storage_class}"
+
+
+PRICERS: Dict[str, Callable[[Mapping[str, Any], Mapping[str, Any]], Priced]] = {
+    "compute.create_vm": _compute_vm,
+    "dataflow.launch_flex_template": _dataflow_job,
+    "dataproc.create_cluster": _dataproc_cluster,
+    "cloudsql.create_instance": _cloudsql_instance,
+    "gke.create_cluster": _gke_autopilot,
+    "vertex.train_custom": _vertex_nodes("training"),
+    "vertex.deploy_endpoint": _vertex_nodes("prediction"),
+    "storage.create_bucket": _storage_bucket,
+}
+
+
+# ───────────────────────── Plan estimate ───────────────────────── #
+
+def plan_tool_calls(plan: Any) -> List[Dict[str, Any]]:
+    """Tool calls from build_tool_plan ({"tool_calls": [...]}), expand_to_tool_plan ({"tool_plan": [...]}) or a bare list."""
+    if isinstance(plan, Mapping):
+        plan = plan.get("tool_calls") or plan.get("tool_plan") or []
+    return [tc for tc in plan or [] if isinstance(tc, Mapping)]
+
+
+def estimate_cost(plan: Any, pricing: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Hourly and monthly cost of a plan.
+
+    Returns {"hourly", "monthly", "currency", "pricing_version", "items", "unpriced", "elapsed_ms"};
+    items lists each priced call with its region and detail, unpriced the actions
+    without a pricer (usually free or usage-billed: topics, datasets, IAM, ...).
+    """
+    started = time.perf_counter()
+    pricing = pricing or load_pricing()
+    hours = float(pricing.get("hours_per_month", 730))
+    items, unpriced = [], []
+    total_hourly = total_monthly = 0.0
+
+    for position, tool_call in enumerate(plan_tool_calls(plan)):
+        action = tool_call.get("action", "")
+        params = tool_call.get("params") or {}
+        if not isinstance(params, Mapping):
+            params = {}
+        pricer = PRICERS.get(action)
+        if pricer is None:
+            unpriced.append(action)
+            continue
+        region = call_region(params)
+        multiplier = region_multiplier(pricing, region)
+        hourly, storage_monthly, detail = pricer(pricing, params)
+        hourly *= multiplier
+        monthly = hourly * hours + storage_monthly * multiplier
+        total_hourly += hourly
+        total_monthly += monthly
+        items.append({
+            "step": position + 1, "action": action, "region": region, "detail": detail,
+            "hourly": round(hourly, 4), "monthly": round(monthly, 2),
+        })
+
+    return {
+        "hourly": round(total_hourly, 4),
+        "monthly": round(total_monthly, 2),
+        "currency": pricing.get("currency", "USD"),
+        "pricing_version": str(pricing.get("version", "unknown")),
+        "items": items,
+        "unpriced": unpriced,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
@@ -0,0 +1,101 @@
+"""
+Local Compute Engine machine-type catalog.
+
+machine_shape("n2-highmem-8") -> vCPUs, memory, attached GPUs and the per-family
+CPU quota metric, without calling the Compute API. Predefined shapes follow the
+published family/class ratios; shared-core, accelerator-optimized and custom
+types ("custom-4-16384", "n2-custom-8-32768") are handled explicitly.
+"""
+import re
+from typing import NamedTuple, Optional
+
+
+class MachineShape(NamedTuple):
+    name: str
+    family: str
+    vcpus: int
+    memory_gb: float
+    gpus: int = 0
+    gpu_type: Optional[str] = None
+    # Fraction of each vCPU a shared-core type may use; quota still counts whole vCPUs
+    cpu_share: float = 1.0
+
+    @property
+    def cpu_metric(self) -> str:
+        """Regional Compute quota metric these vCPUs count against."""
+        return FAMILY_CPU_METRIC.get(self.family, "cpus")
+
+    @property
+    def gpu_metric(self) -> Optional[str]:
+        return f"nvidia_{self.gpu_type}_gpus" if self.gpus and self.gpu_type else None
+
+
+# GB of memory per vCPU for each family and class
+MEMORY_PER_VCPU = {
+    "n1": {"standard": 3.75, "highmem": 6.5, "highcpu": 0.9},
+    "e2": {"standard": 4, "highmem": 8, "highcpu": 1},
+    "n2": {"standard": 4, "highmem": 8, "highcpu": 1},
+    "n2d": {"standard": 4, "highmem": 8, "highcpu": 1},
+    "n4": {"standard": 4, "highmem": 8, "highcpu": 2},
+    "c2": {"standard": 4},
+    "c2d": {"standard": 4, "highmem": 8, "highcpu": 2},
+    "c3": {"standard": 4, "highmem": 8, "highcpu": 2},
+    "c3d": {"standard": 4, "highmem": 8, "highcpu": 2},
+    "t2d": {"standard": 4},
+    "t2a": {"standard": 4},
+    "m1": {"megamem": 14.9, "ultramem": 24.025},
+}
+
+# Families with their own CPU quota; everything else counts against CPUS
+FAMILY_CPU_METRIC = {
+    "n2": "n2_cpus", "n2d": "n2d_cpus", "n4": "n4_cpus", "c2": "c2_cpus", "c2d": "c2d_cpus",
+    "c3": "c3_cpus", "c3d": "c3d_cpus", "t2d": "t2d_cpus", "t2a": "t2a_cpus", "m1": "m1_cpus",
+    "a2": "a2_cpus", "g2": "g2_cpus",
+}
+
+SHARED_CORE = {
+    "e2-micro": MachineShape("e2-micro", "e2", 2, 1, cpu_share=0.125),
+    "e2-small": MachineShape("e2-small", "e2", 2, 2, cpu_share=0.25),
+    "e2-medium": MachineShape("e2-medium", "e2", 2, 4, cpu_share=0.5),
+    "f1-micro": MachineShape("f1-micro", "n1", 1, 0.6, cpu_share=0.2),
+    "g1-small": MachineShape("g1-small", "n1", 1, 1.7, cpu_share=0.5),
+}
+
+# G2 machines: vCPUs -> attached L4 GPUs
+G2_GPUS = {4: 1, 8: 1, 12: 1, 16: 1, 24: 2, 32: 1, 48: 4, 96: 8}
+
+DEFAULT_MACHINE_TYPE = "n1-standard-1"
+
+_PREDEFINED = re.compile(r"^([a-z]\d+[a-z]?)-([a-z]+)-(\d+)$")
+_CUSTOM = re.compile(r"^(?:([a-z]\d+[a-z]?)-)?custom-(\d+)-(\d+)(?:-ext)?$")
+_A2 = re.compile(r"^a2-(highgpu|megagpu|ultragpu)-(\d+)g$")
+
+
+def machine_shape(machine_type: Optional[str]) -> Optional[MachineShape]:
+    """Shape of a machine type, or None when it is not in the catalog."""
+    name = (machine_type or DEFAULT_MACHINE_TYPE).strip().lower().rsplit("/", 1)[-1]
+    if name in SHARED_CORE:
+        return SHARED_CORE[name]
+
+    match = _CUSTOM.match(name)
+    if match:
+        family, vcpus, memory_mb = match.group(1) or "n1", int(match.group(2)), int(match.group(3))
+        return MachineShape(name, family, vcpus, memory_mb / 1024)
+
+    match = _A2.match(name)
+    if match:
+        kind, gpus = match.group(1), int(match.group(2))
+        per_gpu_memory = 170 if kind == "ultragpu" else 85
+        gpu_type = "a100_80gb" if kind == "ultragpu" else "a100"
+        return MachineShape(name, "a2", 12 * gpus, per_gpu_memory * gpus, gpus, gpu_type)
+
+    match = _PREDEFINED.match(name)
+    if not match:
+        return None
+    family, kind, vcpus = match.group(1), match.group(2), int(match.group(3))
+    if family == "g2" and kind == "standard":
+        return MachineShape(name, "g2", vcpus, vcpus * 4, G2_GPUS.get(vcpus, 1), "l4")
+    per_vcpu = MEMORY_PER_VCPU.get(family, {}).get(kind)
+    if per_vcpu is None:
+        return None
+    return MachineShape(name, family, vcpus, round(vcpus * per_vcpu, 2))
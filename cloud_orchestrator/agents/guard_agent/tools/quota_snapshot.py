@@ -0,0 +1,167 @@
+"""
+Background snapshots of quota limits and usage with a precomputed headroom table.
+
+check_quota reads (service, region, metric) headroom from here instead of calling
+the Service Usage API on every check. Snapshots older than the freshness bound
+are fetched live; services that were checked recently are refreshed in the
+background so the next check finds them fresh.
+
+Kept free of package-relative imports: check.py may be loaded as a top-level
+module, and imports this one the same way.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+MAX_AGE_SECONDS = float(os.getenv("QUOTA_SNAPSHOT_MAX_AGE_SECONDS", "300"))
+REFRESH_INTERVAL_SECONDS = float(os.getenv("QUOTA_SNAPSHOT_REFRESH_SECONDS", "240"))
+# Stop refreshing a (project, service) nobody has checked for this long
+IDLE_EXPIRY_SECONDS = 3600
+
+QuotaKey = Tuple[str, Optional[str]]
+
+
+class Headroom(NamedTuple):
+    limit: float
+    usage: float
+    headroom: float
+
+
+class QuotaSnapshot(NamedTuple):
+    project_id: str
+    service: str
+    fetched_at: float
+    table: Dict[QuotaKey, Headroom]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def lookup(self, metric: str, region: Optional[str]) -> Optional[Headroom]:
+        """Regional bucket first, then the global one."""
+        metric = metric.lower()
+        return self.table.get((metric, region)) or self.table.get((metric, None))
+
+
+def build_quota_index(quota_metrics: list) -> Dict[QuotaKey, Headroom]:
+    """
+    Index a consumerQuotaMetrics response as (metric, region) -> Headroom.
+
+    The metric is the lower-cased last path segment ("compute.googleapis.com/cpus" -> "cpus");
+    region is None for buckets without a region dimension. The first bucket per key wins,
+    and an unlimited quota (-1) has infinite headroom.
+    """
+    index = {}
+    for q in quota_metrics:
+        metric = q.get("metric", "").split("/")[-1].lower()
+        for limit in q.get("consumerQuotaLimits", []):
+            for bucket in limit.get("quotaBuckets", []):
+                region = (bucket.get("dimensions") or {}).get("region")
+                key = (metric, region)
+                if key in index:
+                    continue
+                limit_val = float(bucket.get("effectiveLimit", 0))
+                usage = float(bucket.get("usage", 0))
+                headroom = float("inf") if limit_val == -1 else limit_val - usage
+                index[key] = Headroom(limit_val, usage, headroom)
+    return index
+
+
+class QuotaSnapshotStore:
+    """
+    Snapshots keyed by (project, service).
+
+    fetcher(project_id, service) returns the raw consumerQuotaMetrics list and raises on
+    failure. get() serves a snapshot younger than max_age, otherwise fetches live.
+    """
+
+    def __init__(self, fetcher: Callable[[str, str], list], max_age: float = MAX_AGE_SECONDS,
+                 refresh_interval: float = REFRESH_INTERVAL_SECONDS):
+        self.fetcher = fetcher
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self._snapshots: Dict[Tuple[str, str], QuotaSnapshot] = {}
+        self._last_used: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def refresh(self, project_id: str, service: str) -> QuotaSnapshot:
+        table = build_quota_index(self.fetcher(project_id, service))
+        snapshot = QuotaSnapshot(project_id, service, time.time(), table)
+        with self._lock:
+            self._snapshots[(project_id, service)] = snapshot
+        return snapshot
+
+    def get(self, project_id: str, service: str, max_age: Optional[float] = None) -> QuotaSnapshot:
+        key = (project_id, service)
+        with self._lock:
+            self._last_used[key] = time.time()
+            snapshot = self._snapshots.get(key)
+        if snapshot is not None and snapshot.age <= (self.max_age if max_age is None else max_age):
+            return snapshot
+        return self.refresh(project_id, service)
+
+    def peek(self, project_id: str, service: str) -> Optional[QuotaSnapshot]:
+        return self._snapshots.get((project_id, service))
+
+    def headroom_table(self) -> List[Dict[str, object]]:
+        """Flat (service, region, metric) rows across all snapshots, for display."""
+        rows = []
+        for snapshot in list(self._snapshots.values()):
+            for (metric, region), h in snapshot.table.items():
+                rows.append({
+                    "project_id": snapshot.project_id, "service": snapshot.service,
+                    "region": region or "global", "metric": metric, "limit": h.limit,
+                    "usage": h.usage, "headroom": h.headroom, "age_s": round(snapshot.age, 1),
+                })
+        return rows
+
+    # ───────────────────────── Background refresh ───────────────────────── #
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="quota-snapshot", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _due(self) -> List[Tuple[str, str]]:
+        now = time.time()
+        with self._lock:
+            for key, used in list(self._last_used.items()):
+                if now - used > IDLE_EXPIRY_SECONDS:
+                    del self._last_used[key]
+            return [key for key in self._last_used
+                    if key not in self._snapshots or self._snapshots[key].age >= self.refresh_interval]
+
+    def _run(self) -> None:
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="quota-refresh") as pool:
+            while not self._stop.wait(min(30.0, self.refresh_interval / 4)):
+                for key, future in [(key, pool.submit(self.refresh, *key)) for key in self._due()]:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"Warning: Quota snapshot refresh failed for {key[1]} in {key[0]}: {e}")
+
+
+_store: Optional[QuotaSnapshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_quota_store(fetcher: Callable[[str, str], list]) -> QuotaSnapshotStore:
+    """Process-wide store; the background refresher starts with it."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = QuotaSnapshotStore(fetcher)
+                if os.getenv("QUOTA_SNAPSHOT_REFRESH_DISABLED", "").lower() not in ("1", "true", "yes"):
+                    _store.start()
+    return _store
@@ -1,4 +1,6 @@
+import logging
 from google.adk.agents import Agent
+from ..common.intent_router import IntentRouter
 from .tools.planner_tool import (
     open_dag_page,
     parse_user_goal,
@@ -21,10 +23,12 @@ direct_agent = Agent(
     description="Direct GCP Planner - prompt → tool calls (simplified for hackathon/demo)",
     instruction=(
         "You are a simplified GCP infrastructure planner for hackathon/demo use.\n\n"
+        "**Session State:** account last seen '{gcp_account?}'. This is only a hint: gcloud config is shared "
+        "by every shell on the machine, so still call check_gcloud_auth() and set_active_project() before planning.\n\n"
         "**Complete Flow:**\n"
         "1. **Setup Check**: If user mentions 'cloud setup' or similar, call setup_cloud_environment() first\n"
         "2. **Authentication**: Call check_gcloud_auth() to verify authentication status\n"
-        "3. **Project Discovery**: If authenticated, call list_gcp_projects() to show available projects\n"
+        "3. **Project Discovery**: If authenticated, call list_gcp_projects() to show available projects (use query/label_filter to narrow large organizations)\n"
         "4. **Project Selection**: Help user select existing project or create new one with create_gcp_project()\n"
         "5. **Set Active Project**: Use set_active_project() to set the selected project as active\n"
         "6. **Planning**: Once setup is complete, call build_tool_plan(prompt) to convert the user request to tool calls\n"
@@ -87,6 +91,21 @@ cloud_agent = Agent(
     ],
 )
 
+# Cloud requests go straight to direct_agent; anything else is left to the model,
+# which answers general questions itself
+cloud_router = IntentRouter({
+    direct_agent.name: [
+        (r"\b(cloud|gcp|google cloud) setup\b", 3),
+        (r"\b(gcp|google cloud|gcloud)\b", 2),
+        (r"\b(authenticat\w*|log ?in|gcloud auth)\b", 1),
+        (r"\b(compute engine|bigquery|cloud storage|gcs|pub/?sub|dataflow|dataproc|cloud run|"
+         r"cloud functions?|cloud sql|gke|kubernetes|vertex ai|cloud build|secret manager)\b", 2),
+        (r"\b(deploy|provision|spin up|set ?up|create)\b.*\b(bucket|cluster|vm|instance|topic|pipeline|"
+         r"database|endpoint|serverless|container)s?\b", 2),
+        (r"\b(create|new|select|switch) (a |my |the )?project\b", 2),
+    ],
+}, name="parent_agent")
+
 root_agent = Agent(
     name="parent_agent",
     model="gemini-2.5-flash",
@@ -128,6 +147,7 @@ root_agent = Agent(
 Remember: Your goal is to provide the best possible assistance, whether that's direct help or smart routing to specialized agents.""",
     sub_agents=[direct_agent],  
     tools=[],
+    before_model_callback=cloud_router.before_model_callback,
 )
 
-print(f"✅ Planner Agent '{root_agent.name}' initialized")
+logging.getLogger(__name__).info(f"✅ Planner Agent '{root_agent.name}' initialized")
@@ -0,0 +1,377 @@
+"""
+Compiled capability index shared by the planner tools.
+
+capabilities.yaml is parsed once per process (or read back from a JSON cache kept
+next to it) and combined with the service → action and action → quota tables into
+a read-only index. Every lookup by action, service or API name is a dict hit.
+"""
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+CACHE_FORMAT_VERSION = 1
+CACHE_FILENAME = "capabilities.cache.json"
+
+# Same lookup order the planner has always used, local checkout first
+CANDIDATE_PATHS = (
+    pathlib.Path(__file__).parents[2] / "capabilities.yaml",
+    pathlib.Path("/app/agents/capabilities.yaml"),
+    pathlib.Path("/app/cloud_orchestrator/agents/capabilities.yaml"),
+    pathlib.Path("capabilities.yaml"),
+    pathlib.Path("../capabilities.yaml"),
+)
+
+DEFAULT_CATALOG = {
+    "actions": {
+        "compute.create_vm": {"params": {"required": ["project_id", "zone", "instance_name"]}},
+        "bigquery.create_dataset": {"params": {"required": ["project_id", "dataset_id"]}},
+        "pubsub.create_topic": {"params": {"required": ["project_id", "topic_id"]}},
+        "dataflow.launch_flex_template": {"params": {"required": ["project_id", "region", "job_name"]}},
+        "iam.create_sa": {"params": {"required": ["project_id", "display_name"]}},
+        "cloudrun.deploy_service": {"params": {"required": ["project_id", "region", "service_name"]}},
+        "vpc.manage_vpc_network": {"params": {"required": ["project_id", "network_name"]}},
+        "storage.create_bucket": {"params": {"required": ["project_id", "bucket_name"]}},
+        "cloudsql.create_instance": {"params": {"required": ["project_id", "instance_name"]}},
+        "vertex.train_custom": {"params": {"required": ["project_id", "region", "job_name"]}},
+        "gke.create_cluster": {"params": {"required": ["project_id", "region", "cluster_name"]}},
+        "secretmanager.create_secret": {"params": {"required": ["project_id", "secret_id"]}},
+    }
+}
+
+# ───────────────────────── Static tables ───────────────────────── #
+
+# Planner service name → actions, primary action first
+SERVICE_TO_ACTIONS = {
+    "Compute Engine": ("compute.create_vm", "compute.delete_vm", "compute.get_external_ip", "compute.snapshot_disk"),
+    "BigQuery": ("bigquery.create_dataset", "bigquery.create_table", "bigquery.insert_json", "bigquery.export_table_gcs"),
+    "Pub/Sub": ("pubsub.create_topic", "pubsub.create_subscription", "pubsub.publish", "pubsub.pull"),
+    "Dataflow": ("dataflow.launch_flex_template", "dataflow.monitor_job", "dataflow.cancel_job", "dataflow.list_jobs"),
+    "IAM": ("iam.create_sa", "iam.grant_role", "iam.delete_sa"),
+    "Cloud Run": ("cloudrun.deploy_service", "cloudrun.update_env", "cloudrun.pause_service", "cloudrun.delete_service"),
+    "VPC": ("vpc.manage_vpc_network", "vpc.check_network_subnets", "vpc.add_serverless_connector"),
+    "Dataproc": ("dataproc.create_cluster", "dataproc.run_pyspark", "dataproc.delete_cluster", "dataproc.submit_hivejob"),
+    "Firestore": ("firestore.create_db", "firestore.set_ttl", "firestore.seed_docs", "firestore.export_gcs"),
+    "Cloud Storage": ("storage.create_bucket", "storage.upload_blob", "storage.set_lifecycle_rule"),
+    "Cloud SQL": ("cloudsql.create_instance", "cloudsql.import_sql", "cloudsql.set_ip", "cloudsql.delete_instance"),
+    "Cloud Logging": ("logging.create_sink", "logging.list_sinks"),
+    "Cloud Build": ("cloudbuild.build_docker", "cloudbuild.clone_repo_zip"),
+    "Artifact Registry": ("artifactregistry.create_repo", "artifactregistry.push_image", "artifactregistry.delete_repo"),
+    "Vertex AI": ("vertex.train_custom", "vertex.deploy_endpoint", "vertex.batch_predict", "vertex.delete_endpoint"),
+    "GKE Autopilot": ("gke.create_cluster", "gke.helm_install", "gke.scale_deployment", "gke.delete_cluster"),
+    "Cloud Monitoring": ("cloudmonitoring.create_dashboard", "cloudmonitoring.create_alert", "cloudmonitoring.delete_dashboard"),
+    "Cloud Deploy": ("clouddeploy.promote_release", "clouddeploy.watch_rollout", "clouddeploy.rollback_release"),
+    "Secret Manager": ("secretmanager.create_secret", "secretmanager.add_version", "secretmanager.access_secret"),
+    "Cloud Functions": ("cloudfunctions.deploy", "cloudfunctions.update", "cloudfunctions.delete"),
+}
+
+# Action prefix → googleapis.com service that owns its quotas
+API_BY_PREFIX = {
+    "compute": "compute.googleapis.com",
+    "vpc": "compute.googleapis.com",
+    "bigquery": "bigquery.googleapis.com",
+    "pubsub": "pubsub.googleapis.com",
+    "dataflow": "dataflow.googleapis.com",
+    "iam": "iam.googleapis.com",
+    "cloudrun": "run.googleapis.com",
+    "dataproc": "dataproc.googleapis.com",
+    "firestore": "firestore.googleapis.com",
+    "storage": "storage.googleapis.com",
+    "cloudsql": "sqladmin.googleapis.com",
+    "logging": "logging.googleapis.com",
+    "cloudbuild": "cloudbuild.googleapis.com",
+    "artifactregistry": "artifactregistry.googleapis.com",
+    "vertex": "aiplatform.googleapis.com",
+    "gke": "container.googleapis.com",
+    "cloudmonitoring": "monitoring.googleapis.com",
+    "clouddeploy": "clouddeploy.googleapis.com",
+    "secretmanager": "secretmanager.googleapis.com",
+    "cloudfunctions": "cloudfunctions.googleapis.com",
+}
+
+# Typical resource usage per action, split into regional and global quota metrics
+QUOTA_USAGE = {
+    # Compute Engine
+    "compute.create_vm": {"regions": {"us-central1": {"cpus": 2, "instances": 1}}, "global": {"instances": 1}},
+    "compute.delete_vm": {"regions": {"us-central1": {"cpus": 0, "instances": 0}}, "global": {"instances": 0}},
+    # BigQuery
+    "bigquery.create_dataset": {"global": {"datasets": 1}},
+    "bigquery.create_table": {"global": {"tables": 1}},
+    # Pub/Sub
+    "pubsub.create_topic": {"global": {"topics": 1}},
+    "pubsub.create_subscription": {"global": {"subscriptions": 1}},
+    # Dataflow
+    "dataflow.launch_flex_template": {"regions": {"us-central1": {"jobs": 1, "cpus": 4}}, "global": {"jobs": 1}},
+    "dataflow.monitor_job": {"regions": {"us-central1": {"jobs": 0}}, "global": {"jobs": 0}},
+    # IAM
+    "iam.create_sa": {"global": {"service_accounts": 1}},
+    "iam.grant_role": {"global": {"service_accounts": 0}},
+    # Cloud Run
+    "cloudrun.deploy_service": {"regions": {"us-central1": {"services": 1, "revisions": 1}}, "global": {"services": 1}},
+    "cloudrun.update_env": {"regions": {"us-central1": {"revisions": 1}}, "global": {"services": 0}},
+    # VPC
+    "vpc.manage_vpc_network": {"global": {"networks": 1}},
+    "vpc.check_network_subnets": {"global": {"subnetworks": 1}},
+    # Dataproc
+    "dataproc.create_cluster": {"regions": {"us-central1": {"clusters": 1, "cpus": 8}}, "global": {"clusters": 1}},
+    "dataproc.run_pyspark": {"regions": {"us-central1": {"jobs": 1}}, "global": {"jobs": 1}},
+    # Firestore
+    "firestore.create_db": {"global": {"databases": 1}},
+    "firestore.seed_docs": {"global": {"databases": 0}},
+    # Cloud Storage
+    "storage.create_bucket": {"global": {"buckets": 1}},
+    "storage.upload_blob": {"global": {"buckets": 0}},
+    # Cloud SQL
+    "cloudsql.create_instance": {"regions": {"us-central1": {"instances": 1}}, "global": {"instances": 1}},
+    "cloudsql.import_sql": {"regions": {"us-central1": {"instances": 0}}, "global": {"instances": 0}},
+    "cloudsql.set_ip": {"regions": {"us-central1": {"instances": 0}}, "global": {"instances": 0}},
+    "cloudsql.delete_instance": {"regions": {"us-central1": {"instances": -1}}, "global": {"instances": -1}},
+    # Cloud Logging
+    "logging.create_sink": {"global": {"sinks": 1}},
+    "logging.list_sinks": {"global": {"sinks": 0}},
+    # Cloud Build
+    "cloudbuild.build_docker": {"global": {"builds": 1}},
+    "cloudbuild.clone_repo_zip": {"global": {"builds": 1}},
+    # Artifact Registry
+    "artifactregistry.create_repo": {"regions": {"us-central1": {"repositories": 1}}, "global": {"repositories": 1}},
+    "artifactregistry.push_image": {"regions": {"us-central1": {"repositories": 0}}, "global": {"repositories": 0}},
+    "artifactregistry.delete_repo": {"regions": {"us-central1": {"repositories": -1}}, "global": {"repositories": -1}},
+    # Vertex AI
+    "vertex.train_custom": {"regions": {"us-central1": {"training_jobs": 1, "cpus": 8}}, "global": {"training_jobs": 1}},
+    "vertex.deploy_endpoint": {"regions": {"us-central1": {"endpoints": 1}}, "global": {"endpoints": 1}},
+    "vertex.batch_predict": {"regions": {"us-central1": {"batch_prediction_jobs": 1}}, "global": {"batch_prediction_jobs": 1}},
+    "vertex.delete_endpoint": {"regions": {"us-central1": {"endpoints": -1}}, "global": {"endpoints": -1}},
+    # GKE Autopilot
+    "gke.create_cluster": {"regions": {"us-central1": {"clusters": 1}}, "global": {"clusters": 1}},
+    "gke.helm_install": {"regions": {"us-central1": {"clusters": 0}}, "global": {"clusters": 0}},
+    "gke.scale_deployment": {"regions": {"us-central1": {"clusters": 0}}, "global": {"clusters": 0}},
+    "gke.delete_cluster": {"regions": {"us-central1": {"clusters": -1}}, "global": {"clusters": -1}},
+    # Cloud Monitoring
+    "cloudmonitoring.create_dashboard": {"global": {"dashboards": 1}},
+    "cloudmonitoring.create_alert": {"global": {"alert_policies": 1}},
+    "cloudmonitoring.delete_dashboard": {"global": {"dashboards": -1}},
+    # Cloud Deploy
+    "clouddeploy.promote_release": {"regions": {"us-central1": {"releases": 1}}, "global": {"releases": 1}},
+    "clouddeploy.watch_rollout": {"regions": {"us-central1": {"rollouts": 1}}, "global": {"rollouts": 1}},
+    "clouddeploy.rollback_release": {"regions": {"us-central1": {"releases": 0}}, "global": {"releases": 0}},
+    # Secret Manager
+    "secretmanager.create_secret": {"global": {"secrets": 1}},
+    "secretmanager.add_version": {"global": {"secrets": 0}},
+    "secretmanager.access_secret": {"global": {"secrets": 0}},
+    # Cloud Functions
+    "cloudfunctions.deploy": {"regions": {"us-central1": {"functions": 1}}, "global": {"functions": 1}},
+    "cloudfunctions.update": {"regions": {"us-central1": {"functions": 0}}, "global": {"functions": 0}},
+    "cloudfunctions.delete": {"regions": {"us-central1": {"functions": -1}}, "global": {"functions": -1}},
+}
+
+
+class ActionSpec(NamedTuple):
+    name: str
+    service: Optional[str]
+    api: Optional[str]
+    agent: Optional[str]
+    required: Tuple[str, ...]
+    optional: Mapping[str, Any]
+    needs_design: bool
+    raw: Mapping[str, Any]
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Plain dict/list copy of a frozen catalog value, e.g. for a tool response."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def api_for_action(action: str) -> Optional[str]:
+    """googleapis.com service name for an action such as 'gke.create_cluster'."""
+    return API_BY_PREFIX.get(action.split(".", 1)[0])
+
+
+class CapabilityIndex:
+    """Read-only view over the capability catalog with precomputed lookups."""
+
+    def __init__(self, catalog: Dict[str, Any], source: Optional[str] = None):
+        self.source = source
+        self.catalog = _freeze(catalog or {})
+        service_of = {a: svc for svc, actions in SERVICE_TO_ACTIONS.items() for a in actions}
+        self._service_of = MappingProxyType(service_of)
+
+        specs = {}
+        for name, spec in (catalog or {}).get("actions", {}).items():
+            spec = spec if isinstance(spec, dict) else {}
+            params = spec.get("params")
+            needs_design = not isinstance(params, dict)
+            params = params if isinstance(params, dict) else {}
+            specs[name] = ActionSpec(
+                name=name,
+                service=service_of.get(name),
+                api=api_for_action(name),
+                agent=spec.get("agent"),
+                required=tuple(params.get("required") or ()),
+                optional=_freeze(params.get("optional") or {}),
+                needs_design=needs_design,
+                raw=_freeze(spec),
+            )
+        self._specs = MappingProxyType(specs)
+        self._by_service = MappingProxyType(dict(SERVICE_TO_ACTIONS))
+
+        by_api: Dict[str, list] = {}
+        for name in list(specs) + [a for a in service_of if a not in specs]:
+            api = api_for_action(name)
+            if api:
+                by_api.setdefault(api, []).append(name)
+        self._by_api = MappingProxyType({api: tuple(names) for api, names in by_api.items()})
+        self._quota = _freeze({a: dict(usage, service=api_for_action(a)) for a, usage in QUOTA_USAGE.items()})
+
+    def __contains__(self, action: str) -> bool:
+        return action in self._specs
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    @property
+    def action_names(self) -> Tuple[str, ...]:
+        return tuple(self._specs)
+
+    @property
+    def services(self) -> Tuple[str, ...]:
+        return tuple(self._by_service)
+
+    def spec(self, action: str) -> Optional[ActionSpec]:
+        return self._specs.get(action)
+
+    def required_params(self, action: str) -> Tuple[str, ...]:
+        spec = self._specs.get(action)
+        return spec.required if spec else ()
+
+    def actions_for_service(self, service: str) -> Tuple[str, ...]:
+        return self._by_service.get(service, ())
+
+    def primary_action(self, service: str) -> Optional[str]:
+        actions = self._by_service.get(service)
+        return actions[0] if actions else None
+
+    def service_for_action(self, action: str) -> Optional[str]:
+        return self._service_of.get(action)
+
+    def actions_for_api(self, api: str) -> Tuple[str, ...]:
+        return self._by_api.get(api, ())
+
+    def quota_usage(self, action: str) -> Optional[Mapping[str, Any]]:
+        """{'service': api, 'regions': {...}, 'global': {...}} for quota-relevant actions."""
+        return self._quota.get(action)
+
+
+# ───────────────────────── Loading and caching ───────────────────────── #
+
+def find_capabilities_file() -> Optional[pathlib.Path]:
+    for cap_path in CANDIDATE_PATHS:
+        if cap_path.exists():
+            return cap_path
+    return None
+
+
+def _fingerprint(path: pathlib.Path, data: Optional[bytes] = None) -> Dict[str, Any]:
+    st = path.stat()
+    fp = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    if data is not None:
+        fp["sha256"] = hashlib.sha256(data).hexdigest()
+    return fp
+
+
+def _read_cache(cache_path: pathlib.Path, yaml_path: pathlib.Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("version") != CACHE_FORMAT_VERSION:
+        return None
+
+    source = cached.get("source", {})
+    current = _fingerprint(yaml_path)
+    if source.get("mtime_ns") == current["mtime_ns"] and source.get("size") == current["size"]:
+        return cached.get("catalog")
+    # mtime changes on checkout/copy even when the content does not, so fall back to the hash
+    if source.get("size") == current["size"]:
+        if _fingerprint(yaml_path, yaml_path.read_bytes()).get("sha256") == source.get("sha256"):
+            _write_cache(cache_path, yaml_path, cached.get("catalog"))
+            return cached.get("catalog")
+    return None
+
+
+def _write_cache(cache_path: pathlib.Path, yaml_path: pathlib.Path, catalog: Dict[str, Any]) -> None:
+    payload = {
+        "version": CACHE_FORMAT_VERSION,
+        "source": _fingerprint(yaml_path, yaml_path.read_bytes()),
+        "catalog": catalog,
+    }
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        # Read-only image or a value JSON cannot represent; the YAML still works
+        print(f"Warning: Could not write capabilities cache {cache_path}: {e}")
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def load_catalog(path: Optional[pathlib.Path] = None, use_cache: bool = True) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Return (catalog dict, source path), preferring the JSON cache over reparsing the YAML."""
+    yaml_path = path or find_capabilities_file()
+    if yaml_path is None:
+        print("Warning: No capabilities.yaml found, using minimal default")
+        return DEFAULT_CATALOG, None
+
+    cache_path = yaml_path.with_name(CACHE_FILENAME)
+    if use_cache:
+        catalog = _read_cache(cache_path, yaml_path)
+        if catalog is not None:
+            return catalog, str(yaml_path)
+
+    import yaml
+
+    try:
+        with open(yaml_path, "r") as f:
+            catalog = yaml.safe_load(f) or {}
+    except Exception as e:
+        print(f"Warning: Could not load capabilities from {yaml_path}: {e}")
+        return DEFAULT_CATALOG, None
+
+    if use_cache:
+        _write_cache(cache_path, yaml_path, catalog)
+    return catalog, str(yaml_path)
+
+
+_index: Optional[CapabilityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_capability_index() -> CapabilityIndex:
+    """Build the shared index on first use; later calls return the same object."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                use_cache = os.getenv("CAPABILITIES_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+                catalog, source = load_catalog(use_cache=use_cache)
+                _index = CapabilityIndex(catalog, source)
+    return _index
@@ -0,0 +1,201 @@
+"""
+Wave-based topological scheduling for service dependency DAGs.
+
+A DAG maps each node to the nodes it depends on, e.g. {"Dataflow": ["Pub/Sub"]}.
+schedule_dag runs Kahn's algorithm iteratively and groups nodes into waves: every
+node in a wave only depends on nodes from earlier waves, so a wave can be executed
+concurrently. Cycles and references to undeclared nodes are reported instead of
+recursing forever, and the critical path gives the longest dependency chain.
+"""
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, NamedTuple, Optional
+
+
+class Schedule(NamedTuple):
+    waves: List[List[Hashable]]
+    order: List[Hashable]
+    cycles: List[List[Hashable]]
+    blocked: List[Hashable]
+    missing: Dict[Hashable, List[Hashable]]
+    critical_path: List[Hashable]
+    critical_path_cost: float
+
+    @property
+    def ok(self) -> bool:
+        """True when every node could be scheduled."""
+        return not self.cycles and not self.blocked
+
+
+def _normalize(dag: Mapping[Hashable, Iterable[Hashable]]):
+    """Ordered node list, de-duplicated deps per node, and undeclared deps per node."""
+    nodes: List[Hashable] = []
+    position: Dict[Hashable, int] = {}
+    deps: Dict[Hashable, List[Hashable]] = {}
+    missing: Dict[Hashable, List[Hashable]] = {}
+
+    def add(node):
+        if node not in position:
+            position[node] = len(nodes)
+            nodes.append(node)
+            deps.setdefault(node, [])
+
+    for node in dag:
+        add(node)
+    for node, node_deps in dag.items():
+        for dep in node_deps or ():
+            if dep not in dag:
+                missing.setdefault(node, []).append(dep)
+            # Undeclared deps are scheduled as dependency-free nodes, as the old DFS did
+            add(dep)
+            if dep not in deps[node]:
+                deps[node].append(dep)
+    return nodes, position, deps, missing
+
+
+def _find_cycles(nodes: List[Hashable], deps: Dict[Hashable, List[Hashable]]) -> List[List[Hashable]]:
+    """Strongly connected components that form cycles (iterative Tarjan)."""
+    index_of: Dict[Hashable, int] = {}
+    lowlink: Dict[Hashable, int] = {}
+    on_stack = set()
+    stack: List[Hashable] = []
+    cycles: List[List[Hashable]] = []
+    candidates = set(nodes)
+    counter = 0
+
+    for root in nodes:
+        if root in index_of:
+            continue
+        work = [(root, iter(deps[root]))]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, it = work[-1]
+            advanced = False
+            for dep in it:
+                if dep not in candidates:
+                    continue
+                if dep not in index_of:
+                    index_of[dep] = lowlink[dep] = counter
+                    counter += 1
+                    stack.append(dep)
+                    on_stack.add(dep)
+                    work.append((dep, iter(deps[dep])))
+                    advanced = True
+                    break
+                if dep in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[dep])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in deps[node]:
+                    cycles.append(list(reversed(component)))
+    return cycles
+
+
+def schedule_dag(dag: Mapping[Hashable, Iterable[Hashable]],
+                 weights: Optional[Mapping[Hashable, float]] = None) -> Schedule:
+    """
+    Group the nodes of a dependency DAG into parallel execution waves.
+
+    Args:
+        dag: node -> list of nodes it depends on
+        weights: optional cost per node (e.g. expected seconds) for the critical path;
+            nodes without a weight count as 1
+
+    Returns:
+        Schedule with waves, flattened order, cycles, nodes blocked behind a cycle,
+        undeclared dependencies and the critical path
+    """
+    nodes, position, deps, missing = _normalize(dag)
+    dependents: Dict[Hashable, List[Hashable]] = {node: [] for node in nodes}
+    remaining = {}
+    for node in nodes:
+        remaining[node] = len(deps[node])
+        for dep in deps[node]:
+            dependents[dep].append(node)
+
+    waves: List[List[Hashable]] = []
+    ready = [node for node in nodes if remaining[node] == 0]
+    while ready:
+        waves.append(ready)
+        next_ready = []
+        for node in ready:
+            for child in dependents[node]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    next_ready.append(child)
+        # Keep each wave in declaration order so output is stable between runs
+        ready = sorted(next_ready, key=position.__getitem__)
+
+    order = [node for wave in waves for node in wave]
+    unscheduled = [node for node in nodes if remaining[node] > 0]
+    cycles = _find_cycles(unscheduled, deps) if unscheduled else []
+    in_cycle = {node for cycle in cycles for node in cycle}
+    blocked = [node for node in unscheduled if node not in in_cycle]
+
+    # Longest weighted chain through the scheduled part of the graph
+    weights = weights or {}
+    cost: Dict[Hashable, float] = {}
+    via: Dict[Hashable, Optional[Hashable]] = {}
+    for node in order:
+        best = None
+        for dep in deps[node]:
+            if best is None or cost[dep] > cost[best]:
+                best = dep
+        cost[node] = weights.get(node, 1) + (cost[best] if best is not None else 0)
+        via[node] = best
+
+    critical_path: List[Hashable] = []
+    if order:
+        node = max(order, key=lambda n: (cost[n], -position[n]))
+        while node is not None:
+            critical_path.append(node)
+            node = via[node]
+        critical_path.reverse()
+
+    return Schedule(
+        waves=waves,
+        order=order,
+        cycles=cycles,
+        blocked=blocked,
+        missing=missing,
+        critical_path=critical_path,
+        critical_path_cost=cost[critical_path[-1]] if critical_path else 0,
+    )
+
+
+def describe_problems(schedule: Schedule) -> Optional[str]:
+    """Human-readable reason a schedule is incomplete, or None if it is fine."""
+    if schedule.ok:
+        return None
+    parts = []
+    for cycle in schedule.cycles:
+        parts.append("cycle " + " → ".join(str(n) for n in cycle + cycle[:1]))
+    if schedule.blocked:
+        parts.append("blocked by cycle: " + ", ".join(str(n) for n in schedule.blocked))
+    return "; ".join(parts)
+
+
+def schedule_summary(schedule: Schedule) -> Dict[str, Any]:
+    """JSON-friendly view of a schedule for tool responses."""
+    return {
+        "waves": schedule.waves,
+        "max_parallelism": max((len(w) for w in schedule.waves), default=0),
+        "critical_path": schedule.critical_path,
+        "critical_path_cost": schedule.critical_path_cost,
+        "cycles": schedule.cycles,
+        "blocked": schedule.blocked,
+        "missing_dependencies": schedule.missing,
+    }
@@ -0,0 +1,278 @@
+"""
+Deterministic fast path for the planner.
+
+Simple prompts ("create a bucket and a Pub/Sub topic") name their services directly.
+For those we skip the LLM: a compiled Aho-Corasick automaton finds service names and
+synonyms in one pass over the prompt, and a table of canonical dependency edges turns
+the matched services into the same DAG shape build_service_dag returns.
+
+fast_parse_user_goal() reports a confidence score (share of meaningful words that are
+explained by the match); callers fall back to the LLM when it is below
+PLANNER_FAST_PATH_MIN_CONFIDENCE (default 0.75).
+"""
+import os
+import re
+from collections import deque
+from typing import Dict, List, Any, Tuple, Iterable, Optional
+
+# Canonical services in the order the planner prompts list them
+SERVICES: Tuple[str, ...] = (
+    "Compute Engine", "BigQuery", "Pub/Sub", "Dataflow", "IAM", "Cloud Run",
+    "VPC", "Dataproc", "Firestore", "Cloud Storage", "Cloud SQL", "Cloud Logging",
+    "Cloud Build", "Artifact Registry", "Vertex AI", "GKE Autopilot",
+    "Cloud Monitoring", "Cloud Deploy", "Secret Manager", "Cloud Functions",
+)
+
+SERVICE_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "Compute Engine": ("compute engine", "gce", "vm", "vms", "virtual machine", "virtual machines", "compute instance"),
+    "BigQuery": ("bigquery", "big query", "bq", "data warehouse", "dataset", "datasets", "bigquery table"),
+    "Pub/Sub": ("pub/sub", "pubsub", "pub sub", "topic", "topics", "subscription", "subscriptions", "message queue"),
+    "Dataflow": ("dataflow", "data flow", "apache beam", "beam pipeline", "beam job", "flex template"),
+    "IAM": ("iam", "service account", "service accounts", "iam role", "role binding", "permissions"),
+    "Cloud Run": ("cloud run", "cloudrun", "serverless container", "containerized api"),
+    "VPC": ("vpc", "vpc network", "network", "subnet", "subnets", "virtual private cloud", "vpc connector"),
+    "Dataproc": ("dataproc", "spark", "pyspark", "hadoop", "hive"),
+    "Firestore": ("firestore", "document database", "nosql database"),
+    "Cloud Storage": ("cloud storage", "gcs", "bucket", "buckets", "storage bucket", "object storage"),
+    "Cloud SQL": ("cloud sql", "cloudsql", "postgres", "postgresql", "mysql", "relational database", "sql instance"),
+    "Cloud Logging": ("cloud logging", "logging", "log sink", "log sinks", "logs", "log-based metric"),
+    "Cloud Build": ("cloud build", "cloudbuild", "docker build", "build pipeline"),
+    "Artifact Registry": ("artifact registry", "container registry", "docker repository", "docker repo", "image repository"),
+    "Vertex AI": ("vertex", "vertex ai", "training job", "model endpoint", "batch prediction", "ml model"),
+    "GKE Autopilot": ("gke", "gke autopilot", "autopilot", "kubernetes", "k8s", "helm", "helm chart"),
+    "Cloud Monitoring": ("cloud monitoring", "monitoring", "dashboard", "dashboards", "alert", "alerts", "alerting", "alert policy"),
+    "Cloud Deploy": ("cloud deploy", "clouddeploy", "delivery pipeline", "release rollout"),
+    "Secret Manager": ("secret manager", "secret", "secrets"),
+    "Cloud Functions": ("cloud function", "cloud functions", "gcf", "serverless function"),
+}
+
+# dependent service -> services that must be set up before it (when present in the plan).
+# Follows the data-flow ordering used by the LLM prompt example: Pub/Sub → Dataflow → BigQuery → Cloud Run → Cloud Monitoring.
+CANONICAL_EDGES: Dict[str, Tuple[str, ...]] = {
+    "IAM": (),
+    "VPC": (),
+    "Secret Manager": ("IAM",),
+    "Cloud Storage": ("IAM",),
+    "Pub/Sub": ("IAM",),
+    "Artifact Registry": ("IAM",),
+    "Firestore": ("IAM",),
+    "Compute Engine": ("VPC", "IAM"),
+    "Cloud SQL": ("VPC", "IAM"),
+    "Dataflow": ("Pub/Sub", "Cloud Storage", "IAM"),
+    "BigQuery": ("Dataflow", "Cloud Storage", "IAM"),
+    "Dataproc": ("Cloud Storage", "VPC", "IAM"),
+    "Cloud Build": ("Artifact Registry", "IAM"),
+    "GKE Autopilot": ("VPC", "Artifact Registry", "Cloud Build", "IAM"),
+    "Vertex AI": ("Cloud Storage", "BigQuery", "IAM"),
+    "Cloud Run": ("Cloud Build", "Artifact Registry", "BigQuery", "Cloud SQL", "Firestore", "Secret Manager", "VPC", "IAM"),
+    "Cloud Functions": ("Pub/Sub", "Cloud Storage", "Firestore", "Secret Manager", "IAM"),
+    "Cloud Deploy": ("GKE Autopilot", "Cloud Run", "Cloud Build", "Artifact Registry"),
+    "Cloud Logging": ("Compute Engine", "Cloud Run", "GKE Autopilot", "Cloud Functions", "Dataflow", "Dataproc", "Cloud SQL"),
+    "Cloud Monitoring": ("Compute Engine", "Cloud Run", "GKE Autopilot", "Cloud Functions", "Dataflow", "Dataproc",
+                         "Cloud SQL", "BigQuery", "Vertex AI", "Cloud Logging"),
+}
+
+# Words that carry no service information and should not lower the confidence score
+_STOPWORDS = frozenset("""
+a an the and or with to of for in on into from by via at as is are be it its that this then them
+i we me my our us you your please can could would should will need want wants like let lets also just
+some new one two three simple basic small single default standard called named using use
+""".split())
+_INTENT_WORDS = frozenset("""
+create creating make set setup up spin provision provisioning deploy deploying add build launch run start
+configure enable store storing ingest ingesting process processing write push host hosting expose
+service services infrastructure infra resource resources project gcp google cloud pipeline app application
+api data events event analytics stream streaming real time realtime batch
+cluster clusters instance instances database databases db table tables job jobs repository repo
+function functions endpoint model image container chart key keys
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_QUOTED_RE = re.compile(r"(['\"`]).*?\1")
+_IDENTIFIER_RE = re.compile(r"\b[a-z0-9]+(?:[-_][a-z0-9]+)+\b")
+
+
+class _AhoCorasick:
+    """Minimal Aho-Corasick automaton over lowercase patterns."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, str]]] = [[]]
+        for pattern, value in patterns:
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((pattern, value))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def finditer(self, text: str):
+        """Yield (start, end, pattern, value) for every pattern occurrence."""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pattern, value in self._out[state]:
+                yield i - len(pattern) + 1, i + 1, pattern, value
+
+
+_MATCHER = _AhoCorasick(
+    (synonym, service) for service, synonyms in SERVICE_SYNONYMS.items() for synonym in synonyms
+)
+
+
+def _is_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not text[index].isalnum()
+
+
+def match_services(prompt: str) -> List[Tuple[int, int, str]]:
+    """
+    Return non-overlapping (start, end, service) matches in prompt order.
+    Overlaps are resolved leftmost-longest, so "cloud sql" wins over "sql".
+    """
+    text = prompt.lower()
+    candidates = [
+        (start, end, service)
+        for start, end, _pattern, service in _MATCHER.finditer(text)
+        if _is_boundary(text, start - 1) and _is_boundary(text, end)
+    ]
+    candidates.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+    matches, last_end = [], -1
+    for start, end, service in candidates:
+        if start >= last_end:
+            matches.append((start, end, service))
+            last_end = end
+    return matches
+
+
+def canonicalize(name: str) -> Optional[str]:
+    """Map a service name or synonym (any case) to its canonical service, if known."""
+    lowered = name.strip().lower()
+    for service in SERVICES:
+        if service.lower() == lowered:
+            return service
+    matches = match_services(lowered)
+    if len(matches) == 1 and matches[0][0] == 0 and matches[0][1] == len(lowered):
+        return matches[0][2]
+    return None
+
+
+def _confidence(prompt: str, matches: List[Tuple[int, int, str]]) -> float:
+    if not matches:
+        return 0.0
+    text = prompt.lower()
+    covered = [False] * len(text)
+    for start, end, _service in matches:
+        covered[start:end] = [True] * (end - start)
+    # Quoted names and hyphenated identifiers (my-bucket, events_topic) are resource names, not intent
+    for pattern in (_QUOTED_RE, _IDENTIFIER_RE):
+        for m in pattern.finditer(text):
+            covered[m.start():m.end()] = [True] * (m.end() - m.start())
+
+    meaningful = explained = 0
+    for m in _TOKEN_RE.finditer(text):
+        token = m.group()
+        if token in _STOPWORDS or token.isdigit():
+            continue
+        meaningful += 1
+        if token in _INTENT_WORDS or all(covered[m.start():m.end()]):
+            explained += 1
+    return explained / meaningful if meaningful else 0.0
+
+
+def min_confidence() -> float:
+    return float(os.getenv("PLANNER_FAST_PATH_MIN_CONFIDENCE", "0.75"))
+
+
+def fast_path_enabled() -> bool:
+    return os.getenv("PLANNER_FAST_PATH_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+def fast_parse_user_goal(prompt: str) -> Dict[str, Any]:
+    """
+    Build the parse_user_goal intent blob locally.
+    Returns {goal, hints, source: "fast_path", confidence}.
+    """
+    matches = match_services(prompt)
+    hints: List[str] = []
+    for _start, _end, service in matches:
+        if service not in hints:
+            hints.append(service)
+    return {
+        "goal": " ".join(prompt.split()),
+        "hints": hints,
+        "source": "fast_path",
+        "confidence": round(_confidence(prompt, matches), 3),
+    }
+
+
+def _nearest_present(service: str, present: set, seen: set) -> List[str]:
+    """Prerequisites of service that are in the plan, looking through services that are not."""
+    found: List[str] = []
+    for dep in CANONICAL_EDGES.get(service, ()):
+        if dep in seen:
+            continue
+        seen.add(dep)
+        if dep in present:
+            found.append(dep)
+        else:
+            found.extend(d for d in _nearest_present(dep, present, seen) if d not in found)
+    return found
+
+
+def fast_build_service_dag(services: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Build a service → prerequisites DAG for the given canonical services from CANONICAL_EDGES.
+    Edges implied by a longer path are dropped, so each service lists only its direct prerequisites.
+    """
+    ordered = list(dict.fromkeys(services))
+    present = set(ordered)
+    deps = {svc: _nearest_present(svc, present, set()) for svc in ordered}
+
+    def ancestors(svc: str, acc: set) -> set:
+        for dep in deps.get(svc, ()):
+            if dep not in acc:
+                acc.add(dep)
+                ancestors(dep, acc)
+        return acc
+
+    dag = {}
+    for svc in ordered:
+        indirect = set()
+        for dep in deps[svc]:
+            indirect |= ancestors(dep, set())
+        dag[svc] = [dep for dep in deps[svc] if dep not in indirect]
+    return dag
+
+
+def confident_services(intent_blob: Dict[str, Any]) -> Optional[List[str]]:
+    """
+    Return canonical services for an intent blob the fast path can plan on its own,
+    or None when the DAG should be built by the LLM.
+    """
+    if intent_blob.get("source") != "fast_path":
+        return None
+    if float(intent_blob.get("confidence", 0)) < min_confidence():
+        return None
+    services = [canonicalize(h) for h in intent_blob.get("hints", [])]
+    if not services or any(s is None for s in services):
+        return None
+    return services
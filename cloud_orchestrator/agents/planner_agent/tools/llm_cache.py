@@ -0,0 +1,207 @@
+"""
+Two-tier response cache for planner LLM calls.
+
+Responses are keyed by model + normalized prompt and kept in:
+  • an in-memory LRU (hot path, no I/O)
+  • an on-disk SQLite table (survives restarts, shared by processes on the same host)
+
+Both tiers honour a TTL and a maximum entry count. Configure with env vars:
+  LLM_CACHE_DISABLED=1            turn caching off entirely
+  LLM_CACHE_PATH=/path/db.sqlite3 on-disk location (default: <tmpdir>/cloud_orchestrator_llm_cache.sqlite3)
+  LLM_CACHE_TTL_SECONDS=86400     entry lifetime
+  LLM_CACHE_MEMORY_ENTRIES=256    in-memory LRU size
+  LLM_CACHE_DISK_ENTRIES=5000     on-disk row limit
+"""
+import os
+import time
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "cloud_orchestrator_llm_cache.sqlite3")
+
+
+# Bumped when the key derivation changes so entries written under the old scheme are never read
+KEY_VERSION = 2
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Collapse and trim whitespace so trivially different prompts share an entry.
+    Case is kept: prompts carry resource names (datasets, topics, secrets) that are case-sensitive.
+    """
+    return " ".join(prompt.split())
+
+
+class LLMCache:
+    """Thread-safe LRU + SQLite cache of LLM responses with TTL and size eviction."""
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = 86400,
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 5000,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+        self._db = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    " key TEXT PRIMARY KEY,"
+                    " model TEXT NOT NULL,"
+                    " response TEXT NOT NULL,"
+                    " expires_at REAL NOT NULL,"
+                    " last_access REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache(last_access)")
+            except sqlite3.Error as e:
+                print(f"Warning: LLM disk cache unavailable at {path}: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"v{KEY_VERSION}\x00{model}\x00{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        key = self.make_key(model, prompt)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return response
+                del self._memory[key]
+                self._stats["expired"] += 1
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT response, expires_at FROM llm_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        response, expires_at = row
+                        if expires_at > now:
+                            self._db.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                            self._remember(key, expires_at, response)
+                            self._stats["disk_hits"] += 1
+                            return response
+                        self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                        self._stats["expired"] += 1
+                except sqlite3.Error as e:
+                    print(f"Warning: LLM disk cache read failed: {e}")
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, model: str, prompt: str, response: str) -> None:
+        key = self.make_key(model, prompt)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, response)
+            self._stats["writes"] += 1
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, model, response, expires_at, last_access)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        (key, model, response, expires_at, now),
+                    )
+                    self._evict_disk(now)
+                except sqlite3.Error as e:
+                    print(f"Warning: LLM disk cache write failed: {e}")
+
+    def delete(self, model: str, prompt: str) -> None:
+        """Drop an entry, e.g. when the cached response turned out to be unparseable."""
+        key = self.make_key(model, prompt)
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                except sqlite3.Error as e:
+                    print(f"Warning: LLM disk cache delete failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                try:
+                    stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                except sqlite3.Error:
+                    stats["disk_entries"] = None
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_ratio"] = hits / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key: str, expires_at: float, response: str) -> None:
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _evict_disk(self, now: float) -> None:
+        expired = self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,)).rowcount
+        self._stats["expired"] += max(expired, 0)
+        count = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM llm_cache WHERE key IN"
+                " (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._stats["evictions"] += overflow
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the process-wide cache, or None when disabled via LLM_CACHE_DISABLED."""
+    global _cache
+    if os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache(
+                    path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+                    max_memory_entries=int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256")),
+                    max_disk_entries=int(os.getenv("LLM_CACHE_DISK_ENTRIES", "5000")),
+                )
+    return _cache
@@ -0,0 +1,92 @@
+"""
+Incremental parser for streamed tool plans.
+
+The planner model answers with a Python list of tool-call dicts. When the response
+is streamed, ToolCallStreamParser consumes the text chunk by chunk and hands back
+each top-level dict as soon as its closing brace arrives, so callers can act on
+step 1 while later steps are still being generated.
+"""
+import ast
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+class ToolCallStreamParser:
+    """Feed text chunks in, get completed tool-call dicts out."""
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._in_list = False
+        self._closed = False
+        self._depth = 0
+        self._quote: Optional[str] = None
+        self._escaped = False
+        self._current: Optional[List[str]] = None
+        self.errors: List[str] = []
+        self.text = ""
+
+    @property
+    def complete(self) -> bool:
+        """True once the closing bracket of the top-level list has been seen."""
+        return self._closed
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        if not chunk:
+            return []
+        self.text += chunk
+        completed = []
+        for ch in chunk:
+            if self._closed:
+                break
+            if not self._in_list:
+                # Skip code fences and any preamble before the list opens
+                if ch == "[":
+                    self._in_list = True
+                continue
+
+            if self._current is not None:
+                self._current.append(ch)
+
+            if self._quote:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == self._quote:
+                    self._quote = None
+                continue
+
+            if ch in ("'", '"'):
+                self._quote = ch
+            elif ch in "{[":
+                if self._depth == 0 and ch == "{":
+                    self._current = [ch]
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0 and ch == "]":
+                    self._closed = True
+                    continue
+                self._depth -= 1
+                if self._depth == 0 and self._current is not None:
+                    tool_call = self._parse("".join(self._current))
+                    self._current = None
+                    if tool_call is not None:
+                        completed.append(tool_call)
+        return completed
+
+    def _parse(self, text: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = ast.literal_eval(text)
+        except Exception as e:
+            self.errors.append(f"Could not parse tool call: {e}\nRaw: {text}")
+            return None
+        if not isinstance(value, dict):
+            self.errors.append(f"Expected dict, got {type(value).__name__}")
+            return None
+        return value
+
+
+def iter_tool_calls(chunks: Iterable[str], parser: Optional[ToolCallStreamParser] = None) -> Iterator[Dict[str, Any]]:
+    """Yield tool-call dicts from an iterable of text chunks as they complete."""
+    parser = parser or ToolCallStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
@@ -2,83 +2,132 @@ import os
 import re
 import ast
 import json
-import yaml
-import pathlib
+import threading
 # import google.generativeai as genai
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Mapping
 from google.adk.tools.function_tool import FunctionTool
+from google.adk.tools.tool_context import ToolContext
 import webbrowser
 import os
 # import google.genai as genai 
 
 # Initialize Gemini API key
 # genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-import google.genai as genai
 # genai.configure()  
-client = genai.Client()           
 # client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+# The Gemini client is built on first use so importing the agents stays cheap on cold start
+client = None
+_client_lock = threading.Lock()
 
-# Load capabilities catalog with robust path resolution for Cloud Run
-def load_capabilities():
-    """Load capabilities.yaml with multiple fallback paths for different environments"""
-    possible_paths = [
-        # Local development path
-        pathlib.Path(__file__).parents[2] / "capabilities.yaml",
-        # Cloud Run path (when deployed)
-        pathlib.Path("/app/agents/capabilities.yaml"),
-        # Alternative Cloud Run path
-        pathlib.Path("/app/cloud_orchestrator/agents/capabilities.yaml"),
-        # Current directory fallback
-        pathlib.Path("capabilities.yaml"),
-        # Parent directory fallback
-        pathlib.Path("../capabilities.yaml"),
-    ]
-    
-    for cap_path in possible_paths:
-        if cap_path.exists():
-            try:
-                with open(cap_path, 'r') as f:
-                    return yaml.safe_load(f)
-            except Exception as e:
-                print(f"Warning: Could not load capabilities from {cap_path}: {e}")
-                continue
-    
-    # If no file found, return a minimal default
-    print("Warning: No capabilities.yaml found, using minimal default")
-    return {
-        "actions": {
-            "compute.create_vm": {"params": {"required": ["project_id", "zone", "instance_name"]}},
-            "bigquery.create_dataset": {"params": {"required": ["project_id", "dataset_id"]}},
-            "pubsub.create_topic": {"params": {"required": ["project_id", "topic_id"]}},
-            "dataflow.launch_flex_template": {"params": {"required": ["project_id", "region", "job_name"]}},
-            "iam.create_sa": {"params": {"required": ["project_id", "display_name"]}},
-            "cloudrun.deploy_service": {"params": {"required": ["project_id", "region", "service_name"]}},
-            "vpc.manage_vpc_network": {"params": {"required": ["project_id", "network_name"]}},
-            "storage.create_bucket": {"params": {"required": ["project_id", "bucket_name"]}},
-            "cloudsql.create_instance": {"params": {"required": ["project_id", "instance_name"]}},
-            "vertex.train_custom": {"params": {"required": ["project_id", "region", "job_name"]}},
-            "gke.create_cluster": {"params": {"required": ["project_id", "region", "cluster_name"]}},
-            "secretmanager.create_secret": {"params": {"required": ["project_id", "secret_id"]}},
-        }
-    }
+def get_client():
+    """Return the shared genai.Client, constructing it on first call."""
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                import google.genai as genai
+                client = genai.Client()
+    return client
+from .llm_cache import get_llm_cache, normalize_prompt
+from ...common.single_flight import SingleFlight
+from ...common.metrics import add_collector, cache_collector, instrumented, track
+from ...common.session_state import ACCOUNT_KEY, AUTH_STATE_TTL_SECONDS, gcloud_account, get_cached, put_cached
+from .plan_stream import ToolCallStreamParser
+from .capability_index import get_capability_index, thaw
+from .dag_scheduler import schedule_dag, describe_problems, schedule_summary
+from .usage_estimator import estimate_usage
+from .project_index import get_project_index
+from .fast_path import (
+    fast_path_enabled,
+    fast_parse_user_goal,
+    fast_build_service_dag,
+    confident_services,
+    min_confidence,
+)
 
-CAPS = load_capabilities()
+def get_capabilities() -> Mapping[str, Any]:
+    """Read-only capabilities catalog from the shared capability index."""
+    return get_capability_index().catalog
 
-def call_llm(prompt: str, model: str = "gemini-2.5-flash") -> str:
-    response = client.models.generate_content(
-        model=model,
-       
-        contents=prompt,
+def __getattr__(name):
+    # Keep `planner_tool.CAPS` working for callers without loading the YAML at import time
+    if name == "CAPS":
+        return get_capabilities()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    )
-    return response.text.strip()
+# Identical prompts in flight at the same time (bursts of the same pipeline request
+# from several sessions) share one model call instead of each paying for it
+_llm_flight = SingleFlight("llm")
+
+def _llm_cache_stats() -> Dict[str, tuple]:
+    cache = get_llm_cache()
+    if cache is None:
+        return {}
+    stats = cache.stats()
+    return {"llm_response": (stats["memory_hits"] + stats["disk_hits"], stats["misses"])}
+
+def _flight_stats():
+    stats = _llm_flight.stats()
+    yield ("cloud_orchestrator_single_flight_calls_total", "counter",
+           "LLM calls that ran (executions) or joined one already in flight (shared).",
+           [({"flight": "llm", "outcome": k}, stats[k]) for k in ("executions", "shared")])
+
+add_collector("llm_cache", cache_collector(_llm_cache_stats))
+add_collector("llm_flight", _flight_stats)
+
+def plan_key(prompt: str, project_id: str = None) -> tuple:
+    """Coalescing key for a whole planning run: normalized prompt plus project."""
+    return normalize_prompt(prompt), (project_id or "").strip()
+
+def call_llm(prompt: str, model: str = "gemini-2.5-flash", use_cache: bool = True) -> str:
+    """
+    Send a prompt to Gemini and return the stripped text.
+    Identical (whitespace-normalized) prompts are served from the LLM response cache,
+    and concurrent identical calls wait for the one already in flight.
+    """
+    cache = get_llm_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(model, prompt)
+        if cached is not None:
+            return cached
+
+    def generate():
+        with track("llm", model):
+            response = get_client().models.generate_content(
+                model=model,
+               
+                contents=prompt,
+
+            )
+        text = response.text.strip()
+        if cache is not None:
+            cache.set(model, prompt, text)
+        return text
+    return _llm_flight.do((model, normalize_prompt(prompt), use_cache), generate)
+
+def forget_llm_response(prompt: str, model: str = "gemini-2.5-flash") -> None:
+    """Evict a cached response that could not be parsed so the next call asks the model again."""
+    cache = get_llm_cache()
+    if cache is not None:
+        cache.delete(model, prompt)
 
 # ───────────────────────── Authentication & Project Setup ───────────────────────── #
 @FunctionTool
-def check_gcloud_auth() -> Dict[str, Any]:
+def check_gcloud_auth(tool_context: ToolContext = None) -> Dict[str, Any]:
     """
     Check if user is authenticated with gcloud CLI and return authentication status.
+    An authenticated account is remembered in the session for a while, as long as
+    gcloud's config files still name it (a revoke or account switch clears the match).
     """
+    account = get_cached(tool_context, ACCOUNT_KEY, AUTH_STATE_TTL_SECONDS)
+    if account and gcloud_account() == account:
+        return {
+            "status": "authenticated",
+            "message": f"✅ User is authenticated as: {account}",
+            "account": account,
+            "authenticated": True,
+            "cached": True
+        }
     try:
         import subprocess
         import json
@@ -95,6 +144,7 @@ def check_gcloud_auth() -> Dict[str, Any]:
             auth_data = json.loads(result.stdout)
             if auth_data:
                 account = auth_data[0].get("account", "Unknown")
+                put_cached(tool_context, ACCOUNT_KEY, account)
                 return {
                     "status": "authenticated",
                     "message": f"✅ User is authenticated as: {account}",
@@ -102,6 +152,8 @@ def check_gcloud_auth() -> Dict[str, Any]:
                     "authenticated": True
                 }
             else:
+                # Clear the account agent instructions show from session state
+                put_cached(tool_context, ACCOUNT_KEY, "")
                 return {
                     "status": "not_authenticated",
                     "message": "❌ User is not authenticated with gcloud CLI",
@@ -130,47 +182,23 @@ def check_gcloud_auth() -> Dict[str, Any]:
         }
 
 @FunctionTool
-def list_gcp_projects() -> Dict[str, Any]:
+def list_gcp_projects(query: str = "", label_filter: str = "", page_size: int = 20,
+                      page_token: str = "", refresh: bool = False) -> Dict[str, Any]:
     """
-    List all available GCP projects for the authenticated user.
+    Search the GCP projects available to the authenticated user and return one page of the best matches.
+
+    query matches project ids and names by prefix, substring or fuzzily ("" lists all).
+    label_filter is comma-separated, e.g. "env=prod,team" (team only has to be present).
+    Pass next_page_token back as page_token for more; refresh=True re-fetches the project list.
     """
     try:
-        import subprocess
-        import json
-        
-        # List projects
-        result = subprocess.run(
-            ["gcloud", "projects", "list", "--format=json"],
-            capture_output=True,
-            text=True,
-            timeout=15
-        )
-        
-        if result.returncode == 0:
-            projects_data = json.loads(result.stdout)
-            projects = []
-            
-            for project in projects_data:
-                projects.append({
-                    "project_id": project.get("projectId", ""),
-                    "name": project.get("name", ""),
-                    "project_number": project.get("projectNumber", ""),
-                    "state": project.get("lifecycleState", "")
-                })
-            
-            return {
-                "status": "success",
-                "message": f"✅ Found {len(projects)} GCP projects",
-                "projects": projects,
-                "total_projects": len(projects)
-            }
-        else:
-            return {
-                "status": "error",
-                "message": f"❌ Failed to list projects: {result.stderr}",
-                "error": result.stderr
-            }
-            
+        page = get_project_index().search(query, label_filter, page_size, page_token, refresh)
+        found = f"{page['total_matches']} matching" if query or label_filter else str(page["total_matches"])
+        return {
+            "status": "success",
+            "message": f"✅ Found {found} GCP projects (showing {len(page['projects'])})",
+            **page
+        }
     except Exception as e:
         return {
             "status": "error",
@@ -195,6 +223,7 @@ def create_gcp_project(project_id: str, project_name: str) -> Dict[str, Any]:
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
         
         if result.returncode == 0:
+            get_project_index().invalidate()
             return {
                 "status": "success",
                 "message": f"✅ Successfully created project: {project_id}",
@@ -279,6 +308,7 @@ def setup_cloud_environment() -> Dict[str, Any]:
 
 # ───────────────────────── visualize DAG ───────────────────────── #
 @FunctionTool
+@instrumented("render", "open_dag_page")
 def open_dag_page(parsed_response: dict, filename: str = "dag_visualization.html") -> Dict[str, str]:
     """
     Generate an HTML page rendering the DAG or tool calls via Cytoscape and open it in a browser.
@@ -520,25 +550,14 @@ def create_inline_dag_display(dag: Dict[str, List[str]]) -> Dict[str, str]:
         if "error" in dag:
             return {"error": f"DAG build failed: {dag['error']}"}
         
-        # Find services with no dependencies (root nodes)
-        all_services = set(dag.keys())
-        dependent_services = set()
-        for deps in dag.values():
-            dependent_services.update(deps)
-        root_services = all_services - dependent_services
+        schedule = schedule_dag(dag)
+        problem = describe_problems(schedule)
+        if problem:
+            return {"error": f"DAG cannot be scheduled: {problem}"}
         
-        # Create topological order
-        ordered, seen = [], set()
-        def visit(svc):
-            if svc in seen:
-                return
-            for dep in dag.get(svc, []):
-                visit(dep)
-            seen.add(svc)
-            ordered.append(svc)
-        
-        for svc in dag:
-            visit(svc)
+        ordered = schedule.order
+        # Services with no dependencies make up the first wave
+        root_services = schedule.waves[0] if schedule.waves else []
         
         # Build the visualization
         lines = []
@@ -567,17 +586,27 @@ def create_inline_dag_display(dag: Dict[str, List[str]]) -> Dict[str, str]:
                 lines.append(f"  **{svc}** (starts here)")
         lines.append("")
         
+        # Show which services can be provisioned together
+        lines.append("⚡ **Parallel Waves:**")
+        for i, wave in enumerate(schedule.waves, 1):
+            lines.append(f"  Wave {i}: " + ", ".join(f"**{svc}**" for svc in wave))
+        lines.append(f"  Critical path: {' → '.join(schedule.critical_path)}")
+        lines.append("")
+        
         # Show summary
         lines.append("📊 **Summary:**")
         lines.append(f"  • Total services: {len(ordered)}")
         lines.append(f"  • Root services (no dependencies): {len(root_services)}")
         lines.append(f"  • Services with dependencies: {len(ordered) - len(root_services)}")
+        lines.append(f"  • Parallel waves: {len(schedule.waves)}")
         
         return {
             "status": "success", 
             "inline_dag": "\n".join(lines),
             "execution_order": ordered,
-            "root_services": list(root_services)
+            "root_services": list(root_services),
+            "waves": schedule.waves,
+            "critical_path": schedule.critical_path
         }
         
     except Exception as e:
@@ -590,7 +619,14 @@ def parse_user_goal(prompt: str) -> Dict[str, Any]:
     Run LLM over the raw user prompt → return a short intent blob:
       { goal: str, hints: List[str] }
     Cleans code fences from LLM output before JSON parsing.
+    Prompts that plainly name their services are answered by the local fast path
+    without calling the LLM.
     """
+    if fast_path_enabled():
+        fast = fast_parse_user_goal(prompt)
+        if fast["hints"] and fast["confidence"] >= min_confidence():
+            return fast
+
     system_msg = (
         "You are an assistant that extracts the high-level goal and explicit service hints from a GCP infrastructure request. "
         "Focus on identifying which of these 20 GCP services are mentioned or implied:\n"
@@ -629,16 +665,17 @@ def parse_user_goal(prompt: str) -> Dict[str, Any]:
     try:
         return json.loads(cleaned)
     except Exception as e:
+        forget_llm_response(full)
         return {"error": f"Could not parse intent JSON: {e}\nRaw: {cleaned}"}
 
 # 2. Capability catalog lookup
 @FunctionTool
 def lookup_capability(action: str) -> Dict[str, Any]:
-    spec = CAPS.get("actions", {}).get(action)
-    if not spec:
+    spec = get_capability_index().spec(action)
+    if spec is None:
         return {"error": f"Action '{action}' not in capabilities"}
-    spec_out = spec.copy()
-    spec_out["needs_design"] = (spec == "TBD")
+    spec_out = thaw(spec.raw)
+    spec_out["needs_design"] = spec.needs_design
     return spec_out
 
 # 3. High-level planning: build_service_dag
@@ -652,6 +689,12 @@ def build_service_dag(intent_blob: Dict[str, Any]) -> Dict[str, List[str]]:
     if "error" in intent_blob:
         return {"error": f"Intent parsing failed: {intent_blob['error']}"}
     
+    # Confident fast-path intents get their DAG from the canonical dependency table
+    if fast_path_enabled():
+        known_services = confident_services(intent_blob)
+        if known_services:
+            return fast_build_service_dag(known_services)
+    
     services = [
         "Compute Engine", "BigQuery", "Pub/Sub", "Dataflow", "IAM", "Cloud Run", 
         "VPC", "Dataproc", "Firestore", "Cloud Storage", "Cloud SQL", "Cloud Logging", 
@@ -686,8 +729,12 @@ def build_service_dag(intent_blob: Dict[str, Any]) -> Dict[str, List[str]]:
     clean = re.sub(r"^```[a-z]*|```$", "", raw, flags=re.IGNORECASE).strip()
     try:
         dag = ast.literal_eval(clean)
-        return dag if isinstance(dag, dict) else {"error": "DAG not a dict"}
+        if isinstance(dag, dict):
+            return dag
+        forget_llm_response(prompt)
+        return {"error": "DAG not a dict"}
     except Exception as e:
+        forget_llm_response(prompt)
         return {"error": f"Failed parse DAG: {e}\nRaw: {raw}"}
 
 # 4. Mid-level planning: expand_to_tool_plan
@@ -701,86 +748,55 @@ def expand_to_tool_plan(dag: Dict[str, List[str]]) -> Dict[str, Any]:
     if "error" in dag:
         return {"error": f"DAG build failed: {dag['error']}"}
     
-    # Service to action mapping
-    service_to_actions = {
-        "Compute Engine": ["compute.create_vm", "compute.delete_vm", "compute.get_external_ip", "compute.snapshot_disk"],
-        "BigQuery": ["bigquery.create_dataset", "bigquery.create_table", "bigquery.insert_json", "bigquery.export_table_gcs"],
-        "Pub/Sub": ["pubsub.create_topic", "pubsub.create_subscription", "pubsub.publish", "pubsub.pull"],
-        "Dataflow": ["dataflow.launch_flex_template", "dataflow.monitor_job", "dataflow.cancel_job", "dataflow.list_jobs"],
-        "IAM": ["iam.create_sa", "iam.grant_role", "iam.delete_sa"],
-        "Cloud Run": ["cloudrun.deploy_service", "cloudrun.update_env", "cloudrun.pause_service", "cloudrun.delete_service"],
-        "VPC": ["vpc.manage_vpc_network", "vpc.check_network_subnets", "vpc.add_serverless_connector"],
-        "Dataproc": ["dataproc.create_cluster", "dataproc.run_pyspark", "dataproc.delete_cluster", "dataproc.submit_hivejob"],
-        "Firestore": ["firestore.create_db", "firestore.set_ttl", "firestore.seed_docs", "firestore.export_gcs"],
-        "Cloud Storage": ["storage.create_bucket", "storage.upload_blob", "storage.set_lifecycle_rule"],
-        "Cloud SQL": ["cloudsql.create_instance", "cloudsql.import_sql", "cloudsql.set_ip", "cloudsql.delete_instance"],
-        "Cloud Logging": ["logging.create_sink", "logging.list_sinks"],
-        "Cloud Build": ["cloudbuild.build_docker", "cloudbuild.clone_repo_zip"],
-        "Artifact Registry": ["artifactregistry.create_repo", "artifactregistry.push_image", "artifactregistry.delete_repo"],
-        "Vertex AI": ["vertex.train_custom", "vertex.deploy_endpoint", "vertex.batch_predict", "vertex.delete_endpoint"],
-        "GKE Autopilot": ["gke.create_cluster", "gke.helm_install", "gke.scale_deployment", "gke.delete_cluster"],
-        "Cloud Monitoring": ["cloudmonitoring.create_dashboard", "cloudmonitoring.create_alert", "cloudmonitoring.delete_dashboard"],
-        "Cloud Deploy": ["clouddeploy.promote_release", "clouddeploy.watch_rollout", "clouddeploy.rollback_release"],
-        "Secret Manager": ["secretmanager.create_secret", "secretmanager.add_version", "secretmanager.access_secret"],
-        "Cloud Functions": ["cloudfunctions.deploy", "cloudfunctions.update", "cloudfunctions.delete"]
-    }
+    schedule = schedule_dag(dag)
+    problem = describe_problems(schedule)
+    if problem:
+        return {"error": f"DAG cannot be scheduled: {problem}"}
     
+    index = get_capability_index()
     plan = []
-    seen = set()
     
-    def visit(svc):
-        if svc in seen:
-            return
-        for dep in dag.get(svc, []):
-            visit(dep)
-        seen.add(svc)
-        
-        # Get available actions for this service
-        actions = service_to_actions.get(svc, [])
-        if actions:
-            # Use the first action as the primary action for this service
-            primary_action = actions[0]
-            # Get required parameters from capabilities
-            action_spec = CAPS.get("actions", {}).get(primary_action, {})
+    for wave, services in enumerate(schedule.waves):
+        for svc in services:
+            depends_on = list(dag.get(svc, []))
             
-            # Handle case where action_spec might be a string (like "TBD")
-            if isinstance(action_spec, dict):
-                req = action_spec.get("params", {}).get("required") or []
+            # Get available actions for this service
+            actions = index.actions_for_service(svc)
+            if actions:
+                # Use the first action as the primary action for this service
+                primary_action = actions[0]
+                params = {p: None for p in index.required_params(primary_action)}
+                plan.append({
+                    "service": svc,
+                    "action": primary_action,
+                    "params": params,
+                    "available_actions": list(actions),
+                    "depends_on": depends_on,
+                    "wave": wave
+                })
             else:
-                # If action_spec is a string (like "TBD"), use empty required params
-                req = []
-            
-            params = {p: None for p in req}
-            plan.append({
-                "service": svc,
-                "action": primary_action,
-                "params": params,
-                "available_actions": actions
-            })
-        else:
-            # Fallback for unknown services
-            plan.append({
-                "service": svc,
-                "action": f"{svc.lower().replace(' ', '')}.setup",
-                "params": {},
-                "available_actions": [],
-                "note": "Service not fully implemented in capabilities"
-            })
-    
-    # Process services in dependency order
-    for svc in dag:
-        visit(svc)
+                # Fallback for unknown services
+                plan.append({
+                    "service": svc,
+                    "action": f"{svc.lower().replace(' ', '')}.setup",
+                    "params": {},
+                    "available_actions": [],
+                    "depends_on": depends_on,
+                    "wave": wave,
+                    "note": "Service not fully implemented in capabilities"
+                })
     
     # Create inline DAG display for chat
     inline_dag_result = create_inline_dag_display(dag)
     
     # visualize the DAG in browser (optional)
-    open_dag_page(dag)
+    open_dag_page.func(dag)
     
     return {
         "tool_plan": plan,
-        "execution_order": list(seen),
-        "total_services": len(seen),
+        "execution_order": schedule.order,
+        "execution_waves": schedule_summary(schedule),
+        "total_services": len(schedule.order),
         "inline_dag_display": inline_dag_result.get("inline_dag", "Failed to create inline display"),
         "dag_summary": {
             "root_services": inline_dag_result.get("root_services", []),
@@ -802,20 +818,17 @@ def extract_services(dag: Dict[str, List[str]]) -> Dict[str, Any]:
     if "error" in dag:
         return {"error": f"DAG build failed: {dag['error']}"}
     
-    # simple topological order: parents before children
-    ordered, seen = [], set()
-    def visit(s):
-        if s in seen: return
-        for dep in dag.get(s, []): visit(dep)
-        seen.add(s)
-        ordered.append(s)
-    for svc in dag:
-        visit(svc)
+    # topological order: parents before children, grouped into parallel waves
+    schedule = schedule_dag(dag)
+    problem = describe_problems(schedule)
+    if problem:
+        return {"error": f"DAG cannot be scheduled: {problem}"}
     
     return {
-        "selected_services": ordered,
-        "total_services": len(ordered),
-        "service_dependencies": dag
+        "selected_services": schedule.order,
+        "total_services": len(schedule.order),
+        "service_dependencies": dag,
+        "execution_waves": schedule.waves
     }
 
 # 6. Map each service to its available tools
@@ -828,39 +841,17 @@ def map_services_to_tools(selected_services: List[str]) -> Dict[str, Any]:
     if not isinstance(selected_services, list):
         return {"error": f"Expected list for selected_services, got {type(selected_services).__name__}: {selected_services}"}
     
-    # Service to action mapping (same as in expand_to_tool_plan)
-    service_to_actions = {
-        "Compute Engine": ["compute.create_vm", "compute.delete_vm", "compute.get_external_ip", "compute.snapshot_disk"],
-        "BigQuery": ["bigquery.create_dataset", "bigquery.create_table", "bigquery.insert_json", "bigquery.export_table_gcs"],
-        "Pub/Sub": ["pubsub.create_topic", "pubsub.create_subscription", "pubsub.publish", "pubsub.pull"],
-        "Dataflow": ["dataflow.launch_flex_template", "dataflow.monitor_job", "dataflow.cancel_job", "dataflow.list_jobs"],
-        "IAM": ["iam.create_sa", "iam.grant_role", "iam.delete_sa"],
-        "Cloud Run": ["cloudrun.deploy_service", "cloudrun.update_env", "cloudrun.pause_service", "cloudrun.delete_service"],
-        "VPC": ["vpc.manage_vpc_network", "vpc.check_network_subnets", "vpc.add_serverless_connector"],
-        "Dataproc": ["dataproc.create_cluster", "dataproc.run_pyspark", "dataproc.delete_cluster", "dataproc.submit_hivejob"],
-        "Firestore": ["firestore.create_db", "firestore.set_ttl", "firestore.seed_docs", "firestore.export_gcs"],
-        "Cloud Storage": ["storage.create_bucket", "storage.upload_blob", "storage.set_lifecycle_rule"],
-        "Cloud SQL": ["cloudsql.create_instance", "cloudsql.import_sql", "cloudsql.set_ip", "cloudsql.delete_instance"],
-        "Cloud Logging": ["logging.create_sink", "logging.list_sinks"],
-        "Cloud Build": ["cloudbuild.build_docker", "cloudbuild.clone_repo_zip"],
-        "Artifact Registry": ["artifactregistry.create_repo", "artifactregistry.push_image", "artifactregistry.delete_repo"],
-        "Vertex AI": ["vertex.train_custom", "vertex.deploy_endpoint", "vertex.batch_predict", "vertex.delete_endpoint"],
-        "GKE Autopilot": ["gke.create_cluster", "gke.helm_install", "gke.scale_deployment", "gke.delete_cluster"],
-        "Cloud Monitoring": ["cloudmonitoring.create_dashboard", "cloudmonitoring.create_alert", "cloudmonitoring.delete_dashboard"],
-        "Cloud Deploy": ["clouddeploy.promote_release", "clouddeploy.watch_rollout", "clouddeploy.rollback_release"],
-        "Secret Manager": ["secretmanager.create_secret", "secretmanager.add_version", "secretmanager.access_secret"],
-        "Cloud Functions": ["cloudfunctions.deploy", "cloudfunctions.update", "cloudfunctions.delete"]
-    }
+    index = get_capability_index()
     
     mapping = {}
     total_tools = 0
     
     for svc in selected_services:
-        actions = service_to_actions.get(svc, [])
+        actions = index.actions_for_service(svc)
         tool_names = [action.split('.', 1)[1] for action in actions]
         mapping[svc] = {
             "tools": tool_names,
-            "actions": actions,
+            "actions": list(actions),
             "tool_count": len(tool_names)
         }
         total_tools += len(tool_names)
@@ -1000,7 +991,12 @@ def check_quota_before_planning(project_id: str, tool_calls: List[Dict[str, Any]
         ]
         
         check_quota = None
-        for check_path in possible_check_paths:
+        try:
+            # Package import shares the process-wide token cache with the other tools
+            from ...guard_agent.tools.check import check_quota
+        except ImportError:
+            pass
+        for check_path in possible_check_paths if check_quota is None else []:
             if os.path.exists(os.path.join(check_path, 'check.py')):
                 try:
                     sys.path.insert(0, check_path)
@@ -1018,314 +1014,9 @@ def check_quota_before_planning(project_id: str, tool_calls: List[Dict[str, Any]
                 "tool_calls_analyzed": len(tool_calls)
             }
         
-        # Map tool actions to GCP services and their typical resource usage
-        service_quota_mapping = {
-            # Compute Engine
-            "compute.create_vm": {
-                "service": "compute.googleapis.com",
-                "regions": {"us-central1": {"cpus": 2, "instances": 1}},
-                "global": {"instances": 1}
-            },
-            "compute.delete_vm": {
-                "service": "compute.googleapis.com",
-                "regions": {"us-central1": {"cpus": 0, "instances": 0}},
-                "global": {"instances": 0}
-            },
-            
-            # BigQuery
-            "bigquery.create_dataset": {
-                "service": "bigquery.googleapis.com",
-                "global": {"datasets": 1}
-            },
-            "bigquery.create_table": {
-                "service": "bigquery.googleapis.com",
-                "global": {"tables": 1}
-            },
-            
-            # Pub/Sub
-            "pubsub.create_topic": {
-                "service": "pubsub.googleapis.com",
-                "global": {"topics": 1}
-            },
-            "pubsub.create_subscription": {
-                "service": "pubsub.googleapis.com",
-                "global": {"subscriptions": 1}
-            },
-            
-            # Dataflow
-            "dataflow.launch_flex_template": {
-                "service": "dataflow.googleapis.com",
-                "regions": {"us-central1": {"jobs": 1, "cpus": 4}},
-                "global": {"jobs": 1}
-            },
-            "dataflow.monitor_job": {
-                "service": "dataflow.googleapis.com",
-                "regions": {"us-central1": {"jobs": 0}},
-                "global": {"jobs": 0}
-            },
-            
-            # IAM
-            "iam.create_sa": {
-                "service": "iam.googleapis.com",
-                "global": {"service_accounts": 1}
-            },
-            "iam.grant_role": {
-                "service": "iam.googleapis.com",
-                "global": {"service_accounts": 0}
-            },
-            
-            # Cloud Run
-            "cloudrun.deploy_service": {
-                "service": "run.googleapis.com",
-                "regions": {"us-central1": {"services": 1, "revisions": 1}},
-                "global": {"services": 1}
-            },
-            "cloudrun.update_env": {
-                "service": "run.googleapis.com",
-                "regions": {"us-central1": {"revisions": 1}},
-                "global": {"services": 0}
-            },
-            
-            # VPC
-            "vpc.manage_vpc_network": {
-                "service": "compute.googleapis.com",
-                "global": {"networks": 1}
-            },
-            "vpc.check_network_subnets": {
-                "service": "compute.googleapis.com",
-                "global": {"subnetworks": 1}
-            },
-            
-            # Dataproc
-            "dataproc.create_cluster": {
-                "service": "dataproc.googleapis.com",
-                "regions": {"us-central1": {"clusters": 1, "cpus": 8}},
-                "global": {"clusters": 1}
-            },
-            "dataproc.run_pyspark": {
-                "service": "dataproc.googleapis.com",
-                "regions": {"us-central1": {"jobs": 1}},
-                "global": {"jobs": 1}
-            },
-            
-            # Firestore
-            "firestore.create_db": {
-                "service": "firestore.googleapis.com",
-                "global": {"databases": 1}
-            },
-            "firestore.seed_docs": {
-                "service": "firestore.googleapis.com",
-                "global": {"databases": 0}
-            },
-            
-            # Cloud Storage
-            "storage.create_bucket": {
-                "service": "storage.googleapis.com",
-                "global": {"buckets": 1}
-            },
-            "storage.upload_blob": {
-                "service": "storage.googleapis.com",
-                "global": {"buckets": 0}
-            },
-            
-            # Cloud SQL
-            "cloudsql.create_instance": {
-                "service": "sqladmin.googleapis.com",
-                "regions": {"us-central1": {"instances": 1}},
-                "global": {"instances": 1}
-            },
-            "cloudsql.import_sql": {
-                "service": "sqladmin.googleapis.com",
-                "regions": {"us-central1": {"instances": 0}},
-                "global": {"instances": 0}
-            },
-            "cloudsql.set_ip": {
-                "service": "sqladmin.googleapis.com",
-                "regions": {"us-central1": {"instances": 0}},
-                "global": {"instances": 0}
-            },
-            "cloudsql.delete_instance": {
-                "service": "sqladmin.googleapis.com",
-                "regions": {"us-central1": {"instances": -1}},
-                "global": {"instances": -1}
-            },
-            
-            # Cloud Logging
-            "logging.create_sink": {
-                "service": "logging.googleapis.com",
-                "global": {"sinks": 1}
-            },
-            "logging.list_sinks": {
-                "service": "logging.googleapis.com",
-                "global": {"sinks": 0}
-            },
-            
-            # Cloud Build
-            "cloudbuild.build_docker": {
-                "service": "cloudbuild.googleapis.com",
-                "global": {"builds": 1}
-            },
-            "cloudbuild.clone_repo_zip": {
-                "service": "cloudbuild.googleapis.com",
-                "global": {"builds": 1}
-            },
-            
-            # Artifact Registry
-            "artifactregistry.create_repo": {
-                "service": "artifactregistry.googleapis.com",
-                "regions": {"us-central1": {"repositories": 1}},
-                "global": {"repositories": 1}
-            },
-            "artifactregistry.push_image": {
-                "service": "artifactregistry.googleapis.com",
-                "regions": {"us-central1": {"repositories": 0}},
-                "global": {"repositories": 0}
-            },
-            "artifactregistry.delete_repo": {
-                "service": "artifactregistry.googleapis.com",
-                "regions": {"us-central1": {"repositories": -1}},
-                "global": {"repositories": -1}
-            },
-            
-            # Vertex AI
-            "vertex.train_custom": {
-                "service": "aiplatform.googleapis.com",
-                "regions": {"us-central1": {"training_jobs": 1, "cpus": 8}},
-                "global": {"training_jobs": 1}
-            },
-            "vertex.deploy_endpoint": {
-                "service": "aiplatform.googleapis.com",
-                "regions": {"us-central1": {"endpoints": 1}},
-                "global": {"endpoints": 1}
-            },
-            "vertex.batch_predict": {
-                "service": "aiplatform.googleapis.com",
-                "regions": {"us-central1": {"batch_prediction_jobs": 1}},
-                "global": {"batch_prediction_jobs": 1}
-            },
-            "vertex.delete_endpoint": {
-                "service": "aiplatform.googleapis.com",
-                "regions": {"us-central1": {"endpoints": -1}},
-                "global": {"endpoints": -1}
-            },
-            
-            # GKE Autopilot
-            "gke.create_cluster": {
-                "service": "container.googleapis.com",
-                "regions": {"us-central1": {"clusters": 1}},
-                "global": {"clusters": 1}
-            },
-            "gke.helm_install": {
-                "service": "container.googleapis.com",
-                "regions": {"us-central1": {"clusters": 0}},
-                "global": {"clusters": 0}
-            },
-            "gke.scale_deployment": {
-                "service": "container.googleapis.com",
-                "regions": {"us-central1": {"clusters": 0}},
-                "global": {"clusters": 0}
-            },
-            "gke.delete_cluster": {
-                "service": "container.googleapis.com",
-                "regions": {"us-central1": {"clusters": -1}},
-                "global": {"clusters": -1}
-            },
-            
-            # Cloud Monitoring
-            "cloudmonitoring.create_dashboard": {
-                "service": "monitoring.googleapis.com",
-                "global": {"dashboards": 1}
-            },
-            "cloudmonitoring.create_alert": {
-                "service": "monitoring.googleapis.com",
-                "global": {"alert_policies": 1}
-            },
-            "cloudmonitoring.delete_dashboard": {
-                "service": "monitoring.googleapis.com",
-                "global": {"dashboards": -1}
-            },
-            
-            # Cloud Deploy
-            "clouddeploy.promote_release": {
-                "service": "clouddeploy.googleapis.com",
-                "regions": {"us-central1": {"releases": 1}},
-                "global": {"releases": 1}
-            },
-            "clouddeploy.watch_rollout": {
-                "service": "clouddeploy.googleapis.com",
-                "regions": {"us-central1": {"rollouts": 1}},
-                "global": {"rollouts": 1}
-            },
-            "clouddeploy.rollback_release": {
-                "service": "clouddeploy.googleapis.com",
-                "regions": {"us-central1": {"releases": 0}},
-                "global": {"releases": 0}
-            },
-            
-            # Secret Manager
-            "secretmanager.create_secret": {
-                "service": "secretmanager.googleapis.com",
-                "global": {"secrets": 1}
-            },
-            "secretmanager.add_version": {
-                "service": "secretmanager.googleapis.com",
-                "global": {"secrets": 0}
-            },
-            "secretmanager.access_secret": {
-                "service": "secretmanager.googleapis.com",
-                "global": {"secrets": 0}
-            },
-            
-            # Cloud Functions
-            "cloudfunctions.deploy": {
-                "service": "cloudfunctions.googleapis.com",
-                "regions": {"us-central1": {"functions": 1}},
-                "global": {"functions": 1}
-            },
-            "cloudfunctions.update": {
-                "service": "cloudfunctions.googleapis.com",
-                "regions": {"us-central1": {"functions": 0}},
-                "global": {"functions": 0}
-            },
-            "cloudfunctions.delete": {
-                "service": "cloudfunctions.googleapis.com",
-                "regions": {"us-central1": {"functions": -1}},
-                "global": {"functions": -1}
-            }
-        }
-        
-        # Aggregate planned usage by service and region
-        planned_usage = {}
-        
-        for tool_call in tool_calls:
-            action = tool_call.get("action", "")
-            if action in service_quota_mapping:
-                service_info = service_quota_mapping[action]
-                service = service_info["service"]
-                
-                if service not in planned_usage:
-                    planned_usage[service] = {}
-                
-                # Add regional quotas
-                if "regions" in service_info:
-                    for region, metrics in service_info["regions"].items():
-                        if region not in planned_usage[service]:
-                            planned_usage[service][region] = {}
-                        
-                        for metric, value in metrics.items():
-                            if metric not in planned_usage[service][region]:
-                                planned_usage[service][region][metric] = 0
-                            planned_usage[service][region][metric] += value
-                
-                # Add global quotas
-                if "global" in service_info:
-                    if "global" not in planned_usage[service]:
-                        planned_usage[service]["global"] = {}
-                    
-                    for metric, value in service_info["global"].items():
-                        if metric not in planned_usage[service]["global"]:
-                            planned_usage[service]["global"][metric] = 0
-                        planned_usage[service]["global"][metric] += value
+        # Derive usage from each call's machine types, worker counts and real region
+        estimate = estimate_usage(tool_calls)
+        planned_usage = estimate["planned_usage"]
         
         # If no planned usage, return early
         if not planned_usage:
@@ -1335,12 +1026,13 @@ def check_quota_before_planning(project_id: str, tool_calls: List[Dict[str, Any]
             }
         
         # Call the guard agent's check_quota function
-        quota_result = check_quota(project_id, planned_usage)
+        quota_result = getattr(check_quota, "func", check_quota)(project_id, planned_usage)
         
         return {
             "status": quota_result.get("status", "ERROR"),
             "message": quota_result.get("message", "Unknown error during quota check"),
             "planned_usage": planned_usage,
+            "resource_estimate": {"calls": estimate["calls"], "totals": estimate["totals"]},
             "tool_calls_analyzed": len(tool_calls)
         }
         
@@ -1351,14 +1043,8 @@ def check_quota_before_planning(project_id: str, tool_calls: List[Dict[str, Any]
             "error": str(e)
         }
 
-@FunctionTool
-def build_tool_plan(prompt: str) -> Dict[str, Any]:
-    """
-    Direct approach: Convert user prompt to ordered list of tool calls.
-    Input: free-form user request
-    Output: {"tool_calls": [{"action": "...", "params": {...}}, ...]}
-    """
-    SYSTEM = """
+TOOL_PLAN_MODEL = "gemini-2.5-flash"
+TOOL_PLAN_SYSTEM = """
 You are a GCP orchestration planner. Convert user requests into ordered tool calls.
 Respond ONLY with a Python list of tool-call dictionaries in execution order.
 
@@ -1405,13 +1091,17 @@ Output:
   {"action": "bigquery.create_table", "params": {"project_id": "my-project", "dataset_id": "analytics", "table_id": "events", "schema": "event_id:STRING,timestamp:TIMESTAMP,data:STRING"}}
 ]
 """
-    
-    model = "gemini-2.5-flash"
-    prompt = f"{SYSTEM}\nUSER:\n{prompt}"
-    raw = client.models.generate_content(
-        model=model,      
-        contents=prompt,
-    ).text
+
+@FunctionTool
+def build_tool_plan(prompt: str) -> Dict[str, Any]:
+    """
+    Direct approach: Convert user prompt to ordered list of tool calls.
+    Input: free-form user request
+    Output: {"tool_calls": [{"action": "...", "params": {...}}, ...]}
+    """
+    model = TOOL_PLAN_MODEL
+    prompt = f"{TOOL_PLAN_SYSTEM}\nUSER:\n{prompt}"
+    raw = call_llm(prompt, model=model)
     # raw = model.generate_content(f"{SYSTEM}\nUSER:\n{prompt}").text
     
     # Clean up the response
@@ -1422,7 +1112,39 @@ Output:
         if isinstance(tool_calls, list):
             return {"tool_calls": tool_calls}
         else:
+            forget_llm_response(prompt, model=model)
             return {"error": f"Expected list, got {type(tool_calls).__name__}"}
     except Exception as e:
+        forget_llm_response(prompt, model=model)
         return {"error": f"Could not parse tool list: {e}\nRaw: {raw}"}
 
+def stream_tool_plan(prompt: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of build_tool_plan.
+    Yields each tool-call dict as soon as the model has finished generating it,
+    so callers can start on step 1 while later steps are still being produced.
+    Cached responses are replayed through the same parser, and concurrent callers
+    with the same prompt share one model stream.
+    """
+    model = TOOL_PLAN_MODEL
+    full_prompt = f"{TOOL_PLAN_SYSTEM}\nUSER:\n{prompt}"
+    yield from _llm_flight.stream((model, normalize_prompt(full_prompt), "stream"),
+                                  lambda: _generate_tool_plan(model, full_prompt))
+
+def _generate_tool_plan(model: str, full_prompt: str) -> Iterator[Dict[str, Any]]:
+    parser = ToolCallStreamParser()
+
+    cache = get_llm_cache()
+    cached = cache.get(model, full_prompt) if cache is not None else None
+    if cached is not None:
+        yield from parser.feed(cached)
+        return
+
+    with track("llm_stream", model):
+        for chunk in get_client().models.generate_content_stream(model=model, contents=full_prompt):
+            yield from parser.feed(chunk.text or "")
+
+    if cache is not None and parser.complete and not parser.errors:
+        cache.set(model, full_prompt, parser.text.strip())
+    elif parser.errors:
+        print(f"Warning: streamed tool plan had unparseable steps: {parser.errors}")
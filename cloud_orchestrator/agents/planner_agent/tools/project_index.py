@@ -0,0 +1,225 @@
+"""
+Searchable in-process index of the caller's GCP projects.
+
+The full project list is fetched once (Resource Manager REST when ADC is
+available, `gcloud projects list` otherwise) and kept as a snapshot with sorted
+prefix keys. Once the snapshot is older than PROJECT_INDEX_TTL_SECONDS, searches
+keep answering from it while one background thread rebuilds it. Only the first
+search in a process waits for the fetch.
+
+search() ranks matches (exact id, then id/name/word prefix, then substring, then
+fuzzy), applies label filters and returns one page, so list_gcp_projects hands
+the model the top matches instead of the whole organization.
+"""
+import bisect
+import difflib
+import json
+import os
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from ...common.gcp_client import RESOURCE_MANAGER_API, request, rest_available
+
+PROJECT_INDEX_TTL_SECONDS = float(os.getenv("PROJECT_INDEX_TTL_SECONDS", "300"))
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+FUZZY_CUTOFF = 0.6
+
+# Score per kind of match; the best one wins for each project
+EXACT, ID_PREFIX, NAME_PREFIX, WORD_PREFIX, SUBSTRING = 100, 90, 80, 70, 50
+
+
+class ProjectRecord(NamedTuple):
+    project_id: str
+    name: str
+    project_number: str
+    state: str
+    labels: Dict[str, str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+def _record(project: Dict[str, Any]) -> ProjectRecord:
+    return ProjectRecord(
+        project_id=project.get("projectId", ""),
+        name=project.get("name", ""),
+        project_number=str(project.get("projectNumber", "")),
+        state=project.get("lifecycleState", ""),
+        labels=dict(project.get("labels") or {}),
+    )
+
+
+def fetch_projects() -> List[ProjectRecord]:
+    if rest_available():
+        projects, page_token = [], None
+        while True:
+            params = {"pageSize": 500}
+            if page_token:
+                params["pageToken"] = page_token
+            page = request("GET", f"{RESOURCE_MANAGER_API}/projects", params=params)
+            projects.extend(_record(p) for p in page.get("projects", []))
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return projects
+    result = subprocess.run(["gcloud", "projects", "list", "--format=json"],
+                            capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "gcloud projects list failed")
+    return [_record(p) for p in json.loads(result.stdout or "[]")]
+
+
+def parse_label_filter(label_filter: str) -> Dict[str, Optional[str]]:
+    """'env=prod, team' → {"env": "prod", "team": None}; None means the label just has to exist."""
+    labels: Dict[str, Optional[str]] = {}
+    for part in (label_filter or "").split(","):
+        key, sep, value = part.strip().partition("=")
+        if key.strip():
+            labels[key.strip().lower()] = value.strip().lower() if sep else None
+    return labels
+
+
+def _fuzzy_matches(query: str, projects: List[ProjectRecord]) -> Dict[int, int]:
+    # The query is seq2 so difflib analyses it once; the cheap upper bounds skip most projects
+    matcher = difflib.SequenceMatcher(None)
+    matcher.set_seq2(query)
+    scores: Dict[int, int] = {}
+    for i, p in enumerate(projects):
+        best = 0.0
+        for text in (p.project_id.lower(), p.name.lower()):
+            matcher.set_seq1(text)
+            if matcher.real_quick_ratio() >= FUZZY_CUTOFF and matcher.quick_ratio() >= FUZZY_CUTOFF:
+                best = max(best, matcher.ratio())
+        if best >= FUZZY_CUTOFF:
+            scores[i] = int(best * SUBSTRING)
+    return scores
+
+
+class _Snapshot:
+    def __init__(self, projects: List[ProjectRecord]):
+        self.projects = sorted(projects, key=lambda p: p.project_id)
+        self.built_at = time.monotonic()
+        keys: List[Tuple[str, int, int]] = []
+        for i, p in enumerate(self.projects):
+            project_id, name = p.project_id.lower(), p.name.lower()
+            keys.append((project_id, ID_PREFIX, i))
+            keys.append((name, NAME_PREFIX, i))
+            keys.extend((word, WORD_PREFIX, i) for word in set(name.replace("-", " ").split()[1:]))
+        keys.sort()
+        self.keys = keys
+        self.key_strings = [k[0] for k in keys]
+
+    def prefix_matches(self, query: str) -> Dict[int, int]:
+        scores: Dict[int, int] = {}
+        start = bisect.bisect_left(self.key_strings, query)
+        for key, score, i in self.keys[start:]:
+            if not key.startswith(query):
+                break
+            if key == query and score == ID_PREFIX:
+                score = EXACT
+            scores[i] = max(scores.get(i, 0), score)
+        return scores
+
+
+class ProjectIndex:
+    def __init__(self, ttl: float = PROJECT_INDEX_TTL_SECONDS, loader=fetch_projects):
+        self.ttl = ttl
+        self.loader = loader
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()  # one synchronous fetch at a time
+        self._install_lock = threading.Lock()  # guards _snapshot against invalidate()
+        self._generation = 0
+        self._refreshing = False
+        self.last_error: Optional[str] = None
+
+    def _build(self) -> Optional[_Snapshot]:
+        """Fetch and install a snapshot; None if invalidate() ran meanwhile, as the list may predate it."""
+        generation = self._generation
+        snapshot = _Snapshot(self.loader())
+        with self._install_lock:
+            if generation != self._generation:
+                return None
+            self._snapshot, self.last_error = snapshot, None
+        return snapshot
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self._build()
+        except Exception as e:
+            # Keep serving the previous snapshot; the next stale read retries
+            self.last_error = str(e)
+            print(f"Warning: Project index refresh failed: {e}")
+        finally:
+            self._refreshing = False
+
+    def snapshot(self, refresh: bool = False) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is None or refresh:
+            with self._lock:
+                while self._snapshot is None or self._snapshot is snapshot and refresh:
+                    built = self._build()
+                    if built is not None:
+                        return built
+                return self._snapshot
+        if time.monotonic() - snapshot.built_at >= self.ttl:
+            with self._lock:
+                start, self._refreshing = not self._refreshing, True
+            if start:
+                threading.Thread(target=self._refresh_in_background, name="project-index-refresh",
+                                 daemon=True).start()
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Force the next search to fetch the list again (e.g. after creating a project)."""
+        with self._install_lock:
+            self._generation += 1
+            self._snapshot = None
+
+    def search(self, query: str = "", label_filter: str = "", page_size: int = DEFAULT_PAGE_SIZE,
+               page_token: str = "", refresh: bool = False) -> Dict[str, Any]:
+        snapshot = self.snapshot(refresh)
+        query = (query or "").strip().lower()
+        if query:
+            scores = snapshot.prefix_matches(query)
+            for i, p in enumerate(snapshot.projects):
+                if i not in scores and (query in p.project_id.lower() or query in p.name.lower()):
+                    scores[i] = SUBSTRING
+            if not scores:
+                scores = _fuzzy_matches(query, snapshot.projects)
+            ranked = sorted(scores, key=lambda i: (-scores[i], snapshot.projects[i].project_id))
+        else:
+            ranked = list(range(len(snapshot.projects)))
+
+        labels = parse_label_filter(label_filter)
+        if labels:
+            def matches(p: ProjectRecord) -> bool:
+                have = {k.lower(): str(v).lower() for k, v in p.labels.items()}
+                return all(k in have and (v is None or have[k] == v) for k, v in labels.items())
+            ranked = [i for i in ranked if matches(snapshot.projects[i])]
+
+        page_size = max(1, min(int(page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+        offset = int(page_token) if str(page_token or "").isdigit() else 0
+        page = ranked[offset:offset + page_size]
+        more = offset + page_size < len(ranked)
+        return {
+            "projects": [snapshot.projects[i].to_dict() for i in page],
+            "total_matches": len(ranked),
+            "total_projects": len(snapshot.projects),
+            "next_page_token": str(offset + page_size) if more else "",
+            "index_age_seconds": round(time.monotonic() - snapshot.built_at, 1),
+        }
+
+
+_index: Optional[ProjectIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_project_index() -> ProjectIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ProjectIndex()
+    return _index
@@ -0,0 +1,196 @@
+"""
+Parameter-aware quota usage estimates for a tool plan.
+
+estimate_usage(tool_calls) derives vCPU, memory, disk, GPU and instance counts from
+each call's params (machine_type, worker counts, accelerators) using the local
+machine-type catalog, and places them in the region the call actually targets
+(region param, else the zone's region). The result's planned_usage has the
+service -> region|"global" -> metric shape check_quota expects.
+
+Actions without a dedicated estimator fall back to the static QUOTA_USAGE entry,
+moved to the call's real region.
+"""
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple
+
+from .capability_index import api_for_action, get_capability_index
+from ...guard_agent.tools.call_params import call_region, number_param, shape_param
+from ...guard_agent.tools.machine_types import MachineShape
+
+COMPUTE = "compute.googleapis.com"
+
+# Boot disk defaults (GB) when the params do not say otherwise
+VM_BOOT_DISK_GB = 10
+DATAFLOW_WORKER_DISK_GB = 250
+DATAPROC_NODE_DISK_GB = 1000
+
+DATAFLOW_DEFAULT_MACHINE_TYPE = "n1-standard-1"
+DATAPROC_DEFAULT_MACHINE_TYPE = "n2-standard-4"
+DATAPROC_DEFAULT_WORKERS = 2
+VERTEX_DEFAULT_MACHINE_TYPE = "n1-standard-4"
+
+
+class Footprint(NamedTuple):
+    instances: int = 0
+    vcpus: float = 0
+    memory_gb: float = 0
+    disk_gb: float = 0
+    gpus: int = 0
+
+    def __add__(self, other: "Footprint") -> "Footprint":
+        return Footprint(*(a + b for a, b in zip(self, other)))
+
+
+PlannedUsage = Dict[str, Dict[str, Dict[str, float]]]
+
+
+class _Usage:
+    def __init__(self):
+        self.planned: PlannedUsage = {}
+
+    def add(self, service: str, scope: str, metric: str, value: float) -> None:
+        metrics = self.planned.setdefault(service, {}).setdefault(scope, {})
+        metrics[metric] = metrics.get(metric, 0) + value
+
+    def add_vms(self, region: str, shape: MachineShape, count: int, disk_gb: float,
+                ssd: bool = False) -> Footprint:
+        """Compute Engine quota for count VMs of one shape; returns their footprint."""
+        vcpus = shape.vcpus * count
+        self.add(COMPUTE, region, shape.cpu_metric, vcpus)
+        self.add(COMPUTE, region, "instances", count)
+        self.add(COMPUTE, region, "ssd_total_storage" if ssd else "disks_total_storage", disk_gb * count)
+        if shape.gpu_metric:
+            self.add(COMPUTE, region, shape.gpu_metric, shape.gpus * count)
+        self.add(COMPUTE, "global", "cpus_all_regions", vcpus)
+        return Footprint(count, vcpus, shape.memory_gb * count, disk_gb * count, shape.gpus * count)
+
+
+# ───────────────────────── Per-action estimators ───────────────────────── #
+
+def _compute_vm(usage: _Usage, params: Mapping[str, Any], region: str) -> Footprint:
+    shape = shape_param(params, ("machine_type",), "e2-micro")
+    count = int(number_param(params, ("count", "instance_count"), 1))
+    disk_gb = number_param(params, ("boot_disk_size_gb", "disk_size_gb"), VM_BOOT_DISK_GB)
+    ssd = "ssd" in str(params.get("boot_disk_type", ""))
+    return usage.add_vms(region, shape, count, disk_gb, ssd)
+
+
+def _dataflow_job(usage: _Usage, params: Mapping[str, Any], region: str) -> Footprint:
+    # Worker options may sit in the template's parameters dict or next to it
+    options = dict(params)
+    if isinstance(params.get("parameters"), Mapping):
+        options.update(params["parameters"])
+    shape = shape_param(options, ("workerMachineType", "machineType", "worker_machine_type", "machine_type"),
+                   DATAFLOW_DEFAULT_MACHINE_TYPE)
+    # Quota has to cover the autoscaling ceiling, not just the initial workers
+    workers = int(number_param(options, ("maxNumWorkers", "max_num_workers", "max_workers",
+                                    "numWorkers", "num_workers"), 1)) or 1
+    disk_gb = number_param(options, ("diskSizeGb", "disk_size_gb"), DATAFLOW_WORKER_DISK_GB)
+    usage.add("dataflow.googleapis.com", region, "jobs", 1)
+    usage.add("dataflow.googleapis.com", "global", "jobs", 1)
+    return usage.add_vms(region, shape, workers, disk_gb)
+
+
+def _dataproc_cluster(usage: _Usage, params: Mapping[str, Any], region: str) -> Footprint:
+    master = shape_param(params, ("master_machine_type",), DATAPROC_DEFAULT_MACHINE_TYPE)
+    worker = shape_param(params, ("worker_machine_type", "machine_type"), DATAPROC_DEFAULT_MACHINE_TYPE)
+    masters = int(number_param(params, ("num_masters",), 1)) or 1
+    workers = int(number_param(params, ("num_workers",), DATAPROC_DEFAULT_WORKERS))
+    disk_gb = number_param(params, ("boot_disk_size_gb", "disk_size_gb"), DATAPROC_NODE_DISK_GB)
+    usage.add("dataproc.googleapis.com", region, "clusters", 1)
+    usage.add("dataproc.googleapis.com", "global", "clusters", 1)
+    return usage.add_vms(region, master, masters, disk_gb) + usage.add_vms(region, worker, workers, disk_gb)
+
+
+def _vertex_replicas(usage: _Usage, params: Mapping[str, Any], region: str,
+                     cpu_metric: str, count_metric: str) -> Footprint:
+    shape = shape_param(params, ("machine_type",), VERTEX_DEFAULT_MACHINE_TYPE)
+    replicas = int(number_param(params, ("replica_count", "min_replica_count"), 1)) or 1
+    gpus = int(number_param(params, ("accelerator_count",), shape.gpus)) * replicas
+    service = "aiplatform.googleapis.com"
+    usage.add(service, region, count_metric, 1)
+    usage.add(service, "global", count_metric, 1)
+    usage.add(service, region, cpu_metric, shape.vcpus * replicas)
+    accelerator = str(params.get("accelerator_type") or shape.gpu_type or "").lower()
+    if gpus and accelerator:
+        kind = accelerator.replace("nvidia_tesla_", "").replace("nvidia_", "")
+        usage.add(service, region, f"{cpu_metric.rsplit('_', 1)[0]}_nvidia_{kind}_gpus", gpus)
+    return Footprint(replicas, shape.vcpus * replicas, shape.memory_gb * replicas, 0, gpus)
+
+
+def _vertex_training(usage: _Usage, params: Mapping[str, Any], region: str) -> Footprint:
+    return _vertex_replicas(usage, params, region, "custom_model_training_cpus", "training_jobs")
+
+
+def _vertex_endpoint(usage: _Usage, params: Mapping[str, Any], region: str) -> Footprint:
+    return _vertex_replicas(usage, params, region, "custom_model_serving_cpus", "endpoints")
+
+
+def _cloudsql_instance(usage: _Usage, params: Mapping[str, Any], region: str) -> Footprint:
+    usage.add("sqladmin.googleapis.com", region, "instances", 1)
+    usage.add("sqladmin.googleapis.com", "global", "instances", 1)
+    vcpus = number_param(params, ("cpu", "cpus"), 1)
+    memory_gb = number_param(params, ("memory_mb",), 3840) / 1024
+    return Footprint(1, vcpus, memory_gb, number_param(params, ("storage_size_gb",), 10), 0)
+
+
+ESTIMATORS: Dict[str, Callable[[_Usage, Mapping[str, Any], str], Footprint]] = {
+    "compute.create_vm": _compute_vm,
+    "dataflow.launch_flex_template": _dataflow_job,
+    "dataproc.create_cluster": _dataproc_cluster,
+    "vertex.train_custom": _vertex_training,
+    "vertex.deploy_endpoint": _vertex_endpoint,
+    "cloudsql.create_instance": _cloudsql_instance,
+}
+
+
+# ───────────────────────── Plan estimate ───────────────────────── #
+
+def _static_usage(usage: _Usage, static: Mapping[str, Any], region: str) -> None:
+    """Static table entry with its regional metrics moved to the call's region."""
+    service = static.get("service") or ""
+    for metrics in static.get("regions", {}).values():
+        for metric, value in metrics.items():
+            usage.add(service, region, metric, value)
+    for metric, value in static.get("global", {}).items():
+        usage.add(service, "global", metric, value)
+
+
+def estimate_usage(tool_calls: List[Dict[str, Any]], index=None) -> Dict[str, Any]:
+    """
+    Returns {"planned_usage": {...}, "calls": [...], "totals": {region: {...}}}.
+
+    calls lists one entry per quota-relevant call with its region, footprint and
+    whether it came from the params or the static table.
+    """
+    index = index or get_capability_index()
+    usage = _Usage()
+    calls = []
+    totals: Dict[str, Footprint] = {}
+
+    for position, tool_call in enumerate(tool_calls):
+        action = tool_call.get("action", "")
+        params = tool_call.get("params") or {}
+        if not isinstance(params, Mapping):
+            params = {}
+        region = call_region(params)
+        estimator = ESTIMATORS.get(action)
+        if estimator is not None:
+            footprint = estimator(usage, params, region)
+            source = "params"
+        else:
+            static = index.quota_usage(action)
+            if static is None:
+                continue
+            if not static.get("regions"):
+                region = "global"
+            _static_usage(usage, static, region)
+            footprint, source = Footprint(), "static"
+        totals[region] = totals.get(region, Footprint()) + footprint
+        calls.append(dict(footprint._asdict(), step=position + 1, action=action, region=region,
+                          service=api_for_action(action), source=source))
+
+    return {
+        "planned_usage": usage.planned,
+        "calls": calls,
+        "totals": {region: footprint._asdict() for region, footprint in totals.items()},
+    }
@@ -3,6 +3,31 @@ from .planner_agent import planner_agent
 from .guard_agent   import guard_agent
 from .worker_hub    import worker_hub_agent
 from .auth_agent    import auth_agent
+from .common.intent_router import IntentRouter
+
+# The keyword lists from the routing instructions, scored locally; only ambiguous
+# requests reach the model
+conductor_router = IntentRouter({
+    auth_agent.name: [
+        (r"\b(cloud|gcp|google cloud) setup\b", 3),
+        (r"\b(authenticat\w*|log ?in|gcloud auth)\b", 3),
+        (r"\b(create|new|select|switch) (a |my |the )?project\b", 2),
+    ],
+    planner_agent.name: [
+        (r"\b(plan|design|architect\w*)\b", 1),
+        (r"\b(deploy|provision|spin up|set ?up|create|build)\b", 1),
+        (r"\b(bucket|cluster|vm|instance|topic|pipeline|database|endpoint|bigquery|pub/?sub|dataflow|"
+         r"dataproc|cloud run|cloud functions?|cloud sql|gke|vertex)s?\b", 2),
+    ],
+    guard_agent.name: [
+        (r"\b(budget|quotas?|billing)\b", 3),
+        (r"\b(cost|costs|spend\w*|pric\w*|approv\w*)\b", 2),
+    ],
+    worker_hub_agent.name: [
+        (r"\b(execut\w*|go ahead|roll ?out)\b", 2),
+        (r"\b(run|apply|deploy) (the |this |my )?(tool )?plan\b", 3),
+    ],
+}, name="cloud_orchestrator_root")
 
 root_agent = Agent(
     name         = "cloud_orchestrator_root",
@@ -23,4 +48,5 @@ root_agent = Agent(
         "Always provide a smooth, conversational experience and guide users through each step."
     ),
     sub_agents   = [auth_agent, planner_agent, guard_agent, worker_hub_agent],
-)
\ No newline at end of file
+    before_model_callback = conductor_router.before_model_callback,
+)
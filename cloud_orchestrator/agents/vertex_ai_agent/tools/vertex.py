@@ -16,14 +16,25 @@ from __future__ import annotations
 import time
 from typing import Dict, Optional
 from google.adk.tools import FunctionTool
-from google.cloud import aiplatform
+
+from ...common.gcp_client import authorized_session
+from ...common.lro import get_poller, google_operation_done, operation_status, wait_for
+from ...common.rate_limit import limited, rate_limited
 
 
 def _init(project_id: str, region: str):
-    """Initialize Vertex SDK once per call."""
+    """Initialize Vertex SDK once per call and return the aiplatform module.
+
+    The SDK is imported here rather than at module top: it is by far the
+    heaviest import in the agent tree and only needed once a tool runs.
+    """
+    from google.cloud import aiplatform
+
     aiplatform.init(project=project_id, location=region)
+    return aiplatform
 
 @FunctionTool
+@rate_limited("aiplatform.googleapis.com")
 def train_custom(
     project_id: str,
     job_name: str,
@@ -34,7 +45,7 @@ def train_custom(
     machine_type: str = "n1-standard-4",
 ) -> Dict[str, str]:
     try:
-        _init(project_id, region)
+        aiplatform = _init(project_id, region)
         job = aiplatform.CustomTrainingJob(
             display_name=job_name,
             python_package_uri=python_package_uri,
@@ -48,6 +59,7 @@ def train_custom(
 
 
 @FunctionTool
+@rate_limited("aiplatform.googleapis.com")
 def deploy_endpoint(
     project_id: str,
     model_display_name: str,
@@ -55,31 +67,73 @@ def deploy_endpoint(
     endpoint_display_name: str,
     region: str = "us-central1",
     machine_type: str = "n1-standard-4",
+    wait_for_deployment: bool = True,
 ) -> Dict[str, str]:
-    """Upload artifact and deploy model to new endpoint."""
+    """Upload artifact and deploy model to new endpoint.
+
+    With wait_for_deployment=False the call returns as soon as the deployment
+    starts; pass the returned operation_id to get_operation_status to follow it.
+    """
     try:
-        _init(project_id, region)
+        aiplatform = _init(project_id, region)
         model = aiplatform.Model.upload(
             display_name=model_display_name,
             artifact_uri=artifact_uri,
             serving_container_image_uri="us-docker.pkg.dev/vertex-ai/prediction/sklearn-cpu.1-0:latest",
             sync=True,
         )
-        endpoint = model.deploy(
-            deployed_model_display_name=endpoint_display_name,
-            machine_type=machine_type,
-            traffic_split={"0": 100},
-            sync=True,
+        session = authorized_session()
+        if session is None:
+            endpoint = model.deploy(
+                deployed_model_display_name=endpoint_display_name,
+                machine_type=machine_type,
+                traffic_split={"0": 100},
+                sync=True,
+            )
+            return {
+                "status": "success",
+                "endpoint": endpoint.resource_name,
+                "model": model.resource_name,
+            }
+
+        # deployModel is the slow part (10+ min); start it over REST and let the
+        # shared poller track the operation instead of holding an SDK thread
+        endpoint = aiplatform.Endpoint.create(display_name=endpoint_display_name, sync=True)
+        api = f"https://{region}-aiplatform.googleapis.com/v1"
+        response = limited("aiplatform.googleapis.com", session.post, f"{api}/{endpoint.resource_name}:deployModel", json={
+            "deployedModel": {
+                "model": model.resource_name,
+                "displayName": endpoint_display_name,
+                "dedicatedResources": {
+                    "machineSpec": {"machineType": machine_type},
+                    "minReplicaCount": 1,
+                    "maxReplicaCount": 1,
+                },
+            },
+            "trafficSplit": {"0": 100},
+        }, timeout=60)
+        response.raise_for_status()
+        op_id, future = get_poller().watch(
+            google_operation_done(f"{api}/{response.json()['name']}"),
+            name=f"deploy {model_display_name} to {endpoint_display_name}", kind="vertex",
+            initial_delay=30, max_delay=120,
         )
-        return {
-            "status": "success",
+        result = {
             "endpoint": endpoint.resource_name,
             "model": model.resource_name,
+            "operation_id": op_id,
         }
+        if not wait_for_deployment:
+            return dict(result, status="pending")
+        outcome = wait_for(future)
+        if outcome["status"] != "success":
+            return dict(result, status="error", error_message=outcome["error_message"])
+        return dict(result, status="success")
     except Exception as e:
         return {"status": "error", "error_message": str(e)}
 
 @FunctionTool
+@rate_limited("aiplatform.googleapis.com")
 def batch_predict(
     project_id: str,
     model_id: str,
@@ -89,7 +143,7 @@ def batch_predict(
     job_name: Optional[str] = None,
 ) -> Dict[str, str]:
     try:
-        _init(project_id, region)
+        aiplatform = _init(project_id, region)
         model = aiplatform.Model(model_id)
         if not job_name:
             job_name = f"batch-{int(time.time())}"
@@ -107,13 +161,14 @@ def batch_predict(
         return {"status": "error", "error_message": str(e)}
 
 @FunctionTool
+@rate_limited("aiplatform.googleapis.com")
 def delete_endpoint(
     project_id: str,
     endpoint_id: str,
     region: str = "us-central1",
 ) -> Dict[str, str]:
     try:
-        _init(project_id, region)
+        aiplatform = _init(project_id, region)
         endpoint = aiplatform.Endpoint(endpoint_id)
         endpoint.undeploy_all()
         endpoint.delete()
@@ -121,5 +176,10 @@ def delete_endpoint(
     except Exception as e:
         return {"status": "error", "error_message": str(e)}
 
+@FunctionTool
+def get_operation_status(operation_id: str) -> Dict[str, str]:
+    """Report progress of an operation started with wait_for_deployment=False."""
+    return operation_status(operation_id)
+
 def get_tools():
-    return [train_custom, deploy_endpoint, batch_predict, delete_endpoint]
+    return [train_custom, deploy_endpoint, batch_predict, delete_endpoint, get_operation_status]
@@ -1,6 +1,7 @@
 from google.adk.agents import Agent
 from .tools import cloudmonitoring, secret_manager      
 from .tools.cloud_sql_fix import *  
+from .tools.plan_executor import execute_tool_plan
 
 cloudmonitoring_agent = Agent(
     name="cloudmonitoring_agent",
@@ -33,8 +34,10 @@ root_agent = Agent(
     model="gemini-2.0-flash",
     global_instruction="You are the Worker-Hub for GCP operations.",
     instruction="""Handle Cloud Monitoring or Secret-Manager requests yourself,
-or delegate to the appropriate sub-agent. After each task, ask if the user needs
+or delegate to the appropriate sub-agent. When you are given a full tool plan
+(a list of steps with an action and params), run it with `execute_tool_plan` instead of
+calling the tools one by one. After each task, ask if the user needs
 anything else.""",
     sub_agents=[cloudmonitoring_agent, secretmanager_agent,cloud_sql_agent],
-    tools=[*cloudmonitoring.get_tools(), *secret_manager.get_tools(),run_psql_query],
+    tools=[*cloudmonitoring.get_tools(), *secret_manager.get_tools(),run_psql_query, execute_tool_plan],
 )
\ No newline at end of file
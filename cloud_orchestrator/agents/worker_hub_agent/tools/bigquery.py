@@ -1,61 +1,86 @@
 # bigquery.py
 import subprocess
 import json
+import uuid
 from google.adk.tools.function_tool import FunctionTool
+from ...common.gcp_client import BIGQUERY_API, GoogleAPIError, request, rest_available, wait_operation
+from ...common.lro import bigquery_job_done
+from ...common.rate_limit import rate_limited, run_limited
+from ...common.service_registry import ensure_enabled
+
+
+def _schema_fields(schema: str) -> list:
+    """'name:STRING,age:INTEGER' -> BigQuery schema fields (bq's inline schema format)."""
+    fields = []
+    for column in schema.split(","):
+        name, _, field_type = column.strip().partition(":")
+        fields.append({"name": name.strip(), "type": (field_type.strip() or "STRING").upper()})
+    return fields
 
 @FunctionTool
+@rate_limited("bigquery.googleapis.com")
 def create_dataset(project_id: str, dataset_id: str, location: str = "US") -> dict:
     """
     Creates a BigQuery dataset in the specified location.
     """
     try:
-        subprocess.run([
-            "gcloud", "services", "enable", "bigquery.googleapis.com", "--project", project_id
-        ], check=True)
-
-        subprocess.run([
-            "bq", "--project_id", project_id, "mk", 
-            f"--dataset", 
-            f"--location={location}", 
-            f"{project_id}:{dataset_id}"
-        ], check=True)
+        if rest_available():
+            request("POST", f"{BIGQUERY_API}/projects/{project_id}/datasets", body={
+                "datasetReference": {"projectId": project_id, "datasetId": dataset_id},
+                "location": location,
+            }, project_id=project_id)
+        else:
+            ensure_enabled(project_id, ["bigquery.googleapis.com"])
+
+            run_limited([
+                "bq", "--project_id", project_id, "mk", 
+                f"--dataset", 
+                f"--location={location}", 
+                f"{project_id}:{dataset_id}"
+            ], check=True)
 
         return {
             "message": f"✅ Dataset '{dataset_id}' created in location '{location}' under project '{project_id}'."
         }
 
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, GoogleAPIError) as e:
         return {
             "error": f"❌ Failed to create dataset. Details:\n{e}"
         }
 
 @FunctionTool
+@rate_limited("bigquery.googleapis.com")
 def create_table(project_id: str, dataset_id: str, table_id: str, schema: str) -> dict:
     """
     Creates a BigQuery table using a schema string like:
     'customer_id:STRING,age:INTEGER,signup_date:TIMESTAMP'
     """
     try:
-        subprocess.run([
-            "gcloud", "services", "enable", "bigquery.googleapis.com", "--project", project_id
-        ], check=True)
-
-        subprocess.run([
-            "bq", "--project_id", project_id, "mk",
-            f"--table", f"{dataset_id}.{table_id}",
-            schema
-        ], check=True)
+        if rest_available():
+            request("POST", f"{BIGQUERY_API}/projects/{project_id}/datasets/{dataset_id}/tables", body={
+                "tableReference": {"projectId": project_id, "datasetId": dataset_id, "tableId": table_id},
+                "schema": {"fields": _schema_fields(schema)},
+            }, project_id=project_id)
+        else:
+            ensure_enabled(project_id, ["bigquery.googleapis.com"])
+
+            run_limited([
+                "bq", "--project_id", project_id, "mk",
+                f"--table", f"{dataset_id}.{table_id}",
+                schema
+            ], check=True)
 
         return {
             "message": f"✅ Table '{dataset_id}.{table_id}' created in project '{project_id}'."
         }
 
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, GoogleAPIError) as e:
         return {
             "error": f"❌ Failed to create table. Details:\n{e}"
         }
 
 @FunctionTool
+@rate_limited("bigquery.googleapis.com")
 def insert_json(project_id: str, dataset_id: str, table_id: str, rows: list) -> dict:
     """
     Inserts JSON rows into the specified BigQuery table.
@@ -63,10 +88,26 @@ def insert_json(project_id: str, dataset_id: str, table_id: str, rows: list) ->
     Parameters:
     - rows: A list of dictionaries representing rows to insert.
     """
+    if rest_available():
+        try:
+            response = request(
+                "POST", f"{BIGQUERY_API}/projects/{project_id}/datasets/{dataset_id}/tables/{table_id}/insertAll",
+                body={"rows": [{"json": row} for row in rows]}, project_id=project_id,
+            )
+        except GoogleAPIError as e:
+            return {
+                "error": f"❌ Failed to insert rows. Details:\n{e}"
+            }
+        if response.get("insertErrors"):
+            return {
+                "error": f"❌ Failed to insert rows. Details:\n{json.dumps(response['insertErrors'])}"
+            }
+        return {
+            "message": f"✅ Inserted {len(rows)} rows into '{dataset_id}.{table_id}'."
+        }
+
     try:
-        subprocess.run([
-            "gcloud", "services", "enable", "bigquery.googleapis.com", "--project", project_id
-        ], check=True)
+        ensure_enabled(project_id, ["bigquery.googleapis.com"])
 
         # Save JSON to a temporary file
         temp_file = "/tmp/bq_insert.json"
@@ -74,7 +115,7 @@ def insert_json(project_id: str, dataset_id: str, table_id: str, rows: list) ->
             for row in rows:
                 f.write(json.dumps(row) + "\n")
 
-        subprocess.run([
+        run_limited([
             "bq", "--project_id", project_id, "insert",
             f"{dataset_id}.{table_id}", temp_file
         ], check=True)
@@ -89,6 +130,7 @@ def insert_json(project_id: str, dataset_id: str, table_id: str, rows: list) ->
         }
 
 @FunctionTool
+@rate_limited("bigquery.googleapis.com")
 def export_table_gcs(project_id: str, dataset_id: str, table_id: str, gcs_uri: str, export_format: str = "CSV") -> dict:
     """
     Exports a BigQuery table to Google Cloud Storage in the specified format.
@@ -101,22 +143,35 @@ def export_table_gcs(project_id: str, dataset_id: str, table_id: str, gcs_uri: s
     - export_format: One of 'CSV', 'JSON', or 'AVRO'
     """
     try:
-        subprocess.run([
-            "gcloud", "services", "enable", "bigquery.googleapis.com", "--project", project_id
-        ], check=True)
-
-        subprocess.run([
-            "bq", "--project_id", project_id, "extract",
-            f"--destination_format={export_format.upper()}",
-            f"{dataset_id}.{table_id}",
-            gcs_uri
-        ], check=True)
+        if rest_available():
+            # bq extract blocks until the job is done; do the same through the shared poller
+            job = request("POST", f"{BIGQUERY_API}/projects/{project_id}/jobs", body={
+                "jobReference": {"projectId": project_id, "jobId": f"export_{uuid.uuid4().hex}"},
+                "configuration": {"extract": {
+                    "sourceTable": {"projectId": project_id, "datasetId": dataset_id, "tableId": table_id},
+                    "destinationUris": [gcs_uri],
+                    "destinationFormat": "NEWLINE_DELIMITED_JSON" if export_format.upper() == "JSON"
+                    else export_format.upper(),
+                }},
+            }, project_id=project_id)
+            reference = job["jobReference"]
+            wait_operation(bigquery_job_done(project_id, reference["jobId"], reference.get("location")),
+                           name=f"export {dataset_id}.{table_id}", kind="bigquery")
+        else:
+            ensure_enabled(project_id, ["bigquery.googleapis.com"])
+
+            run_limited([
+                "bq", "--project_id", project_id, "extract",
+                f"--destination_format={export_format.upper()}",
+                f"{dataset_id}.{table_id}",
+                gcs_uri
+            ], check=True)
 
         return {
             "message": f"📤 Table '{dataset_id}.{table_id}' exported to '{gcs_uri}' in {export_format.upper()} format."
         }
 
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         return {
             "error": f"❌ Failed to export table. Details:\n{e}"
         }
\ No newline at end of file
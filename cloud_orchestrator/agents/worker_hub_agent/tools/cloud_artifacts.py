@@ -1,13 +1,15 @@
 import subprocess
 from google.adk.tools.function_tool import FunctionTool
+from ...common.rate_limit import rate_limited, run_limited
 
 # artifact registry api is required, here there is a tool that does that
 # the docker file should exist on the local system and local path should be given
 
 @FunctionTool
+@rate_limited("artifactregistry.googleapis.com")
 def enable_artifact_registry_api(project_id: str) -> dict:
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud services enable artifactregistry.googleapis.com --project={project_id}",
             shell=True, check=True
         )
@@ -17,9 +19,10 @@ def enable_artifact_registry_api(project_id: str) -> dict:
 
 
 @FunctionTool
+@rate_limited("artifactregistry.googleapis.com")
 def create_docker_repository(project_id: str, location: str, repository_name: str) -> dict:
     try:
-        result = subprocess.run(
+        result = run_limited(
             f"gcloud artifacts repositories create {repository_name} "
             f"--repository-format=docker "
             f"--location={location} "
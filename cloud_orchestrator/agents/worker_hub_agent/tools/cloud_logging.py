@@ -1,13 +1,14 @@
-import subprocess
 from google.adk.tools.function_tool import FunctionTool
+from ...common.rate_limit import check_output_limited, rate_limited, run_limited
 
 @FunctionTool
+@rate_limited("logging.googleapis.com")
 def write_custom_log_entry(log_name: str, message: str, severity: str = "INFO") -> dict:
     """
     Writes a custom log entry using gcloud CLI.
     """
     try:
-        result = subprocess.run(
+        result = run_limited(
             f'gcloud logging write {log_name} "{message}" --severity={severity}',
             shell=True,
             capture_output=True,
@@ -21,13 +22,14 @@ def write_custom_log_entry(log_name: str, message: str, severity: str = "INFO")
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("logging.googleapis.com")
 def create_log_based_metric(metric_name: str, description: str, log_name: str, match_text: str) -> dict:
     """
     Creates a log-based metric with correct escaping for 'gcloud logging metrics create'.
     """
     try:
         # Get current project
-        project_id = subprocess.check_output("gcloud config get-value project", shell=True).decode().strip()
+        project_id = check_output_limited("gcloud config get-value project", shell=True).decode().strip()
 
         # Compose raw filter expression
         raw_filter = f'logName="projects/{project_id}/logs/{log_name}" AND textPayload:"{match_text}"'
@@ -39,7 +41,7 @@ def create_log_based_metric(metric_name: str, description: str, log_name: str, m
             f"--log-filter={raw_filter}"
         ]
 
-        result = subprocess.run(
+        result = run_limited(
             cmd, 
             shell=True,
             capture_output=True,
@@ -61,12 +63,13 @@ def create_log_based_metric(metric_name: str, description: str, log_name: str, m
 
 
 @FunctionTool
+@rate_limited("logging.googleapis.com")
 def describe_log_based_metric(metric_name: str) -> dict:
     """
     Describes a previously created log-based metric.
     """
     try:
-        result = subprocess.run(
+        result = run_limited(
             f"gcloud logging metrics describe {metric_name}",
             shell=True,
             capture_output=True,
@@ -1,6 +1,7 @@
 import os
 import subprocess
 from google.adk.tools.function_tool import FunctionTool
+from ...common.rate_limit import check_output_limited, rate_limited, run_limited
 import platform
 
 #install cloud_sql_agent
@@ -17,6 +18,7 @@ import platform
 # make sure you enter valid inputs
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def create_sql_instance(
     project_id: str,
     instance_name: str,
@@ -31,7 +33,7 @@ def create_sql_instance(
     Creates a Cloud SQL PostgreSQL instance with user-specified configuration.
     """
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql instances create {instance_name} "
             f"--database-version={db_version} "
             f"--zone={zone} "
@@ -48,6 +50,7 @@ def create_sql_instance(
         return {"error": f"❌ Instance creation failed: {e}"}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def set_sql_password(
     instance_name: str,
     user: str,
@@ -57,7 +60,7 @@ def set_sql_password(
     Sets or resets the password for a Cloud SQL user.
     """
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql users set-password {user} "
             f"--instance={instance_name} "
             f"--password={password}",
@@ -69,6 +72,7 @@ def set_sql_password(
         return {"error": f"❌ Failed to set password: {e}"}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def run_psql_query(
     instance_name: str,
     db_name: str,
@@ -83,7 +87,7 @@ def run_psql_query(
     """
     try:
         # Step 1: Get Cloud SQL instance's public IP
-        instance_host_output = subprocess.check_output(
+        instance_host_output = check_output_limited(
             f'gcloud sql instances describe {instance_name} --format="value(ipAddresses[0].ipAddress)"',
             shell=True,
             text=True
@@ -98,7 +102,7 @@ def run_psql_query(
         # Using platform.system() to adjust curl command if needed (though curl is usually cross-platform)
         try:
             # Use a reliable service to get external IP
-            client_public_ip = subprocess.check_output(
+            client_public_ip = check_output_limited(
                 'curl -s ifconfig.me', # -s for silent output
                 shell=True,
                 text=True
@@ -112,7 +116,7 @@ def run_psql_query(
         # Step 3: Authorize the client's public IP in Cloud SQL
         # First, get existing authorized networks to avoid overwriting them
         try:
-            existing_networks_output = subprocess.check_output(
+            existing_networks_output = check_output_limited(
                 f'gcloud sql instances describe {instance_name} --format="value(settings.ipConfiguration.authorizedNetworks[].value)"',
                 shell=True,
                 text=True
@@ -130,7 +134,7 @@ def run_psql_query(
             networks_string = ",".join(all_networks)
 
             try:
-                subprocess.run(
+                run_limited(
                     f"gcloud sql instances patch {instance_name} --authorized-networks=\"{networks_string}\"",
                     shell=True,
                     check=True,
@@ -158,7 +162,7 @@ def run_psql_query(
 
         print(f"Executing psql command: {command}")
 
-        result = subprocess.run(
+        result = run_limited(
             command,
             shell=True,
             env=env,
@@ -1,13 +1,39 @@
+import json
 import os
 import subprocess
+import tempfile
+from contextlib import contextmanager
 from google.adk.tools.function_tool import FunctionTool
 import platform
 
+from ...common.lro import get_poller, sql_operation_done, wait_for
+from ...common.rate_limit import check_output_limited, rate_limited, run_limited
+
 #install cloud_sql_agent
 
+
+@contextmanager
+def _flags_file(flags: dict):
+    """A 0600 gcloud --flags-file holding `flags`, so passwords never appear in argv (ps); removed afterwards."""
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+        json.dump(flags, f)
+    try:
+        yield f.name
+    finally:
+        os.unlink(f.name)
+
+
+def _gcloud_error(e: subprocess.CalledProcessError, password: str) -> str:
+    # str(e) would include the command line; report only what gcloud said, password masked
+    detail = (e.stderr or "").strip()
+    if password:
+        detail = detail.replace(password, "***")
+    return detail or f"gcloud exited with status {e.returncode}"
+
 # ⚙️ Utility / Custom Operations
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def run_psql_query(
     instance_name: str,
     db_name: str,
@@ -22,7 +48,7 @@ def run_psql_query(
     """
     try:
         # Step 1: Get Cloud SQL instance's public IP
-        instance_host_output = subprocess.check_output(
+        instance_host_output = check_output_limited(
             f'gcloud sql instances describe {instance_name} --format="value(ipAddresses[0].ipAddress)"',
             shell=True,
             text=True
@@ -37,7 +63,7 @@ def run_psql_query(
         # Using platform.system() to adjust curl command if needed (though curl is usually cross-platform)
         try:
             # Use a reliable service to get external IP
-            client_public_ip = subprocess.check_output(
+            client_public_ip = check_output_limited(
                 'curl -s ifconfig.me', # -s for silent output
                 shell=True,
                 text=True
@@ -51,7 +77,7 @@ def run_psql_query(
         # Step 3: Authorize the client's public IP in Cloud SQL
         # First, get existing authorized networks to avoid overwriting them
         try:
-            existing_networks_output = subprocess.check_output(
+            existing_networks_output = check_output_limited(
                 f'gcloud sql instances describe {instance_name} --format="value(settings.ipConfiguration.authorizedNetworks[].value)"',
                 shell=True,
                 text=True
@@ -69,7 +95,7 @@ def run_psql_query(
             networks_string = ",".join(all_networks)
 
             try:
-                subprocess.run(
+                run_limited(
                     f"gcloud sql instances patch {instance_name} --authorized-networks=\"{networks_string}\"",
                     shell=True,
                     check=True,
@@ -97,7 +123,7 @@ def run_psql_query(
 
         print(f"Executing psql command: {command}")
 
-        result = subprocess.run(
+        result = run_limited(
             command,
             shell=True,
             env=env,
@@ -130,6 +156,7 @@ def run_psql_query(
 # ✅ Section 1: Managing Instances
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def create_sql_instance(
     project_id: str,
     instance_name: str,
@@ -144,23 +171,41 @@ def create_sql_instance(
     Creates a Cloud SQL PostgreSQL instance with user-specified configuration.
     """
     try:
-        subprocess.run(
-            f"gcloud sql instances create {instance_name} "
-            f"--database-version={db_version} "
-            f"--zone={zone} "
-            f"--cpu={cpu} "
-            f"--memory={memory_mb}MB "
-            f"--root-password={root_password} "
-            f"--edition={edition} "
-            f"--project={project_id}",
-            shell=True,
-            check=True,
+        with _flags_file({"--root-password": root_password}) as flags_file:
+            # --async returns the operation right away; the shared poller waits on it
+            proc = run_limited(
+                [
+                    "gcloud", "sql", "instances", "create", instance_name,
+                    f"--database-version={db_version}",
+                    f"--zone={zone}",
+                    f"--cpu={cpu}",
+                    f"--memory={memory_mb}MB",
+                    f"--flags-file={flags_file}",
+                    f"--edition={edition}",
+                    f"--project={project_id}",
+                    "--async", "--format=value(name)",
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+    except subprocess.CalledProcessError as e:
+        return {"error": f"❌ Instance creation failed: {_gcloud_error(e, root_password)}"}
+
+    operation = proc.stdout.strip().splitlines()[-1] if proc.stdout.strip() else ""
+    if operation:
+        _, future = get_poller().watch(
+            sql_operation_done(project_id, operation),
+            name=f"create Cloud SQL instance {instance_name}", kind="cloudsql",
+            initial_delay=20, max_delay=60, timeout=3600,
         )
-        return {"message": f"✅ Cloud SQL instance '{instance_name}' created in zone '{zone}' with {cpu} CPU and {memory_mb}MB memory."}
-    except subprocess.CalledProcessError as e:
-        return {"error": f"❌ Instance creation failed: {e}"}
+        outcome = wait_for(future)
+        if outcome["status"] != "success":
+            return {"error": f"❌ Instance creation failed: {outcome['error_message']}"}
+    return {"message": f"✅ Cloud SQL instance '{instance_name}' created in zone '{zone}' with {cpu} CPU and {memory_mb}MB memory."}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def connect_to_sql_instance(
     instance_name: str,
     db_name : str
@@ -170,7 +215,7 @@ def connect_to_sql_instance(
     """
     user = "postgres"
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql connect {instance_name} --user={user} --database={db_name}",
             shell=True,
         )
@@ -180,9 +225,10 @@ def connect_to_sql_instance(
         return {"error": f"❌ Failed to connect via psql: {e}"}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def describe_sql_instance(instance_name: str) -> dict:
     try:
-        output = subprocess.check_output(
+        output = check_output_limited(
             f"gcloud sql instances describe {instance_name}",
             shell=True,
             text=True
@@ -192,9 +238,10 @@ def describe_sql_instance(instance_name: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def list_sql_instances() -> dict:
     try:
-        output = subprocess.check_output(
+        output = check_output_limited(
             "gcloud sql instances list",
             shell=True,
             text=True
@@ -204,9 +251,10 @@ def list_sql_instances() -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def delete_sql_instance(instance_name: str) -> dict:
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql instances delete {instance_name} --quiet",
             shell=True,
             check=True
@@ -216,12 +264,13 @@ def delete_sql_instance(instance_name: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def update_sql_instance(instance_name: str, update_flags: str) -> dict:
     """
     update_flags: Additional flags like --cpu=2 --memory=4GB
     """
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql instances patch {instance_name} {update_flags}",
             shell=True,
             check=True
@@ -231,9 +280,10 @@ def update_sql_instance(instance_name: str, update_flags: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def restart_sql_instance(instance_name: str) -> dict:
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql instances restart {instance_name}",
             shell=True,
             check=True
@@ -243,9 +293,10 @@ def restart_sql_instance(instance_name: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def reschedule_sql_maintenance(instance_name: str) -> dict:
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql instances reschedule-maintenance {instance_name} --reschedule-type=IMMEDIATE",
             shell=True,
             check=True
@@ -258,9 +309,10 @@ def reschedule_sql_maintenance(instance_name: str) -> dict:
 # ✅ Section 2: Managing Databases
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def create_sql_database(instance_name: str, database_name: str) -> dict:
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql databases create {database_name} --instance={instance_name}",
             shell=True,
             check=True
@@ -270,9 +322,10 @@ def create_sql_database(instance_name: str, database_name: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def describe_sql_database(instance_name: str, database_name: str) -> dict:
     try:
-        output = subprocess.check_output(
+        output = check_output_limited(
             f"gcloud sql databases describe {database_name} --instance={instance_name}",
             shell=True,
             text=True
@@ -282,9 +335,10 @@ def describe_sql_database(instance_name: str, database_name: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def list_sql_databases(instance_name: str) -> dict:
     try:
-        output = subprocess.check_output(
+        output = check_output_limited(
             f"gcloud sql databases list --instance={instance_name}",
             shell=True,
             text=True
@@ -294,9 +348,10 @@ def list_sql_databases(instance_name: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def delete_sql_database(instance_name: str, database_name: str) -> dict:
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql databases delete {database_name} --instance={instance_name} --quiet",
             shell=True,
             check=True
@@ -306,12 +361,13 @@ def delete_sql_database(instance_name: str, database_name: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def patch_sql_database(instance_name: str, database_name: str, patch_flags: str) -> dict:
     """
     patch_flags: Additional flags like --charset=utf8 --collation=utf8_general_ci
     """
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql databases patch {database_name} --instance={instance_name} {patch_flags}",
             shell=True,
             check=True
@@ -324,6 +380,7 @@ def patch_sql_database(instance_name: str, database_name: str, patch_flags: str)
 # ✅ Section 3: Managing Users
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def set_sql_password(
     instance_name: str,
     password: str
@@ -333,33 +390,39 @@ def set_sql_password(
     Sets or resets the password for a Cloud SQL user.
     """
     try:
-        subprocess.run(
-            f"gcloud sql users set-password {user} "
-            f"--instance={instance_name} "
-            f"--password={password}",
-            shell=True,
-            check=True,
-        )
+        with _flags_file({"--password": password}) as flags_file:
+            run_limited(
+                ["gcloud", "sql", "users", "set-password", user,
+                 f"--instance={instance_name}", f"--flags-file={flags_file}"],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
         return {"message": f"🔐 Password set for user '{user}' on instance '{instance_name}'."}
     except subprocess.CalledProcessError as e:
-        return {"error": f"❌ Failed to set password: {e}"}
+        return {"error": f"❌ Failed to set password: {_gcloud_error(e, password)}"}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def create_sql_user(instance_name: str, username: str, password: str) -> dict:
     try:
-        subprocess.run(
-            f"gcloud sql users create {username} --instance={instance_name} --password={password}",
-            shell=True,
-            check=True
-        )
+        with _flags_file({"--password": password}) as flags_file:
+            run_limited(
+                ["gcloud", "sql", "users", "create", username,
+                 f"--instance={instance_name}", f"--flags-file={flags_file}"],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
         return {"message": f"👤 User '{username}' created on instance '{instance_name}'."}
     except subprocess.CalledProcessError as e:
-        return {"error": str(e)}
+        return {"error": _gcloud_error(e, password)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def delete_sql_user(instance_name: str, username: str) -> dict:
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql users delete {username} --instance={instance_name}",
             shell=True,
             check=True
@@ -369,9 +432,10 @@ def delete_sql_user(instance_name: str, username: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def list_sql_users(instance_name: str) -> dict:
     try:
-        output = subprocess.check_output(
+        output = check_output_limited(
             f"gcloud sql users list --instance={instance_name}",
             shell=True,
             text=True
@@ -384,9 +448,10 @@ def list_sql_users(instance_name: str) -> dict:
 # ✅ Section 4: Managing Backups
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def create_sql_backup(instance_name: str) -> dict:
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql backups create --instance={instance_name}",
             shell=True,
             check=True
@@ -396,9 +461,10 @@ def create_sql_backup(instance_name: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def delete_sql_backup(instance_name: str, backup_id: str) -> dict:
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql backups delete {backup_id} --instance={instance_name} --quiet",
             shell=True,
             check=True
@@ -408,9 +474,10 @@ def delete_sql_backup(instance_name: str, backup_id: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def describe_sql_backup(instance_name: str, backup_id: str) -> dict:
     try:
-        output = subprocess.check_output(
+        output = check_output_limited(
             f"gcloud sql backups describe {backup_id} --instance={instance_name}",
             shell=True,
             text=True
@@ -420,9 +487,10 @@ def describe_sql_backup(instance_name: str, backup_id: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def list_sql_backups(instance_name: str) -> dict:
     try:
-        output = subprocess.check_output(
+        output = check_output_limited(
             f"gcloud sql backups list --instance={instance_name}",
             shell=True,
             text=True
@@ -432,9 +500,10 @@ def list_sql_backups(instance_name: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def restore_sql_instance(instance_name: str, backup_id: str) -> dict:
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql instances restore-backup {instance_name} --backup-id={backup_id}",
             shell=True,
             check=True
@@ -447,13 +516,14 @@ def restore_sql_instance(instance_name: str, backup_id: str) -> dict:
 # ✅ Section 5: Importing & Exporting Data
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def export_sql_data(instance_name: str, gcs_uri: str, export_flags: str = "") -> dict:
     """
     gcs_uri: e.g. gs://your-bucket/your-file.sql
     export_flags: optional flags like --database=DB_NAME --offload
     """
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql export sql {instance_name} {gcs_uri} {export_flags}",
             shell=True,
             check=True
@@ -463,13 +533,14 @@ def export_sql_data(instance_name: str, gcs_uri: str, export_flags: str = "") ->
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def import_sql_data(instance_name: str, gcs_uri: str, import_flags: str = "") -> dict:
     """
     gcs_uri: e.g. gs://your-bucket/your-file.sql
     import_flags: optional flags like --database=DB_NAME
     """
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql import sql {instance_name} {gcs_uri} {import_flags}",
             shell=True,
             check=True
@@ -482,9 +553,10 @@ def import_sql_data(instance_name: str, gcs_uri: str, import_flags: str = "") ->
 # ✅ Section 6: Managing SSL Certificates
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def create_sql_ssl_cert(instance_name: str, cert_name: str) -> dict:
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql ssl-certs create {cert_name} --instance={instance_name}",
             shell=True,
             check=True
@@ -494,9 +566,10 @@ def create_sql_ssl_cert(instance_name: str, cert_name: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def delete_sql_ssl_cert(instance_name: str, cert_name: str) -> dict:
     try:
-        subprocess.run(
+        run_limited(
             f"gcloud sql ssl-certs delete {cert_name} --instance={instance_name}",
             shell=True,
             check=True
@@ -506,9 +579,10 @@ def delete_sql_ssl_cert(instance_name: str, cert_name: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def describe_sql_ssl_cert(instance_name: str, cert_name: str) -> dict:
     try:
-        output = subprocess.check_output(
+        output = check_output_limited(
             f"gcloud sql ssl-certs describe {cert_name} --instance={instance_name}",
             shell=True,
             text=True
@@ -521,9 +595,10 @@ def describe_sql_ssl_cert(instance_name: str, cert_name: str) -> dict:
 # ✅ Section 7: Monitoring Operations
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def list_sql_ssl_certs(instance_name: str) -> dict:
     try:
-        output = subprocess.check_output(
+        output = check_output_limited(
             f"gcloud sql ssl-certs list --instance={instance_name}",
             shell=True,
             text=True
@@ -533,9 +608,10 @@ def list_sql_ssl_certs(instance_name: str) -> dict:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def list_sql_operations(instance_name: str) -> dict:
     try:
-        output = subprocess.check_output(
+        output = check_output_limited(
             f"gcloud sql operations list --instance={instance_name}",
             shell=True,
             text=True
@@ -548,25 +624,28 @@ def list_sql_operations(instance_name: str) -> dict:
 # ✅ Section 8: Miscellaneous Commands
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def list_sql_tiers() -> dict:
     try:
-        output = subprocess.check_output("gcloud sql tiers list", shell=True, text=True)
+        output = check_output_limited("gcloud sql tiers list", shell=True, text=True)
         return {"tiers": output}
     except subprocess.CalledProcessError as e:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def list_sql_flags() -> dict:
     try:
-        output = subprocess.check_output("gcloud sql flags list", shell=True, text=True)
+        output = check_output_limited("gcloud sql flags list", shell=True, text=True)
         return {"flags": output}
     except subprocess.CalledProcessError as e:
         return {"error": str(e)}
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def generate_sql_login_token() -> dict:
     try:
-        output = subprocess.check_output("gcloud sql generate-login-token", shell=True, text=True)
+        output = check_output_limited("gcloud sql generate-login-token", shell=True, text=True)
         return {"token": output}
     except subprocess.CalledProcessError as e:
         return {"error": str(e)}
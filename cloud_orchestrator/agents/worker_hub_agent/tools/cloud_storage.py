@@ -1,6 +1,33 @@
 import json
+import os
+import re
 import subprocess
 from google.adk.tools.function_tool import FunctionTool
+from ...common.gcp_client import STORAGE_API, STORAGE_UPLOAD_API, GoogleAPIError, request, rest_available
+from ...common.rate_limit import rate_limited, run_limited
+
+STORAGE_ERRORS = (subprocess.CalledProcessError, GoogleAPIError)
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def _update_bucket(bucket_name: str, patch: dict, gcloud_flags: str) -> None:
+    """PATCH bucket metadata over REST, or run the equivalent gcloud update."""
+    if rest_available():
+        request("PATCH", f"{STORAGE_API}/b/{bucket_name}", body=patch)
+    else:
+        run_limited(
+            f"gcloud storage buckets update gs://{bucket_name} {gcloud_flags}",
+            shell=True,
+            check=True,
+        )
+
+
+def _duration_seconds(duration: str):
+    """'10d' / '1h30m' -> seconds, or None when it is not in that simple form."""
+    parts = re.findall(r"(\d+)([smhd])", duration.lower())
+    if not parts or "".join(n + u for n, u in parts) != duration.lower():
+        return None
+    return sum(int(n) * _DURATION_UNITS[u] for n, u in parts)
 
 # TODO:
 # 1. Add validation for key_name in set_default_encryption
@@ -12,6 +39,7 @@ from google.adk.tools.function_tool import FunctionTool
 
 
 @FunctionTool
+@rate_limited("storage.googleapis.com")
 def create_bucket(
     project_id: str, 
     bucket_name: str, 
@@ -22,31 +50,33 @@ def create_bucket(
     Location examples: US, US-CENTRAL1, EUROPE-WEST1, ASIA-SOUTHEAST1, etc.
     """
     try:
-        subprocess.run(
-            f"gcloud storage buckets create gs://{bucket_name} "
-            f"--location={location} --project={project_id}",
-            shell=True,
-            check=True,
-        )
+        if rest_available():
+            request("POST", f"{STORAGE_API}/b", params={"project": project_id},
+                    body={"name": bucket_name, "location": location}, project_id=project_id)
+        else:
+            run_limited(
+                f"gcloud storage buckets create gs://{bucket_name} "
+                f"--location={location} --project={project_id}",
+                shell=True,
+                check=True,
+            )
         return {"message": f"✅ Bucket '{bucket_name}' created in '{location}'."}
-    except subprocess.CalledProcessError as e:
+    except STORAGE_ERRORS as e:
         return {"error": f"❌ Failed to create bucket: {e}"}
 
 @FunctionTool
+@rate_limited("storage.googleapis.com")
 def enable_versioning(
     bucket_name: str
 ) -> dict:
     try:
-        subprocess.run(
-            f"gcloud storage buckets update gs://{bucket_name} --versioning",
-            shell=True,
-            check=True,
-        )
+        _update_bucket(bucket_name, {"versioning": {"enabled": True}}, "--versioning")
         return {"message": f"✅ Versioning enabled on '{bucket_name}'."}
-    except subprocess.CalledProcessError as e:
+    except STORAGE_ERRORS as e:
         return {"error": f"❌ Failed to enable versioning: {e}"}
 
 @FunctionTool
+@rate_limited("storage.googleapis.com")
 def upload_to_bucket(
     bucket_name: str, 
     local_file_path: str, 
@@ -56,21 +86,31 @@ def upload_to_bucket(
     Uploads a local file to a GCS bucket.
     """
     try:
-        subprocess.run(
-            f"gcloud storage cp {local_file_path} gs://{bucket_name}/{remote_path}",
-            shell=True,
-            check=True,
-        )
+        if rest_available():
+            object_name = remote_path
+            if not object_name or object_name.endswith("/"):
+                object_name += os.path.basename(local_file_path)
+            with open(local_file_path, "rb") as f:
+                request("POST", f"{STORAGE_UPLOAD_API}/b/{bucket_name}/o",
+                        params={"uploadType": "media", "name": object_name}, data=f,
+                        headers={"Content-Type": "application/octet-stream"}, timeout=600)
+        else:
+            run_limited(
+                f"gcloud storage cp {local_file_path} gs://{bucket_name}/{remote_path}",
+                shell=True,
+                check=True,
+            )
         return {
             "message": f"✅ File '{local_file_path}' uploaded to 'gs://{bucket_name}/{remote_path}'"
         }
 
-    except subprocess.CalledProcessError as e:
+    except (OSError, *STORAGE_ERRORS) as e:
         return {
             "error": f"❌ Upload failed: {e}"
         }
 
 @FunctionTool
+@rate_limited("storage.googleapis.com")
 def set_default_storage_class(
     bucket_name: str, 
     storage_class: str
@@ -79,17 +119,14 @@ def set_default_storage_class(
     Sets the default storage class for a bucket.
     """
     try:
-        subprocess.run(
-            f"gcloud storage buckets update gs://{bucket_name} "
-            f"--default-storage-class={storage_class.upper()}",
-            shell=True,
-            check=True,
-        )
+        _update_bucket(bucket_name, {"storageClass": storage_class.upper()},
+                       f"--default-storage-class={storage_class.upper()}")
         return {"message": f"✅ Default storage class set to '{storage_class.upper()}' for bucket '{bucket_name}'."}
-    except subprocess.CalledProcessError as e:
+    except STORAGE_ERRORS as e:
         return {"error": f"❌ Failed to set storage class: {e}"}
 
 @FunctionTool
+@rate_limited("storage.googleapis.com")
 def enable_soft_delete(
     bucket_name: str, 
     duration: str = "10d"
@@ -98,17 +135,23 @@ def enable_soft_delete(
     Enables soft delete with a specified duration (e.g., '10d' for 10 days).
     """
     try:
-        subprocess.run(
-            f"gcloud storage buckets update gs://{bucket_name} "
-            f"--soft-delete-duration={duration}",
-            shell=True,
-            check=True,
-        )
+        seconds = _duration_seconds(duration)
+        if seconds is not None:
+            _update_bucket(bucket_name, {"softDeletePolicy": {"retentionDurationSeconds": str(seconds)}},
+                           f"--soft-delete-duration={duration}")
+        else:
+            run_limited(
+                f"gcloud storage buckets update gs://{bucket_name} "
+                f"--soft-delete-duration={duration}",
+                shell=True,
+                check=True,
+            )
         return {"message": f"🕒 Soft delete enabled with duration '{duration}' on bucket '{bucket_name}'."}
-    except subprocess.CalledProcessError as e:
+    except STORAGE_ERRORS as e:
         return {"error": f"❌ Failed to enable soft delete: {e}"}
 
 @FunctionTool
+@rate_limited("storage.googleapis.com")
 def enable_autoclass(
     bucket_name: str, 
     terminal_class: str = "ARCHIVE"
@@ -117,18 +160,17 @@ def enable_autoclass(
     Enables Autoclass and sets the terminal storage class (e.g., ARCHIVE).
     """
     try:
-        subprocess.run(
-            f"gcloud storage buckets update gs://{bucket_name} "
-            f"--enable-autoclass "
-            f"--autoclass-terminal-storage-class={terminal_class.upper()}",
-            shell=True,
-            check=True,
+        _update_bucket(
+            bucket_name,
+            {"autoclass": {"enabled": True, "terminalStorageClass": terminal_class.upper()}},
+            f"--enable-autoclass --autoclass-terminal-storage-class={terminal_class.upper()}",
         )
         return {"message": f"✅ Autoclass enabled with terminal class '{terminal_class.upper()}' for '{bucket_name}'."}
-    except subprocess.CalledProcessError as e:
+    except STORAGE_ERRORS as e:
         return {"error": f"❌ Failed to enable Autoclass: {e}"}
 
 @FunctionTool
+@rate_limited("storage.googleapis.com")
 def set_uniform_access(
     bucket_name: str, 
     enable: bool = True
@@ -138,17 +180,14 @@ def set_uniform_access(
     """
     try:
         flag = "--uniform-bucket-level-access" if enable else "--no-uniform-bucket-level-access"
-        subprocess.run(
-            f"gcloud storage buckets update gs://{bucket_name} {flag}",
-            shell=True,
-            check=True,
-        )
+        _update_bucket(bucket_name, {"iamConfiguration": {"uniformBucketLevelAccess": {"enabled": enable}}}, flag)
         state = "enabled" if enable else "disabled"
         return {"message": f"✅ Uniform bucket-level access {state} on '{bucket_name}'."}
-    except subprocess.CalledProcessError as e:
+    except STORAGE_ERRORS as e:
         return {"error": f"❌ Failed to update uniform access: {e}"}
 
 @FunctionTool
+@rate_limited("storage.googleapis.com")
 def set_public_access_prevention(
     bucket_name: str, 
     prevent: bool = True
@@ -158,17 +197,15 @@ def set_public_access_prevention(
     """
     try:
         flag = "--pap" if prevent else "--no-pap"
-        subprocess.run(
-            f"gcloud storage buckets update gs://{bucket_name} {flag}",
-            shell=True,
-            check=True,
-        )
+        pap = "enforced" if prevent else "inherited"
+        _update_bucket(bucket_name, {"iamConfiguration": {"publicAccessPrevention": pap}}, flag)
         state = "enabled" if prevent else "disabled"
         return {"message": f"🔐 Public access prevention {state} for '{bucket_name}'."}
-    except subprocess.CalledProcessError as e:
+    except STORAGE_ERRORS as e:
         return {"error": f"❌ Failed to set public access prevention: {e}"}
 
 @FunctionTool
+@rate_limited("storage.googleapis.com")
 def set_default_encryption(
     bucket_name: str, 
     key_name: str
@@ -178,14 +215,10 @@ def set_default_encryption(
     Example key format: projects/my-project/locations/global/keyRings/my-kr/cryptoKeys/my-key
     """
     try:
-        subprocess.run(
-            f"gcloud storage buckets update gs://{bucket_name} "
-            f"--default-encryption-key={key_name}",
-            shell=True,
-            check=True,
-        )
+        _update_bucket(bucket_name, {"encryption": {"defaultKmsKeyName": key_name}},
+                       f"--default-encryption-key={key_name}")
         return {"message": f"🔐 Default encryption key set for '{bucket_name}'."}
-    except subprocess.CalledProcessError as e:
+    except STORAGE_ERRORS as e:
         return {"error": f"❌ Failed to set encryption key: {e}"}
 # Key Name Validation (for set_default_encryption)
 # You accept key_name in this format:
@@ -194,6 +227,7 @@ def set_default_encryption(
 
 
 @FunctionTool
+@rate_limited("storage.googleapis.com")
 def set_lifecycle_rule(
     bucket_name: str,
     num_newer_versions: int = 1,
@@ -216,18 +250,21 @@ def set_lifecycle_rule(
             ]
         }
 
-        lifecycle_json = json.dumps(lifecycle_policy)
+        if rest_available():
+            request("PATCH", f"{STORAGE_API}/b/{bucket_name}", body={"lifecycle": lifecycle_policy})
+        else:
+            lifecycle_json = json.dumps(lifecycle_policy)
 
-        subprocess.run(
-            f"echo '{lifecycle_json}' | gcloud storage buckets update gs://{bucket_name} --lifecycle-file=-",
-            shell=True,
-            check=True,
-        )
+            run_limited(
+                f"echo '{lifecycle_json}' | gcloud storage buckets update gs://{bucket_name} --lifecycle-file=-",
+                shell=True,
+                check=True,
+            )
 
         # lifecycle_policy = {...}
         # lifecycle_json = json.dumps(lifecycle_policy)
 
-        # subprocess.run(
+        # run_limited(
         #     ["gcloud", "storage", "buckets", "update", f"gs://{bucket_name}", "--lifecycle-file=-"],
         #     input=lifecycle_json.encode(),
         #     check=True
@@ -237,7 +274,7 @@ def set_lifecycle_rule(
             "message": f"✅ Lifecycle rule applied to '{bucket_name}': "
                        f"Keep {num_newer_versions} version(s), expire non-current after {expire_after_days} day(s)."
         }
-    except subprocess.CalledProcessError as e:
+    except STORAGE_ERRORS as e:
         return {"error": f"❌ Failed to set lifecycle rule: {e}"}
 
 
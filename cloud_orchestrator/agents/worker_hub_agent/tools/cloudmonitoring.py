@@ -1,13 +1,15 @@
 import json, os, subprocess, tempfile
 from typing import Dict, List
 from google.adk.tools import FunctionTool
+from ...common.rate_limit import check_output_limited, rate_limited
 
 
 def _gcloud(cmd: List[str]) -> str:
     """Helper function to execute gcloud commands."""
-    return subprocess.check_output(cmd, text=True, stderr=subprocess.STDOUT)
+    return check_output_limited(cmd, text=True, stderr=subprocess.STDOUT)
 
 @FunctionTool
+@rate_limited("monitoring.googleapis.com")
 def create_dashboard(
     project_id: str,
     dashboard_display_name: str,
@@ -64,6 +66,7 @@ def create_dashboard(
 
 
 @FunctionTool
+@rate_limited("monitoring.googleapis.com")
 def create_alert(
     project_id: str,
     alert_display_name: str,
@@ -1,70 +1,114 @@
 import subprocess
 from google.adk.tools.function_tool import FunctionTool
+from ...common.gcp_client import COMPUTE_API, GoogleAPIError, request, rest_available, wait_operation
+from ...common.lro import OperationFailed, OperationTimeout, compute_operation_done
+from ...common.rate_limit import rate_limited, run_limited
+
+COMPUTE_ERRORS = (subprocess.CalledProcessError, GoogleAPIError, OperationFailed, OperationTimeout)
+
+
+def _wait_compute(op: dict, what: str) -> None:
+    """gcloud waits for Compute operations to finish; so does the REST path."""
+    wait_operation(compute_operation_done(op["selfLink"]), name=what, kind="compute")
 
 @FunctionTool
+@rate_limited("compute.googleapis.com")
 def create_vm(project_id: str, zone: str, instance_name: str, machine_type: str = "e2-micro", image_family: str = "debian-11", image_project: str = "debian-cloud") -> dict:
     """Create a new VM instance."""
     try:
-        subprocess.run([
-            "gcloud", "compute", "instances", "create", instance_name,
-            f"--project={project_id}",
-            f"--zone={zone}",
-            f"--machine-type={machine_type}",
-            f"--image-family={image_family}",
-            f"--image-project={image_project}"
-        ], check=True)
+        if rest_available():
+            op = request("POST", f"{COMPUTE_API}/projects/{project_id}/zones/{zone}/instances", body={
+                "name": instance_name,
+                "machineType": f"zones/{zone}/machineTypes/{machine_type}",
+                "disks": [{
+                    "boot": True,
+                    "autoDelete": True,
+                    "initializeParams": {
+                        "sourceImage": f"projects/{image_project}/global/images/family/{image_family}",
+                    },
+                }],
+                # Same defaults as gcloud: default network with an ephemeral external IP
+                "networkInterfaces": [{
+                    "network": "global/networks/default",
+                    "accessConfigs": [{"type": "ONE_TO_ONE_NAT", "name": "External NAT"}],
+                }],
+            }, project_id=project_id)
+            _wait_compute(op, f"create {instance_name}")
+        else:
+            run_limited([
+                "gcloud", "compute", "instances", "create", instance_name,
+                f"--project={project_id}",
+                f"--zone={zone}",
+                f"--machine-type={machine_type}",
+                f"--image-family={image_family}",
+                f"--image-project={image_project}"
+            ], check=True)
 
         return {
             "message": f"✅ VM '{instance_name}' created in project '{project_id}' (zone: {zone})."
         }
 
-    except subprocess.CalledProcessError as e:
+    except COMPUTE_ERRORS as e:
         return {
             "error": f"❌ Failed to create VM. Details:\n{e}"
         }
 
 @FunctionTool
+@rate_limited("compute.googleapis.com")
 def delete_vm(project_id: str, zone: str, instance_name: str) -> dict:
     """Delete an existing VM instance."""
     try:
-        subprocess.run([
-            "gcloud", "compute", "instances", "delete", instance_name,
-            f"--project={project_id}",
-            f"--zone={zone}",
-            "--quiet"
-        ], check=True)
+        if rest_available():
+            op = request("DELETE", f"{COMPUTE_API}/projects/{project_id}/zones/{zone}/instances/{instance_name}",
+                         project_id=project_id)
+            _wait_compute(op, f"delete {instance_name}")
+        else:
+            run_limited([
+                "gcloud", "compute", "instances", "delete", instance_name,
+                f"--project={project_id}",
+                f"--zone={zone}",
+                "--quiet"
+            ], check=True)
 
         return {
             "message": f"✅ VM '{instance_name}' deleted from project '{project_id}' (zone: {zone})."
         }
 
-    except subprocess.CalledProcessError as e:
+    except COMPUTE_ERRORS as e:
         return {
             "error": f"❌ Failed to delete VM. Details:\n{e}"
         }
 
 @FunctionTool
+@rate_limited("compute.googleapis.com")
 def get_external_ip(project_id: str, zone: str, instance_name: str) -> dict:
     """Get the external IP address of a VM."""
     try:
-        result = subprocess.run([
-            "gcloud", "compute", "instances", "describe", instance_name,
-            f"--project={project_id}",
-            f"--zone={zone}",
-            "--format=get(networkInterfaces[0].accessConfigs[0].natIP)"
-        ], check=True, capture_output=True, text=True)
+        if rest_available():
+            instance = request("GET", f"{COMPUTE_API}/projects/{project_id}/zones/{zone}/instances/{instance_name}",
+                               project_id=project_id)
+            access = (instance.get("networkInterfaces") or [{}])[0].get("accessConfigs") or [{}]
+            ip = access[0].get("natIP", "")
+        else:
+            result = run_limited([
+                "gcloud", "compute", "instances", "describe", instance_name,
+                f"--project={project_id}",
+                f"--zone={zone}",
+                "--format=get(networkInterfaces[0].accessConfigs[0].natIP)"
+            ], check=True, capture_output=True, text=True)
 
-        ip = result.stdout.strip()
+            ip = result.stdout.strip()
         return {
             "external_ip": ip
         }
 
-    except subprocess.CalledProcessError as e:
+    except COMPUTE_ERRORS as e:
         return {
             "error": f"❌ Failed to get external IP. Details:\n{e}"
         }
 
 @FunctionTool
+@rate_limited("compute.googleapis.com")
 def snapshot_disk(project_id: str, zone: str, instance_name: str, snapshot_name: str) -> dict:
     """
     Creates a snapshot of the boot disk of a given VM instance.
@@ -75,9 +119,24 @@ def snapshot_disk(project_id: str, zone: str, instance_name: str, snapshot_name:
     - instance_name: Name of the VM instance
     - snapshot_name: Name for the new snapshot
     """
+    if rest_available():
+        try:
+            instance_url = f"{COMPUTE_API}/projects/{project_id}/zones/{zone}/instances/{instance_name}"
+            disk_name = request("GET", instance_url, project_id=project_id)["disks"][0]["source"].split('/')[-1]
+            op = request("POST", f"{COMPUTE_API}/projects/{project_id}/zones/{zone}/disks/{disk_name}/createSnapshot",
+                         body={"name": snapshot_name}, project_id=project_id)
+            _wait_compute(op, f"snapshot {disk_name}")
+            return {
+                "message": f"📸 Snapshot '{snapshot_name}' created from disk '{disk_name}' of instance '{instance_name}'."
+            }
+        except COMPUTE_ERRORS as e:
+            return {
+                "error": f"❌ Failed to create snapshot. Details:\n{e}"
+            }
+
     try:
         # Step 1: Get the boot disk name from the instance
-        disk_result = subprocess.run([
+        disk_result = run_limited([
             "gcloud", "compute", "instances", "describe", instance_name,
             f"--project={project_id}",
             f"--zone={zone}",
@@ -90,7 +149,7 @@ def snapshot_disk(project_id: str, zone: str, instance_name: str, snapshot_name:
         disk_name = full_disk_uri.split('/')[-1]
 
         # Step 2: Create a snapshot of the disk
-        subprocess.run([
+        run_limited([
             "gcloud", "compute", "disks", "snapshot", disk_name,
             f"--project={project_id}",
             f"--zone={zone}",
@@ -101,7 +160,7 @@ def snapshot_disk(project_id: str, zone: str, instance_name: str, snapshot_name:
             "message": f"📸 Snapshot '{snapshot_name}' created from disk '{disk_name}' of instance '{instance_name}'."
         }
 
-    except subprocess.CalledProcessError as e:
+    except COMPUTE_ERRORS as e:
         return {
             "error": f"❌ Failed to create snapshot. Details:\n{e}"
         }
\ No newline at end of file
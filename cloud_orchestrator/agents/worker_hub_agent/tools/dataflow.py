@@ -1,7 +1,11 @@
 import subprocess
 from google.adk.tools.function_tool import FunctionTool
 
+from ...common.lro import dataflow_job_finished, get_poller, wait_for
+from ...common.rate_limit import rate_limited, run_limited
+
 @FunctionTool
+@rate_limited("dataflow.googleapis.com")
 def launch_flex_template(project_id: str, region: str, job_name: str, template_path: str, parameters: dict) -> dict:
     """
     Launch a Dataflow job using a Flex Template.
@@ -17,7 +21,7 @@ def launch_flex_template(project_id: str, region: str, job_name: str, template_p
             "--parameters=" + ",".join(f"{k}={v}" for k, v in parameters.items())
         ]
 
-        subprocess.run(cmd, check=True)
+        run_limited(cmd, check=True)
         return {
             "message": f"✅ Dataflow Flex Template '{job_name}' launched successfully in region '{region}'."
         }
@@ -29,10 +33,27 @@ def launch_flex_template(project_id: str, region: str, job_name: str, template_p
 
 
 @FunctionTool
-def monitor_job(project_id: str, region: str, job_id: str) -> dict:
-    """Monitor the status of a running Dataflow job."""
+@rate_limited("dataflow.googleapis.com")
+def monitor_job(project_id: str, region: str, job_id: str, wait_for_completion: bool = False,
+                timeout_seconds: int = 3600) -> dict:
+    """Monitor the status of a running Dataflow job.
+
+    With wait_for_completion=True, block until the job reaches a terminal state.
+    """
+    if wait_for_completion:
+        op_id, future = get_poller().watch(
+            dataflow_job_finished(project_id, region, job_id),
+            name=f"Dataflow job {job_id}", kind="dataflow",
+            initial_delay=15, max_delay=120, timeout=timeout_seconds,
+        )
+        outcome = wait_for(future)
+        if outcome["status"] != "success":
+            return {"error": f"❌ Failed waiting for Dataflow job {job_id}: {outcome['error_message']}",
+                    "operation_id": op_id}
+        return {"status": outcome["result"], "operation_id": op_id}
+
     try:
-        result = subprocess.run([
+        result = run_limited([
             "gcloud", "dataflow", "jobs", "describe", job_id,
             f"--project={project_id}",
             f"--region={region}",
@@ -49,10 +70,11 @@ def monitor_job(project_id: str, region: str, job_id: str) -> dict:
         }
 
 @FunctionTool
+@rate_limited("dataflow.googleapis.com")
 def cancel_job(project_id: str, region: str, job_id: str) -> dict:
     """Cancel a running Dataflow job."""
     try:
-        result = subprocess.run([
+        result = run_limited([
             "gcloud", "dataflow", "jobs", "cancel", job_id,
             f"--project={project_id}",
             f"--region={region}"
@@ -69,10 +91,11 @@ def cancel_job(project_id: str, region: str, job_id: str) -> dict:
         }
 
 @FunctionTool
+@rate_limited("dataflow.googleapis.com")
 def list_jobs(project_id: str, region: str, limit: int = 5) -> dict:
     """List recent Dataflow jobs in a region."""
     try:
-        result = subprocess.run([
+        result = run_limited([
             "gcloud", "dataflow", "jobs", "list",
             f"--project={project_id}",
             f"--region={region}",
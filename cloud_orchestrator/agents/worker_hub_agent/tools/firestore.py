@@ -1,10 +1,16 @@
 from google.adk.tools import FunctionTool
 import subprocess
-import requests
 import uuid
 from typing import Optional, List
 
+from ...common.access_token import authorized_request
+from ...common.gcp_client import authorized_session
+from ...common.lro import get_poller, google_operation_done, wait_for
+from ...common.rate_limit import rate_limited, run_limited
+from ...common.service_registry import ensure_enabled
+
 @FunctionTool
+@rate_limited("firestore.googleapis.com")
 def create_firestore_db(
     project_id: str,
     location_id: str,
@@ -21,25 +27,29 @@ def create_firestore_db(
     document_data = document_data or []
 
     try:
-        subprocess.run(f"gcloud services enable firestore.googleapis.com --project={project_id}", shell=True, check=True)
+        ensure_enabled(project_id, ["firestore.googleapis.com"])
         messages.append("✅ Firestore API enabled.")
 
-        subprocess.run(f"gcloud config set project {project_id}", shell=True, check=True)
+        run_limited(f"gcloud config set project {project_id}", shell=True, check=True)
         messages.append("✅ GCP project set.")
 
-        check_cmd = f"gcloud firestore databases describe --database={db_name}"
-        check_proc = subprocess.run(check_cmd, shell=True, capture_output=True, text=True)
-
-        db_exists = check_proc.returncode == 0
+        session = authorized_session()
+        if session is not None:
+            db_exists = _ensure_database_rest(session, project_id, location_id, db_name)
+        else:
+            check_cmd = f"gcloud firestore databases describe --database={db_name}"
+            check_proc = run_limited(check_cmd, shell=True, capture_output=True, text=True)
+            db_exists = check_proc.returncode == 0
+            if not db_exists:
+                create_cmd = (
+                    f"gcloud firestore databases create --database={db_name} "
+                    f"--location={location_id} --type={firestore_type}"
+                )
+                run_limited(create_cmd, shell=True, check=True)
 
         if db_exists:
             messages.append(f"✅ Firestore DB '{db_name}' already exists.")
         else:
-            create_cmd = (
-                f"gcloud firestore databases create --database={db_name} "
-                f"--location={location_id} --type={firestore_type}"
-            )
-            subprocess.run(create_cmd, shell=True, check=True)
             messages.append(f"✅ Firestore DB '{db_name}' created in {location_id}.")
 
         if collection_name and document_data:
@@ -66,6 +76,27 @@ def create_firestore_db(
         return {"status": "error", "message": f"❌ Unexpected error: {str(ex)}"}
 
 
+def _ensure_database_rest(session, project_id: str, location_id: str, db_name: str) -> bool:
+    """Create the database over REST unless it exists; returns True if it already existed."""
+    base = f"https://firestore.googleapis.com/v1/projects/{project_id}/databases"
+    if session.get(f"{base}/{db_name}", timeout=30).status_code == 200:
+        return True
+    response = session.post(
+        base, params={"databaseId": db_name},
+        json={"locationId": location_id, "type": "FIRESTORE_NATIVE"}, timeout=60,
+    )
+    response.raise_for_status()
+    _, future = get_poller().watch(
+        google_operation_done(f"https://firestore.googleapis.com/v1/{response.json()['name']}"),
+        name=f"create Firestore database {db_name}", kind="firestore",
+        initial_delay=5, max_delay=30, timeout=900,
+    )
+    outcome = wait_for(future)
+    if outcome["status"] != "success":
+        raise RuntimeError(outcome["error_message"])
+    return False
+
+
 def _add_documents(
     project_id: str,
     db_name: str,
@@ -76,15 +107,6 @@ def _add_documents(
     messages = []
 
     try:
-        token_proc = subprocess.run(
-            "gcloud auth print-access-token", shell=True, check=True, capture_output=True
-        )
-        token = token_proc.stdout.decode("utf-8").strip()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-
         for idx, doc in enumerate(document_data):
             doc_copy = doc.copy()
             document_id = doc_copy.pop("doc_id", str(uuid.uuid4()))
@@ -108,7 +130,7 @@ def _add_documents(
                 f"databases/{db_name}/documents/{collection_name}/{document_id}"
             )
 
-            response = requests.patch(url, headers=headers, json={"fields": fields})
+            response = authorized_request("PATCH", url, json={"fields": fields})
             if response.status_code in (200, 201):
                 doc_name = response.json().get("name", "unknown").split("/")[-1]
                 inserted_docs.append(doc_name)
@@ -132,7 +154,6 @@ def _add_documents(
 
 
 import subprocess
-import requests
 import json
 from datetime import datetime, timedelta
 import zoneinfo
@@ -151,11 +172,12 @@ def patch_document_field(doc_name, field_name, timestamp_iso, headers):
             }
         }
     }
-    resp = requests.patch(patch_url, headers=headers, data=json.dumps(patch_body))
+    resp = authorized_request("PATCH", patch_url, headers=headers, data=json.dumps(patch_body))
     return resp.status_code, resp.text
 
 
 @FunctionTool
+@rate_limited("firestore.googleapis.com")
 def set_ttl(
     project_id: str,
     db_name: str,
@@ -173,29 +195,19 @@ def set_ttl(
     try:
         # Step 1: Verify Firestore DB
         check_cmd = f"gcloud firestore databases describe --project={project_id} --database={db_name}"
-        check_proc = subprocess.run(check_cmd, shell=True, capture_output=True, text=True)
+        check_proc = run_limited(check_cmd, shell=True, capture_output=True, text=True)
         if check_proc.returncode != 0:
             return {
                 "status": "error",
                 "message": f"❌ Firestore DB '{db_name}' does not exist in project '{project_id}'."
             }
 
-        # Step 2: Get access token
-        token_proc = subprocess.run(
-            "gcloud auth print-access-token", shell=True, check=True, capture_output=True
-        )
-        token = token_proc.stdout.decode("utf-8").strip()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-
-        # Step 3: Fetch documents (limit 100 for now)
+        # Step 2: Fetch documents (limit 100 for now)
         url = (
             f"https://firestore.googleapis.com/v1/projects/{project_id}/"
             f"databases/{db_name}/documents/{collection_name}?pageSize=100"
         )
-        response = requests.get(url, headers=headers)
+        response = authorized_request("GET", url)
         if response.status_code != 200:
             return {"status": "error", "message": f"❌ Failed to fetch documents: {response.text}"}
 
@@ -211,7 +223,7 @@ def set_ttl(
             if not is_valid:
                 missing_or_invalid.append(doc)
 
-        # Step 4: Ask user for fallback TTL if needed
+        # Step 3: Ask user for fallback TTL if needed
         if missing_or_invalid:
             return {
                 "status": "ask_use_fallback",
@@ -228,7 +240,7 @@ def set_ttl(
                 }
             }
 # f"--field-path={ttl_field} "
-        # Step 5: Enable TTL on the given field
+        # Step 4: Enable TTL on the given field
         ttl_cmd = (
             f"gcloud firestore fields ttls update expiresAt "
             f"--project={project_id} "
@@ -238,7 +250,7 @@ def set_ttl(
             # f"--async"
         )
 
-        subprocess.run(ttl_cmd, shell=True, check=True)
+        run_limited(ttl_cmd, shell=True, check=True)
         messages.append(f"✅ TTL policy enabled on field '{ttl_field}' in collection '{collection_name}'.")
 
         return {"status": "success", "message": "\n".join(messages)}
@@ -1,6 +1,7 @@
 import os
 import subprocess
 from google.adk.tools.function_tool import FunctionTool
+from ...common.rate_limit import check_output_limited, rate_limited, run_limited
 import platform
 
 #install cloud_sql_agent
@@ -8,6 +9,7 @@ import platform
 # ⚙️ Utility / Custom Operations
 
 @FunctionTool
+@rate_limited("sqladmin.googleapis.com")
 def run_psql_query(
     instance_name: str,
     db_name: str,
@@ -22,7 +24,7 @@ def run_psql_query(
     """
     try:
         # Step 1: Get Cloud SQL instance's public IP
-        instance_host_output = subprocess.check_output(
+        instance_host_output = check_output_limited(
             f'gcloud sql instances describe {instance_name} --format="value(ipAddresses[0].ipAddress)"',
             shell=True,
             text=True
@@ -37,7 +39,7 @@ def run_psql_query(
         # Using platform.system() to adjust curl command if needed (though curl is usually cross-platform)
         try:
             # Use a reliable service to get external IP
-            client_public_ip = subprocess.check_output(
+            client_public_ip = check_output_limited(
                 'curl -s ifconfig.me', # -s for silent output
                 shell=True,
                 text=True
@@ -51,7 +53,7 @@ def run_psql_query(
         # Step 3: Authorize the client's public IP in Cloud SQL
         # First, get existing authorized networks to avoid overwriting them
         try:
-            existing_networks_output = subprocess.check_output(
+            existing_networks_output = check_output_limited(
                 f'gcloud sql instances describe {instance_name} --format="value(settings.ipConfiguration.authorizedNetworks[].value)"',
                 shell=True,
                 text=True
@@ -69,7 +71,7 @@ def run_psql_query(
             networks_string = ",".join(all_networks)
 
             try:
-                subprocess.run(
+                run_limited(
                     f"gcloud sql instances patch {instance_name} --authorized-networks=\"{networks_string}\"",
                     shell=True,
                     check=True,
@@ -97,7 +99,7 @@ def run_psql_query(
 
         print(f"Executing psql command: {command}")
 
-        result = subprocess.run(
+        result = run_limited(
             command,
             shell=True,
             env=env,
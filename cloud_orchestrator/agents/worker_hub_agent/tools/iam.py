@@ -1,8 +1,34 @@
 import subprocess
 import datetime
 from google.adk.tools.function_tool import FunctionTool
+from ...common.gcp_client import IAM_API, RESOURCE_MANAGER_API, GoogleAPIError, request, rest_available
+from ...common.rate_limit import rate_limited, run_limited
+from ...common.service_registry import ensure_enabled
+
+
+def _add_binding_rest(project_id: str, member: str, role: str, attempts: int = 3) -> None:
+    """Read-modify-write the project policy; retry when a concurrent write changed the etag."""
+    project = f"{RESOURCE_MANAGER_API}/projects/{project_id}"
+    for attempt in range(attempts):
+        policy = request("POST", f"{project}:getIamPolicy",
+                         body={"options": {"requestedPolicyVersion": 3}}, project_id=project_id)
+        bindings = policy.setdefault("bindings", [])
+        binding = next((b for b in bindings if b.get("role") == role and "condition" not in b), None)
+        if binding is None:
+            binding = {"role": role, "members": []}
+            bindings.append(binding)
+        if member in binding["members"]:
+            return
+        binding["members"].append(member)
+        try:
+            request("POST", f"{project}:setIamPolicy", body={"policy": policy})
+            return
+        except GoogleAPIError as e:
+            if e.status_code != 409 or attempt == attempts - 1:
+                raise
 
 @FunctionTool
+@rate_limited("iam.googleapis.com")
 def create_sa(project_id: str, display_name: str = "Pub/Sub Service Account") -> dict:
     """Create a service account and bind Pub/Sub Publisher role to it."""
     
@@ -13,16 +39,21 @@ def create_sa(project_id: str, display_name: str = "Pub/Sub Service Account") ->
 
         sa_email = f"{sa_name}@{project_id}.iam.gserviceaccount.com"
 
+        if rest_available():
+            request("POST", f"{IAM_API}/projects/{project_id}/serviceAccounts", body={
+                "accountId": sa_name,
+                "serviceAccount": {"displayName": display_name, "description": "Publishes messages to Pub/Sub"},
+            }, project_id=project_id)
+            _add_binding_rest(project_id, f"serviceAccount:{sa_email}", "roles/pubsub.publisher")
+            return {
+                "message": f"✅ Service account '{sa_email}' created and granted 'roles/pubsub.publisher'."
+            }
+
         # Step 0: Enable necessary APIs
-        subprocess.run([
-            "gcloud", "services", "enable", "iam.googleapis.com", "--project", project_id
-        ], check=True)
-        subprocess.run([
-            "gcloud", "services", "enable", "pubsub.googleapis.com", "--project", project_id
-        ], check=True)
+        ensure_enabled(project_id, ["iam.googleapis.com", "pubsub.googleapis.com"])
 
         # Step 1: Create the service account
-        subprocess.run([
+        run_limited([
             "gcloud", "iam", "service-accounts", "create", sa_name,
             "--description=Publishes messages to Pub/Sub",
             f"--display-name={display_name}",
@@ -30,7 +61,7 @@ def create_sa(project_id: str, display_name: str = "Pub/Sub Service Account") ->
         ], check=True)
 
         # Step 2: Bind the Pub/Sub Publisher role
-        subprocess.run([
+        run_limited([
             "gcloud", "projects", "add-iam-policy-binding", project_id,
             f"--member=serviceAccount:{sa_email}",
             "--role=roles/pubsub.publisher"
@@ -44,8 +75,13 @@ def create_sa(project_id: str, display_name: str = "Pub/Sub Service Account") ->
         return {
             "error": f"❌ Command failed with return code {e.returncode}. Details:\n{e}"
         }
+    except GoogleAPIError as e:
+        return {
+            "error": f"❌ Request failed. Details:\n{e}"
+        }
 
 @FunctionTool
+@rate_limited("iam.googleapis.com")
 def grant_role(project_id: str, member: str, role: str) -> dict:
     """
     Grants an IAM role to a member (e.g., service account, user, or group) in the given project.
@@ -56,29 +92,28 @@ def grant_role(project_id: str, member: str, role: str) -> dict:
     - role: IAM role to grant (e.g., roles/pubsub.publisher)
     """
     try:
-        # Step 0: Enable necessary APIs
-        subprocess.run([
-            "gcloud", "services", "enable", "iam.googleapis.com", "--project", project_id
-        ], check=True)
-        subprocess.run([
-            "gcloud", "services", "enable", "pubsub.googleapis.com", "--project", project_id
-        ], check=True)
-        subprocess.run([
-            "gcloud", "projects", "add-iam-policy-binding", project_id,
-            f"--member={member}",
-            f"--role={role}"
-        ], check=True)
+        if rest_available():
+            _add_binding_rest(project_id, member, role)
+        else:
+            # Step 0: Enable necessary APIs
+            ensure_enabled(project_id, ["iam.googleapis.com", "pubsub.googleapis.com"])
+            run_limited([
+                "gcloud", "projects", "add-iam-policy-binding", project_id,
+                f"--member={member}",
+                f"--role={role}"
+            ], check=True)
 
         return {
             "message": f"✅ Role '{role}' successfully granted to '{member}' in project '{project_id}'."
         }
 
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, GoogleAPIError) as e:
         return {
             "error": f"❌ Failed to grant role. Details:\n{e}"
         }
 
 @FunctionTool
+@rate_limited("iam.googleapis.com")
 def delete_sa(project_id: str, sa_name: str = "pubsub-sa-SWAPNITA011") -> dict:
     """
     Deletes a service account from the specified GCP project.
@@ -90,23 +125,24 @@ def delete_sa(project_id: str, sa_name: str = "pubsub-sa-SWAPNITA011") -> dict:
     try:
         sa_email = f"{sa_name}@{project_id}.iam.gserviceaccount.com"
 
-        # Step 0: Ensure IAM API is enabled
-        subprocess.run([
-            "gcloud", "services", "enable", "iam.googleapis.com", "--project", project_id
-        ], check=True)
+        if rest_available():
+            request("DELETE", f"{IAM_API}/projects/{project_id}/serviceAccounts/{sa_email}", project_id=project_id)
+        else:
+            # Step 0: Ensure IAM API is enabled
+            ensure_enabled(project_id, ["iam.googleapis.com"])
 
-        # Step 1: Delete the service account
-        subprocess.run([
-            "gcloud", "iam", "service-accounts", "delete", sa_email,
-            "--quiet",
-            "--project", project_id
-        ], check=True)
+            # Step 1: Delete the service account
+            run_limited([
+                "gcloud", "iam", "service-accounts", "delete", sa_email,
+                "--quiet",
+                "--project", project_id
+            ], check=True)
 
         return {
             "message": f"🗑️ Service account '{sa_email}' deleted successfully."
         }
 
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, GoogleAPIError) as e:
         return {
             "error": f"❌ Failed to delete service account. Details:\n{e}"
         }
\ No newline at end of file
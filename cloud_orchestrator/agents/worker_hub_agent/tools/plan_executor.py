@@ -0,0 +1,19 @@
+from google.adk.tools.function_tool import FunctionTool
+
+from ...common.metrics import instrumented
+from ...execution import execute_plan
+
+
+@FunctionTool
+@instrumented("tool")
+def execute_tool_plan(tool_plan: list, max_parallel: int = 4, resume: bool = False) -> dict:
+    """Execute a planner tool plan, running independent steps in parallel.
+
+    Each step is {"action": "pubsub.create_topic", "params": {...}} and may list
+    "depends_on" step ids or services. Steps with missing required params fail,
+    and anything depending on a failed step is skipped. Set resume=True to retry
+    a plan and skip the steps that already succeeded last time.
+    """
+    if not isinstance(tool_plan, list) or not tool_plan:
+        return {"status": "error", "message": "❌ tool_plan must be a non-empty list of steps"}
+    return execute_plan(tool_plan, max_workers=max(1, int(max_parallel)), resume=bool(resume))
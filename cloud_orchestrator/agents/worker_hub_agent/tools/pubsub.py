@@ -1,57 +1,76 @@
+import base64
 import subprocess
 from google.adk.tools.function_tool import FunctionTool
+from ...common.gcp_client import PUBSUB_API, GoogleAPIError, request, rest_available
+from ...common.rate_limit import rate_limited, run_limited
 
 @FunctionTool
+@rate_limited("pubsub.googleapis.com")
 def create_topic(project_id: str, topic_id: str) -> dict:
     """Create a Pub/Sub topic."""
     try:
-        subprocess.run([
-            "gcloud", "pubsub", "topics", "create", topic_id,
-            "--project", project_id
-        ], check=True)
+        if rest_available():
+            request("PUT", f"{PUBSUB_API}/projects/{project_id}/topics/{topic_id}", project_id=project_id)
+        else:
+            run_limited([
+                "gcloud", "pubsub", "topics", "create", topic_id,
+                "--project", project_id
+            ], check=True)
         return {
             "message": f"✅ Topic '{topic_id}' created in project '{project_id}'."
         }
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, GoogleAPIError) as e:
         return {
             "error": f"❌ Failed to create topic '{topic_id}':\n{e}"
         }
 
 @FunctionTool
+@rate_limited("pubsub.googleapis.com")
 def create_subscription(project_id: str, topic_id: str, subscription_id: str) -> dict:
     """Create a Pub/Sub subscription."""
     try:
-        subprocess.run([
-            "gcloud", "pubsub", "subscriptions", "create", subscription_id,
-            "--topic", topic_id,
-            "--project", project_id
-        ], check=True)
+        if rest_available():
+            request("PUT", f"{PUBSUB_API}/projects/{project_id}/subscriptions/{subscription_id}",
+                    body={"topic": f"projects/{project_id}/topics/{topic_id}"}, project_id=project_id)
+        else:
+            run_limited([
+                "gcloud", "pubsub", "subscriptions", "create", subscription_id,
+                "--topic", topic_id,
+                "--project", project_id
+            ], check=True)
         return {
             "message": f"✅ Subscription '{subscription_id}' created for topic '{topic_id}'."
         }
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, GoogleAPIError) as e:
         return {
             "error": f"❌ Failed to create subscription '{subscription_id}':\n{e}"
         }
 
 @FunctionTool
+@rate_limited("pubsub.googleapis.com")
 def publish(project_id: str, topic_id: str, message: str) -> dict:
     """Publish a message to a Pub/Sub topic."""
     try:
-        subprocess.run([
-            "gcloud", "pubsub", "topics", "publish", topic_id,
-            "--message", message,
-            "--project", project_id
-        ], check=True)
+        if rest_available():
+            data = base64.b64encode(message.encode("utf-8")).decode("ascii")
+            request("POST", f"{PUBSUB_API}/projects/{project_id}/topics/{topic_id}:publish",
+                    body={"messages": [{"data": data}]}, project_id=project_id)
+        else:
+            run_limited([
+                "gcloud", "pubsub", "topics", "publish", topic_id,
+                "--message", message,
+                "--project", project_id
+            ], check=True)
         return {
             "message": f"✅ Message published to topic '{topic_id}'."
         }
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, GoogleAPIError) as e:
         return {
             "error": f"❌ Failed to publish message to topic '{topic_id}':\n{e}"
         }
 
 @FunctionTool
+@rate_limited("pubsub.googleapis.com")
 def pull(project_id: str, subscription_id: str, max_messages: int = 10) -> dict:
     """
     Pull messages from a Pub/Sub subscription.
@@ -61,8 +80,10 @@ def pull(project_id: str, subscription_id: str, max_messages: int = 10) -> dict:
     - subscription_id: ID of the Pub/Sub subscription
     - max_messages: Number of messages to pull (default is 10)
     """
+    if rest_available():
+        return _pull_rest(project_id, subscription_id, max_messages)
     try:
-        result = subprocess.run(
+        result = run_limited(
             [
                 "gcloud", "pubsub", "subscriptions", "pull", subscription_id,
                 f"--limit={max_messages}",
@@ -88,4 +109,33 @@ def pull(project_id: str, subscription_id: str, max_messages: int = 10) -> dict:
     except subprocess.CalledProcessError as e:
         return {
             "error": f"❌ Failed to pull messages from subscription '{subscription_id}':\n{e.stderr.strip()}"
-        }
\ No newline at end of file
+        }
+
+
+def _pull_rest(project_id: str, subscription_id: str, max_messages: int) -> dict:
+    """Pull and acknowledge over REST, matching gcloud's --auto-ack behaviour."""
+    subscription = f"{PUBSUB_API}/projects/{project_id}/subscriptions/{subscription_id}"
+    try:
+        received = request("POST", f"{subscription}:pull", body={"maxMessages": max_messages},
+                           project_id=project_id).get("receivedMessages", [])
+        if not received:
+            return {
+                "message": f"ℹ️ No messages available in subscription '{subscription_id}'."
+            }
+        request("POST", f"{subscription}:acknowledge", body={"ackIds": [m["ackId"] for m in received]})
+        messages = []
+        for item in received:
+            msg = item.get("message", {})
+            messages.append({
+                "data": base64.b64decode(msg.get("data", "")).decode("utf-8", errors="replace"),
+                "message_id": msg.get("messageId"),
+                "attributes": msg.get("attributes", {}),
+                "publish_time": msg.get("publishTime"),
+            })
+        return {
+            "messages": messages
+        }
+    except GoogleAPIError as e:
+        return {
+            "error": f"❌ Failed to pull messages from subscription '{subscription_id}':\n{e}"
+        }
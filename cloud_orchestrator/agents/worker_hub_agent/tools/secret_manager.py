@@ -1,13 +1,15 @@
 import json, os, subprocess, tempfile
 from typing import Dict, List
 from google.adk.tools import FunctionTool
+from ...common.rate_limit import check_output_limited, rate_limited
 
 
 def _gcloud(cmd: List[str]) -> str:
     """Helper function to execute gcloud commands."""
-    return subprocess.check_output(cmd, text=True, stderr=subprocess.STDOUT)
+    return check_output_limited(cmd, text=True, stderr=subprocess.STDOUT)
 
 @FunctionTool
+@rate_limited("secretmanager.googleapis.com")
 def create_secret(
     project_id: str,
     secret_id: str,
@@ -48,6 +50,7 @@ def create_secret(
 
 
 @FunctionTool
+@rate_limited("secretmanager.googleapis.com")
 def add_version(
     project_id: str,
     secret_id: str,
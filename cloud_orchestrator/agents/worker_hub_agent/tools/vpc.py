@@ -1,6 +1,8 @@
 from google.adk.tools import FunctionTool
+from ...common.access_token import authorized_request
+from ...common.rate_limit import rate_limited, run_limited
+from ...common.service_registry import ensure_enabled
 import subprocess
-import requests
 from datetime import datetime, timedelta
 import zoneinfo
 from typing import Optional, List
@@ -9,6 +11,7 @@ NY_TZ = zoneinfo.ZoneInfo("America/New_York")
 
 
 @FunctionTool
+@rate_limited("firestore.googleapis.com")
 def create_firestore_db(
     project_id: str,
     location_id: str,
@@ -29,13 +32,13 @@ def create_firestore_db(
         document_data = []
 
     try:
-        subprocess.run(f"gcloud services enable firestore.googleapis.com --project={project_id}", shell=True, check=True)
+        ensure_enabled(project_id, ["firestore.googleapis.com"])
         messages.append("✅ Firestore API enabled.")
-        subprocess.run(f"gcloud config set project {project_id}", shell=True, check=True)
+        run_limited(f"gcloud config set project {project_id}", shell=True, check=True)
         messages.append("✅ GCP project set.")
 
         check_cmd = f"gcloud firestore databases describe --database={db_name}"
-        check_proc = subprocess.run(check_cmd, shell=True, capture_output=True, text=True)
+        check_proc = run_limited(check_cmd, shell=True, capture_output=True, text=True)
 
         db_exists = check_proc.returncode == 0
 
@@ -44,7 +47,7 @@ def create_firestore_db(
                 f"gcloud firestore databases create --database={db_name} "
                 f"--location={location_id} --type={firestore_type}"
             )
-            subprocess.run(create_cmd, shell=True, check=True)
+            run_limited(create_cmd, shell=True, check=True)
             messages.append(f"✅ Firestore DB '{db_name}' created in {location_id}.")
         else:
             messages.append(f"✅ Firestore DB '{db_name}' already exists.")
@@ -83,15 +86,6 @@ def _add_documents(
     expires_days = 15  # fixed TTL duration for 'expiresAt'
 
     try:
-        token_proc = subprocess.run(
-            "gcloud auth print-access-token", shell=True, check=True, capture_output=True
-        )
-        token = token_proc.stdout.decode("utf-8").strip()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-
         for idx, doc in enumerate(document_data):
             document_id = doc.get("id")
             if not document_id:
@@ -131,7 +125,7 @@ def _add_documents(
                 f"databases/{db_name}/documents/{collection_name}/{document_id}"
             )
 
-            response = requests.patch(url, headers=headers, json=data)
+            response = authorized_request("PATCH", url, json=data)
             if response.status_code in (200, 201):
                 doc_name = response.json().get("name", "unknown").split("/")[-1]
                 inserted_docs.append(doc_name)
@@ -152,6 +146,7 @@ def _add_documents(
 
 
 @FunctionTool
+@rate_limited("firestore.googleapis.com")
 def set_ttl(
     project_id: str,
     db_name: str,
@@ -164,15 +159,6 @@ def set_ttl(
     messages = []
 
     try:
-        token_proc = subprocess.run(
-            "gcloud auth print-access-token", shell=True, check=True, capture_output=True
-        )
-        token = token_proc.stdout.decode("utf-8").strip()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-
         url = (
             f"https://firestore.googleapis.com/v1/projects/{project_id}/"
             f"databases/{db_name}/collectionGroups/{collection_name}/ttlConfig"
@@ -183,7 +169,7 @@ def set_ttl(
             }
         }
 
-        response = requests.patch(url, headers=headers, json=data)
+        response = authorized_request("PATCH", url, json=data)
         if response.status_code in (200, 201):
             messages.append(f"✅ TTL policy set on '{collection_name}' using field '{ttl_field}'.")
             return {"status": "success", "message": "\n".join(messages)}
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import requests
+
+from cloud_orchestrator.agents.common import access_token
+from cloud_orchestrator.agents.common.access_token import AccessTokenProvider
+
+
+class _CountingProvider(AccessTokenProvider):
+    def __init__(self, lifetime, **kwargs):
+        super().__init__(**kwargs)
+        self.lifetime = lifetime
+        self.fetches = 0
+
+    def _fetch(self):
+        self.fetches += 1
+        time.sleep(0.05)
+        return f"token-{self.fetches}", time.time() + self.lifetime
+
+
+def test_token_is_fetched_once_across_threads():
+    provider = _CountingProvider(lifetime=3600)
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(provider.token())) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert provider.fetches == 1
+    assert set(tokens) == {"token-1"}
+
+
+def test_token_refreshes_before_expiry_and_on_invalidate():
+    # expires in 10s but the margin is 300s, so every call is "about to expire"
+    provider = _CountingProvider(lifetime=10)
+    assert provider.token() == "token-1"
+    assert provider.token() == "token-2"
+
+    provider = _CountingProvider(lifetime=3600)
+    provider.token()
+    provider.invalidate()
+    assert provider.token() == "token-2"
+
+
+def test_authorized_request_refreshes_the_token_once_on_401(monkeypatch):
+    provider = _CountingProvider(lifetime=3600)
+    monkeypatch.setattr(access_token, "_provider", provider)
+    sent = []
+
+    def request(method, url, headers=None, **kwargs):
+        sent.append(headers["Authorization"])
+        return type("Response", (), {"status_code": 401 if len(sent) == 1 else 200})()
+
+    monkeypatch.setattr(requests, "request", request)
+    assert access_token.authorized_request("GET", "https://example.com").status_code == 200
+    assert sent == ["Bearer token-1", "Bearer token-2"]
+
+    # A second 401 comes back to the caller instead of looping
+    monkeypatch.setattr(requests, "request", lambda *a, **kw: sent.append("x") or type("R", (), {"status_code": 401})())
+    assert access_token.authorized_request("GET", "https://example.com").status_code == 401
+    assert provider.fetches == 3
@@ -0,0 +1,69 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "api"))
+import server  # noqa: E402
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    jobs = []
+
+    def submit(kind, payload):
+        jobs.append((kind, payload))
+        return SimpleNamespace(id=f"job-{len(jobs)}", status="queued")
+
+    def get(job_id):
+        kind = next((k for i, (k, _) in enumerate(jobs, 1) if f"job-{i}" == job_id), None)
+        return kind and SimpleNamespace(kind=kind, to_dict=lambda: {"id": job_id, "result": {"steps": []}})
+
+    monkeypatch.setattr(server, "get_job_queue", lambda: SimpleNamespace(submit=submit, get=get))
+    return jobs
+
+
+def test_jobs_reject_non_json_bodies(submitted):
+    client = TestClient(server.app)
+    response = client.post("/api/jobs", content='{"kind": "plan", "prompt": "x"}',
+                           headers={"Content-Type": "text/plain"})
+    assert response.status_code == 415
+    assert client.post("/api/process", content='{"prompt": "x"}').status_code == 415
+    assert submitted == []
+
+    response = client.post("/api/jobs", json={"kind": "plan", "prompt": "x"})
+    assert response.status_code == 202
+    assert "access-control-allow-origin" not in response.headers
+
+
+def test_execute_jobs_need_the_configured_token(submitted, monkeypatch):
+    client = TestClient(server.app)
+    body = {"kind": "execute", "tool_plan": [{"action": "pubsub.create_topic"}]}
+
+    monkeypatch.setattr(server, "JOBS_API_TOKEN", "")
+    assert client.post("/api/jobs", json=body, headers={"Authorization": "Bearer anything"}).status_code == 403
+
+    monkeypatch.setattr(server, "JOBS_API_TOKEN", "s3cret")
+    assert client.post("/api/jobs", json=body).status_code == 401
+    assert client.post("/api/jobs", json=body, headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert submitted == []
+
+    response = client.post("/api/jobs", json=body, headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 202
+    assert submitted == [("execute", {"tool_plan": body["tool_plan"]})]
+
+
+def test_execute_job_status_needs_the_token(submitted, monkeypatch):
+    monkeypatch.setattr(server, "JOBS_API_TOKEN", "s3cret")
+    client = TestClient(server.app)
+    auth = {"Authorization": "Bearer s3cret"}
+    client.post("/api/jobs", json={"kind": "plan", "prompt": "x"})
+    client.post("/api/jobs", json={"kind": "execute", "tool_plan": [{"action": "a"}]}, headers=auth)
+
+    plan = client.get("/api/jobs/job-1")
+    assert plan.status_code == 200 and "access-control-allow-origin" not in plan.headers
+    assert client.get("/api/jobs/job-2").status_code == 401
+    assert client.get("/api/jobs/job-2", headers=auth).json()["result"] == {"steps": []}
+    assert client.get("/api/jobs/missing").status_code == 404
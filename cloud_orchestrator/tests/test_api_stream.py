@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from http.server import ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "api"))
+import index  # noqa: E402
+import server  # noqa: E402
+from agents.planner_agent.tools import planner_tool  # noqa: E402
+
+PLAN = [
+    {"action": "pubsub.create_topic", "params": {"project_id": "p", "topic_id": "events"}},
+    {"action": "bigquery.create_dataset", "params": {"project_id": "p", "dataset_id": "raw"}},
+]
+
+
+@pytest.fixture
+def planner(monkeypatch):
+    """Stub planner stages; tests tweak `calls` to change what each one returns."""
+    calls = SimpleNamespace(intent={"services": ["pubsub", "bigquery"]}, delay=0.0, quota_projects=[])
+
+    def stream_tool_plan(prompt):
+        for tool_call in PLAN:
+            time.sleep(calls.delay)
+            yield tool_call
+
+    def check_quota(project_id, tool_calls):
+        calls.quota_projects.append(project_id)
+        return {"status": "OK"}
+
+    monkeypatch.setattr(planner_tool, "parse_user_goal", SimpleNamespace(func=lambda prompt: calls.intent))
+    monkeypatch.setattr(planner_tool, "build_service_dag", SimpleNamespace(func=lambda intent: {"order": ["pubsub"]}))
+    monkeypatch.setattr(planner_tool, "check_quota_before_planning", SimpleNamespace(func=check_quota))
+    monkeypatch.setattr(planner_tool, "stream_tool_plan", stream_tool_plan)
+    return calls
+
+
+def _frames(body):
+    """(event, data) pairs and the number of keep-alive comments in an SSE body."""
+    events, heartbeats = [], 0
+    for frame in body.split("\n\n"):
+        if frame.startswith(":"):
+            heartbeats += 1
+        elif frame:
+            lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events, heartbeats
+
+
+def test_stream_events_in_order(planner):
+    response = TestClient(server.app).get("/api/stream", params={"prompt": "topic to dataset", "project_id": "p"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events, _ = _frames(response.text)
+    assert [e for e, _ in events] == ["intent", "dag", "tool_call", "tool_call", "quota", "result"]
+    assert events[2][1] == {"step": 1, **PLAN[0]}
+    assert events[-1][1]["tool_calls"] == PLAN
+    assert events[-1][1]["quota_status"] == "OK"
+    assert planner.quota_projects == ["p"]
+
+
+def test_stream_ends_after_error_event(planner):
+    planner.intent = {"error": "Could not understand the request"}
+    events, _ = _frames(TestClient(server.app).get("/api/stream", params={"prompt": "gibberish"}).text)
+    assert events == [("intent", planner.intent), ("error", {"error": "Could not understand the request"})]
+
+    events, _ = _frames(TestClient(server.app).get("/api/stream", params={"prompt": "  "}).text)
+    assert events == [("error", {"error": "Please enter a request"})]
+
+
+def test_stream_sends_heartbeats_while_the_planner_is_busy(planner, monkeypatch):
+    monkeypatch.setattr(server, "HEARTBEAT_SECONDS", 0.02)
+    planner.delay = 0.2
+    events, heartbeats = _frames(TestClient(server.app).get("/api/stream", params={"prompt": "slow plan"}).text)
+    assert heartbeats >= 2
+    assert [e for e, _ in events][-2:] == ["quota", "result"]
+
+
+def test_stream_post_reads_json_body(planner):
+    response = TestClient(server.app).post("/api/stream", json={"prompt": "post plan", "project_id": "q"})
+    events, _ = _frames(response.text)
+    assert events[-1][0] == "result"
+    assert planner.quota_projects == ["q"]
+
+
+def test_vercel_handler_streams_the_same_events(planner):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), index.handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{httpd.server_address[1]}/api/stream?prompt=vercel+plan"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            content_type = response.headers["Content-Type"]
+            body = response.read().decode()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    assert content_type.startswith("text/event-stream")
+    events, _ = _frames(body)
+    assert [e for e, _ in events] == ["intent", "dag", "tool_call", "tool_call", "quota", "result"]
+    assert planner.quota_projects == ["p"]  # taken from the plan when the query has none
@@ -0,0 +1,45 @@
+import threading
+import time
+
+import pytest
+
+from cloud_orchestrator.agents.common.cache import TTLCache
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(ttl=60)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        time.sleep(0.1)
+        return "123456"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("proj", loader)))
+               for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["123456"] * 10
+    assert len(loads) == 1
+    assert cache.get_or_load("proj", loader) == "123456" and len(loads) == 1
+
+
+def test_entries_expire_and_failures_are_not_cached():
+    cache = TTLCache(ttl=0.05, maxsize=2)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+    def boom():
+        raise RuntimeError("gcloud failed")
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("b", boom)
+    assert cache.get_or_load("b", lambda: 2) == 2
+
+    cache.set("c", 3)
+    cache.set("d", 4)
+    assert cache.get("b") is None  # evicted as least recently used
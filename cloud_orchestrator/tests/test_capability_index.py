@@ -0,0 +1,54 @@
+import json
+import os
+
+import pytest
+
+from cloud_orchestrator.agents.planner_agent.tools.capability_index import (
+    CACHE_FILENAME,
+    CapabilityIndex,
+    load_catalog,
+)
+
+YAML = """actions:
+  pubsub.create_topic:
+    agent: agents.worker_hub_agent
+    params:
+      required: [project_id, topic_id]
+  secretmanager.access_secret:
+    agent: agents.worker_hub_agent
+    params: TBD
+"""
+
+
+def test_lookups_are_precomputed_and_read_only():
+    catalog, _ = load_catalog(use_cache=False)
+    index = CapabilityIndex(catalog)
+    assert index.required_params("bigquery.create_dataset")[0] == "project_id"
+    assert index.primary_action("Pub/Sub") == "pubsub.create_topic"
+    assert "vpc.manage_vpc_network" in index.actions_for_api("compute.googleapis.com")
+    assert index.spec("cloudmonitoring.delete_dashboard").needs_design
+    assert index.quota_usage("compute.create_vm")["service"] == "compute.googleapis.com"
+    with pytest.raises(TypeError):
+        index.catalog["actions"]["new.action"] = {}
+
+
+def test_json_cache_keyed_by_fingerprint(tmp_path):
+    yaml_path = tmp_path / "capabilities.yaml"
+    yaml_path.write_text(YAML)
+    catalog, _ = load_catalog(yaml_path)
+    cache_path = tmp_path / CACHE_FILENAME
+    assert cache_path.exists()
+    assert catalog["actions"]["pubsub.create_topic"]["params"]["required"] == ["project_id", "topic_id"]
+
+    # An unchanged YAML is served from the cache, even after its mtime moves
+    cached = json.loads(cache_path.read_text())
+    cached["catalog"]["actions"]["from_cache"] = {}
+    cache_path.write_text(json.dumps(cached))
+    os.utime(yaml_path, ns=(0, 0))
+    assert "from_cache" in load_catalog(yaml_path)[0]["actions"]
+
+    # Editing the YAML invalidates it
+    yaml_path.write_text(YAML.replace("topic_id]", "topic_id, labels]"))
+    catalog, _ = load_catalog(yaml_path)
+    assert "from_cache" not in catalog["actions"]
+    assert catalog["actions"]["pubsub.create_topic"]["params"]["required"][-1] == "labels"
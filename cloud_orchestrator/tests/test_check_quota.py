@@ -0,0 +1,99 @@
+import requests
+
+from cloud_orchestrator.agents.common import access_token, gcp_client
+from cloud_orchestrator.agents.guard_agent.tools import check, quota_snapshot
+from cloud_orchestrator.agents.guard_agent.tools.quota_snapshot import QuotaSnapshotStore, build_quota_index
+
+
+def _metric(name, buckets):
+    return {"metric": name, "consumerQuotaLimits": [{"quotaBuckets": buckets}]}
+
+
+QUOTAS = {
+    "compute.googleapis.com": [
+        _metric("compute.googleapis.com/cpus", [
+            {"effectiveLimit": "100"},
+            {"effectiveLimit": "24", "usage": "20", "dimensions": {"region": "us-central1"}},
+        ]),
+        _metric("compute.googleapis.com/networks", [{"effectiveLimit": "-1"}]),
+    ],
+    "pubsub.googleapis.com": [
+        _metric("pubsub.googleapis.com/topics", [{"effectiveLimit": "10000", "usage": "3"}]),
+    ],
+}
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, metrics):
+        self._metrics = metrics
+
+    def json(self):
+        return {"metrics": self._metrics}
+
+
+def test_quota_index_prefers_regional_buckets():
+    index = build_quota_index(QUOTAS["compute.googleapis.com"])
+    assert index[("cpus", "us-central1")] == (24.0, 20.0, 4.0)
+    assert index[("cpus", None)] == (100.0, 0.0, 100.0)
+    assert index[("networks", None)].headroom == float("inf")
+
+
+def test_snapshots_are_reused_until_stale():
+    fetches = []
+    store = QuotaSnapshotStore(lambda project, service: fetches.append(service) or QUOTAS[service], max_age=60)
+    first = store.get("p", "compute.googleapis.com")
+    assert store.get("p", "compute.googleapis.com") is first
+    assert first.lookup("CPUS", "us-central1").headroom == 4.0
+    assert first.lookup("cpus", "asia-east1").headroom == 100.0
+    assert store.get("p", "compute.googleapis.com", max_age=0) is not first
+    assert fetches == ["compute.googleapis.com", "compute.googleapis.com"]
+    assert {r["region"] for r in store.headroom_table()} == {"us-central1", "global"}
+
+
+def test_check_quota_uses_index_for_every_service(monkeypatch):
+    monkeypatch.setattr(check, "ensure_enabled", lambda project_id, apis: [])
+    fetched = []
+
+    def fake_request(method, url, params=None, timeout=None):
+        service = url.split("/services/")[1].split("/")[0]
+        fetched.append(service)
+        assert params == {"view": "FULL"} and timeout == check.QUOTA_FETCH_TIMEOUT_SECONDS
+        return {"metrics": QUOTAS[service]}
+    monkeypatch.setattr(gcp_client, "rest_available", lambda: True)
+    monkeypatch.setattr(gcp_client, "request", fake_request)
+    monkeypatch.setattr(quota_snapshot, "_store", QuotaSnapshotStore(check._fetch_quota_metrics))
+
+    result = check.check_quota.func("p", {
+        "compute.googleapis.com": {"us-central1": {"CPUS": 8, "networks": 1}, "europe-west1": {"cpus": 8}},
+        "pubsub.googleapis.com": {"global": {"topics": 2, "subscriptions": 1}},
+    })
+    message = result["message"]
+    assert sorted(fetched) == ["compute.googleapis.com", "pubsub.googleapis.com"]
+    assert result["status"] == "WARN"
+    # 24 - 20 = 4 left in the region even though the global bucket has room
+    assert "⚠️ WARN: 8 > available 4.0 for CPUS in us-central1" in message
+    assert "✅ OK: 8 ≤ available 100.0 for cpus in europe-west1" in message
+    assert "No enforced quota for networks" in message
+    assert "⚠️ WARN: No match found for subscriptions in global" in message
+
+
+def test_quota_fetch_without_adc_has_a_timeout(monkeypatch):
+    monkeypatch.setattr(gcp_client, "rest_available", lambda: False)
+    monkeypatch.setattr(access_token.get_token_provider(), "token", lambda: "token")
+    calls = []
+    monkeypatch.setattr(requests, "request", lambda method, url, **kwargs: calls.append(kwargs) or _Response(["m"]))
+    assert check._fetch_quota_metrics("p", "pubsub.googleapis.com") == ["m"]
+    assert calls[0]["timeout"] == check.QUOTA_FETCH_TIMEOUT_SECONDS
+
+
+def test_budget_index_matches_scoped_and_account_wide_budgets():
+    index = check.BudgetIndex([
+        {"displayName": "all"},
+        {"displayName": "p1", "budgetFilter": {"projects": ["projects/1"]}},
+        {"displayName": "p1+p2", "budgetFilter": {"projects": ["projects/1", "projects/2"]}},
+    ])
+    assert [b["displayName"] for b in index.for_project("projects/1")] == ["all", "p1", "p1+p2"]
+    assert [b["displayName"] for b in index.for_project("projects/2")] == ["all", "p1+p2"]
+    assert [b["displayName"] for b in index.for_project("projects/3")] == ["all"]
@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+
+import pytest
+
+from cloud_orchestrator.agents.worker_hub_agent.tools import cloud_sql_fix
+
+PASSWORD = "Pa$$ (w0rd)"
+
+
+@pytest.fixture
+def gcloud(monkeypatch):
+    """Records each gcloud call with its flags file, then fails with the password echoed in stderr."""
+    seen = {}
+
+    def run(cmd, **kwargs):
+        flags_file = next(a.split("=", 1)[1] for a in cmd if a.startswith("--flags-file="))
+        with open(flags_file) as f:
+            seen.update(cmd=cmd, kwargs=kwargs, flags=json.load(f), flags_file=flags_file)
+        raise subprocess.CalledProcessError(1, cmd, stderr=f"ERROR: invalid password {PASSWORD}")
+
+    monkeypatch.setattr(subprocess, "run", run)
+    return seen
+
+
+def _assert_password_hidden(seen, flag):
+    assert isinstance(seen["cmd"], list) and "shell" not in seen["kwargs"]
+    assert not any("Pa$$" in arg for arg in seen["cmd"])
+    assert seen["flags"] == {flag: PASSWORD}
+    assert not os.path.exists(seen["flags_file"])
+
+
+def test_create_sql_instance_keeps_password_out_of_argv_and_errors(gcloud):
+    result = cloud_sql_fix.create_sql_instance.func("p", "db", "us-central1-a", 2, 4096, PASSWORD,
+                                                    "ENTERPRISE", "POSTGRES_15")
+    _assert_password_hidden(gcloud, "--root-password")
+    assert "--format=value(name)" in gcloud["cmd"]
+    assert result["error"] == "❌ Instance creation failed: ERROR: invalid password ***"
+
+
+def test_user_tools_keep_password_out_of_argv_and_errors(gcloud):
+    result = cloud_sql_fix.set_sql_password.func("db", PASSWORD)
+    _assert_password_hidden(gcloud, "--password")
+    assert gcloud["cmd"][:5] == ["gcloud", "sql", "users", "set-password", "postgres"]
+    assert result["error"] == "❌ Failed to set password: ERROR: invalid password ***"
+
+    result = cloud_sql_fix.create_sql_user.func("db", "app", PASSWORD)
+    _assert_password_hidden(gcloud, "--password")
+    assert gcloud["cmd"][:5] == ["gcloud", "sql", "users", "create", "app"]
+    assert result["error"] == "ERROR: invalid password ***"
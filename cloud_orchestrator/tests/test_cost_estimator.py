@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from cloud_orchestrator.agents.guard_agent.tools import check
+from cloud_orchestrator.agents.guard_agent.tools.cost_estimator import estimate_cost, load_pricing
+from cloud_orchestrator.agents.planner_agent.tools.usage_estimator import estimate_usage
+
+
+def test_plan_cost_uses_machine_types_regions_and_storage():
+    pricing = load_pricing()
+    estimate = estimate_cost({"tool_calls": [
+        {"action": "compute.create_vm", "params": {"zone": "us-central1-a", "machine_type": "n2-standard-4"}},
+        {"action": "compute.create_vm", "params": {"zone": "europe-west4-b", "machine_type": "n2-standard-4"}},
+        {"action": "storage.create_bucket", "params": {"storage_class": "nearline", "size_gb": 100}},
+        {"action": "pubsub.create_topic", "params": {}},
+    ]})
+    n2 = pricing["compute"]["families"]["n2"]
+    vm_hourly = 4 * n2["vcpu_hour"] + 16 * n2["memory_gb_hour"]
+    us, eu, bucket = estimate["items"]
+    assert us["hourly"] == pytest.approx(vm_hourly, abs=1e-4)
+    assert eu["hourly"] == pytest.approx(vm_hourly * 1.10, abs=1e-4)
+    assert us["monthly"] == pytest.approx(vm_hourly * 730 + 10 * pricing["disks"]["pd-standard"], abs=0.01)
+    assert bucket["monthly"] == pytest.approx(1.0)
+    assert estimate["unpriced"] == ["pubsub.create_topic"]
+    assert estimate["pricing_version"] == pricing["version"]
+    assert estimate["elapsed_ms"] < 50
+
+
+def test_expanded_plan_with_empty_params_uses_defaults():
+    estimate = estimate_cost({"tool_plan": [
+        {"action": "gke.create_cluster", "params": {"project_id": None, "region": None, "cluster_name": None}},
+        {"action": "cloudsql.create_instance", "params": {"tier": "db-custom-2-7680"}},
+    ]})
+    assert estimate["items"][0]["hourly"] == pytest.approx(0.10)
+    assert "2 vCPU, 7.5 GB" in estimate["items"][1]["detail"]
+
+
+def test_cost_and_quota_read_params_the_same_way():
+    plan = [
+        {"action": "dataflow.launch_flex_template", "params": {"workerZone": "europe-west4-b", "maxNumWorkers": 5}},
+        {"action": "dataproc.create_cluster", "params": {"region": "us-east1", "num_masters": 3, "num_workers": 2}},
+    ]
+    cost = estimate_cost(plan)
+    usage = estimate_usage(plan)
+    assert [item["region"] for item in cost["items"]] == [call["region"] for call in usage["calls"]]
+    assert cost["items"][0]["region"] == "europe-west4"
+    assert cost["items"][1]["detail"] == "3 × n2-standard-4 + 2 × n2-standard-4"
+    assert usage["calls"][1]["instances"] == 5
+
+
+def test_projected_budget_adds_plan_spend(monkeypatch):
+    monkeypatch.setattr(check, "_project_number", lambda project_id: "1")
+    monkeypatch.setattr(check, "_budget_index", lambda account: check.BudgetIndex([
+        {"displayName": "monthly", "amount": {"specifiedAmount": {"units": "100"}}, "amountSpent": {"units": "80"}},
+    ]))
+    monkeypatch.setattr(check, "_hours_left_in_month", lambda: 100.0)
+    plan = [{"action": "gke.create_cluster", "params": {"region": "us-central1"}}]
+
+    assert check.check_projected_budget.func("p", "acct", plan)["status"] == "WARN"  # 80 + 10 of 100
+    plan.append({"action": "gke.create_cluster", "params": {"region": "us-central1"}})
+    result = check.check_projected_budget.func("p", "acct", plan)
+    assert result["status"] == "BLOCK" and result["projected_spend"] == 20.0
+
+
+def test_hours_left_in_month_rolls_over_year():
+    assert check._hours_left_in_month(datetime(2025, 12, 31, 12, tzinfo=timezone.utc)) == 12
@@ -0,0 +1,39 @@
+from cloud_orchestrator.agents.planner_agent.tools.dag_scheduler import describe_problems, schedule_dag
+
+
+def test_independent_services_share_a_wave():
+    dag = {
+        "IAM": [],
+        "VPC": [],
+        "Pub/Sub": ["IAM"],
+        "Cloud SQL": ["VPC", "IAM"],
+        "Dataflow": ["Pub/Sub"],
+        "BigQuery": ["Dataflow"],
+        "Cloud Run": ["Cloud SQL"],
+    }
+    schedule = schedule_dag(dag)
+    assert schedule.ok
+    assert schedule.waves == [
+        ["IAM", "VPC"],
+        ["Pub/Sub", "Cloud SQL"],
+        ["Dataflow", "Cloud Run"],
+        ["BigQuery"],
+    ]
+    assert schedule.critical_path == ["IAM", "Pub/Sub", "Dataflow", "BigQuery"]
+
+    # Weights move the critical path onto the slow branch
+    slow = schedule_dag(dag, weights={"Cloud SQL": 10})
+    assert slow.critical_path == ["VPC", "Cloud SQL", "Cloud Run"]
+    assert slow.critical_path_cost == 12
+
+
+def test_cycles_and_missing_nodes_are_reported():
+    schedule = schedule_dag({"A": ["B"], "B": ["C"], "C": ["A"], "D": ["A"], "E": ["Ghost"]})
+    assert not schedule.ok
+    assert schedule.cycles == [["A", "B", "C"]]
+    assert schedule.blocked == ["D"]
+    assert schedule.missing == {"E": ["Ghost"]}
+    assert schedule.order == ["Ghost", "E"]
+    assert "cycle A → B → C → A" in describe_problems(schedule)
+
+    assert schedule_dag({"A": ["A"]}).cycles == [["A"]]
@@ -0,0 +1,60 @@
+from cloud_orchestrator.agents.planner_agent.tools.fast_path import (
+    CANONICAL_EDGES,
+    SERVICES,
+    canonicalize,
+    fast_build_service_dag,
+    fast_parse_user_goal,
+    match_services,
+)
+
+
+def test_simple_prompt_is_confident():
+    intent = fast_parse_user_goal("Create a bucket and a Pub/Sub topic")
+    assert intent["hints"] == ["Cloud Storage", "Pub/Sub"]
+    assert intent["confidence"] >= 0.75
+    assert intent["source"] == "fast_path"
+
+
+def test_vague_prompt_is_not_confident():
+    intent = fast_parse_user_goal("migrate our legacy on-prem oracle workloads while minimising downtime")
+    assert intent["hints"] == []
+    assert intent["confidence"] == 0.0
+
+
+def test_longest_match_and_word_boundaries():
+    services = [s for _, _, s in match_services("cloud sql postgres plus a bigquery dataset, no bqx")]
+    assert services == ["Cloud SQL", "Cloud SQL", "BigQuery", "BigQuery"]
+    assert canonicalize("pubsub") == "Pub/Sub"
+    assert canonicalize("Cloud Run") == "Cloud Run"
+    assert canonicalize("something else") is None
+
+
+def test_dag_follows_canonical_edges_through_missing_services():
+    dag = fast_build_service_dag(["Pub/Sub", "Dataflow", "BigQuery", "Cloud Run", "Cloud Monitoring"])
+    assert dag == {
+        "Pub/Sub": [],
+        "Dataflow": ["Pub/Sub"],
+        "BigQuery": ["Dataflow"],
+        "Cloud Run": ["BigQuery"],
+        "Cloud Monitoring": ["Cloud Run"],
+    }
+    # Dataflow is absent, so BigQuery inherits its Pub/Sub prerequisite
+    assert fast_build_service_dag(["BigQuery", "Pub/Sub"]) == {"BigQuery": ["Pub/Sub"], "Pub/Sub": []}
+
+
+def test_canonical_edges_are_acyclic():
+    assert set(CANONICAL_EDGES) == set(SERVICES)
+    visiting, done = set(), set()
+
+    def visit(svc):
+        assert svc not in visiting, f"cycle through {svc}"
+        if svc in done:
+            return
+        visiting.add(svc)
+        for dep in CANONICAL_EDGES[svc]:
+            visit(dep)
+        visiting.discard(svc)
+        done.add(svc)
+
+    for svc in SERVICES:
+        visit(svc)
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from cloud_orchestrator.agents.common import gcp_client
+from cloud_orchestrator.agents.common.gcp_client import GoogleAPIError
+
+
+class _Response:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.reason = "reason"
+        self._payload = payload
+        self.content = json.dumps(payload).encode() if payload is not None else b""
+        self.text = self.content.decode()
+
+    def json(self):
+        return self._payload
+
+
+class _Session:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        return self.responses.pop(0)
+
+
+def _disabled(api):
+    return _Response(403, {"error": {
+        "code": 403, "status": "PERMISSION_DENIED",
+        "message": f"{api} has not been used in project p before or it is disabled.",
+        "details": [{"reason": "SERVICE_DISABLED"}],
+    }})
+
+
+def test_errors_carry_status_for_rate_limiting(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_DISABLED", "1")
+    session = _Session([_Response(429, {"error": {"status": "RESOURCE_EXHAUSTED", "message": "Quota exceeded"}}),
+                        _Response(404, {"error": {"status": "NOT_FOUND", "message": "gone"}})])
+    monkeypatch.setattr(gcp_client, "_session", session)
+    with pytest.raises(GoogleAPIError) as err:
+        gcp_client.request("GET", "https://pubsub.googleapis.com/v1/projects/p/topics/t")
+    assert str(err.value) == "429 RESOURCE_EXHAUSTED: Quota exceeded"
+    assert gcp_client.get_json("https://pubsub.googleapis.com/v1/projects/p/topics/t", missing_ok=True) is None
+
+
+def test_throttled_requests_are_retried_alone(monkeypatch):
+    from cloud_orchestrator.agents.common import rate_limit
+
+    monkeypatch.setattr(rate_limit, "BACKOFF_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(rate_limit, "_limiters", {})
+    throttled = _Response(429, {"error": {"status": "RESOURCE_EXHAUSTED", "message": "slow down"}})
+    session = _Session([throttled, throttled, _Response(200, {"name": "t"})])
+    monkeypatch.setattr(gcp_client, "_session", session)
+    assert gcp_client.request("PUT", "https://pubsub.googleapis.com/v1/projects/p/topics/t") == {"name": "t"}
+    assert len(session.calls) == 3
+    assert rate_limit.limiter_stats()["pubsub.googleapis.com"]["retries"] == 2
+
+
+def test_disabled_api_is_enabled_once_and_retried(monkeypatch):
+    session = _Session([_disabled("pubsub.googleapis.com"), _Response(200, {"name": "projects/p/topics/t"})])
+    monkeypatch.setattr(gcp_client, "_session", session)
+    enabled = []
+    monkeypatch.setattr(gcp_client, "enable_api", lambda project, api: enabled.append((project, api)))
+
+    result = gcp_client.request("PUT", "https://pubsub.googleapis.com/v1/projects/p/topics/t", project_id="p")
+    assert result == {"name": "projects/p/topics/t"}
+    assert enabled == [("p", "pubsub.googleapis.com")]
+    assert len(session.calls) == 2
+
+    # without a project there is nothing to enable, so the 403 surfaces
+    monkeypatch.setattr(gcp_client, "_session", _Session([_disabled("pubsub.googleapis.com")]))
+    with pytest.raises(GoogleAPIError) as err:
+        gcp_client.request("PUT", "https://pubsub.googleapis.com/v1/projects/p/topics/t")
+    assert err.value.service_disabled
@@ -0,0 +1,39 @@
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from cloud_orchestrator.agents.common.intent_router import IntentRouter
+from cloud_orchestrator.agents.planner_agent.agent import cloud_router, direct_agent
+
+router = IntentRouter({
+    "cloud_auth_setup": [(r"\b(cloud|gcp) setup\b", 3), (r"\bgcloud auth\b", 3)],
+    "guard_agent_v1": [(r"\b(budget|quotas?)\b", 3)],
+    "planner_agent_v1": [(r"\b(deploy|create)\b", 1), (r"\b(bucket|cluster|topic)s?\b", 2)],
+})
+
+
+def _request(*contents):
+    request = LlmRequest(contents=list(contents))
+    request.tools_dict["transfer_to_agent"] = object()
+    return request
+
+
+def test_classify_routes_clear_requests_and_defers_ambiguous_ones():
+    assert router.classify("Let's do the GCP setup") == "cloud_auth_setup"
+    assert router.classify("Create a bucket and a Pub/Sub topic") == "planner_agent_v1"
+    assert router.classify("Is my budget OK?") == "guard_agent_v1"
+    assert router.classify("Deploy a cluster if the quota allows it") is None  # 3 vs 3
+    assert router.classify("What's the capital of France?") is None
+
+
+def test_callback_answers_with_transfer_call():
+    user = types.Content(role="user", parts=[types.Part(text="Set up a BigQuery dataset and a GCS bucket")])
+    response = cloud_router.before_model_callback(None, _request(user))
+    call = response.content.parts[0].function_call
+    assert (call.name, call.args) == ("transfer_to_agent", {"agent_name": direct_agent.name})
+
+    general = types.Content(role="user", parts=[types.Part(text="Explain Python decorators")])
+    assert cloud_router.before_model_callback(None, _request(general)) is None
+
+    tool_reply = types.Content(role="user", parts=[types.Part(
+        function_response=types.FunctionResponse(name="transfer_to_agent", response={}))])
+    assert cloud_router.before_model_callback(None, _request(user, tool_reply)) is None
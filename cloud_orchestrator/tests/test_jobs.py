@@ -0,0 +1,47 @@
+import threading
+import time
+
+import pytest
+
+from cloud_orchestrator.agents.execution.jobs import FAILED, SUCCEEDED, JobQueue, QueueFull
+
+
+def _wait(queue, job_id, timeout=2.0):
+    deadline = time.time() + timeout
+    while queue.get(job_id).finished_at is None and time.time() < deadline:
+        time.sleep(0.01)
+    return queue.get(job_id)
+
+
+def test_jobs_run_in_background_and_report_progress():
+    def plan(payload, report):
+        report("intent", {"goal": payload["prompt"]})
+        return {"tool_calls": [{"action": "pubsub.create_topic"}]}
+
+    def broken(payload, report):
+        raise RuntimeError("quota exceeded")
+
+    queue = JobQueue({"plan": plan, "execute": broken}, queue_size=4, workers=2)
+    ok = _wait(queue, queue.submit("plan", {"prompt": "topic"}).id)
+    assert ok.status == SUCCEEDED
+    assert ok.result["tool_calls"][0]["action"] == "pubsub.create_topic"
+    assert ok.to_dict()["progress"][0]["event"] == "intent"
+
+    failed = _wait(queue, queue.submit("execute", {}).id)
+    assert (failed.status, failed.error) == (FAILED, "quota exceeded")
+    with pytest.raises(ValueError):
+        queue.submit("deploy", {})
+
+
+def test_full_queue_rejects_instead_of_waiting():
+    release = threading.Event()
+    queue = JobQueue({"plan": lambda payload, report: release.wait(2)}, queue_size=2, workers=1)
+    first = queue.submit("plan", {})
+    while queue.get(first.id).started_at is None:
+        time.sleep(0.01)
+    queue.submit("plan", {})
+    queue.submit("plan", {})
+    with pytest.raises(QueueFull):
+        queue.submit("plan", {})
+    assert queue.stats()["queued"] == 2 and queue.stats()["running"] == 1
+    release.set()
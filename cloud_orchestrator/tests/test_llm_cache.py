@@ -0,0 +1,46 @@
+import time
+
+from cloud_orchestrator.agents.planner_agent.tools.llm_cache import LLMCache
+
+
+def test_memory_and_disk_hits(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = LLMCache(path=path)
+    assert cache.get("gemini-2.5-flash", "create a bucket") is None
+
+    cache.set("gemini-2.5-flash", "create a bucket", "[{'action': 'storage.create_bucket'}]")
+    # whitespace differences share the same entry, case differences do not
+    assert cache.get("gemini-2.5-flash", "  create   a bucket ") is not None
+    assert cache.get("gemini-2.5-flash", "create a Bucket") is None
+    # other models do not
+    assert cache.get("gemini-2.0-flash", "create a bucket") is None
+
+    reopened = LLMCache(path=path)
+    assert reopened.get("gemini-2.5-flash", "create a bucket") == "[{'action': 'storage.create_bucket'}]"
+    stats = reopened.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 0
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite3"), ttl_seconds=0.05,
+                     max_memory_entries=2, max_disk_entries=3)
+    cache.set("m", "a", "1")
+    time.sleep(0.1)
+    assert cache.get("m", "a") is None
+
+    cache.ttl_seconds = 60
+    for prompt in ("p1", "p2", "p3", "p4"):
+        cache.set("m", prompt, prompt)
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2
+    assert stats["disk_entries"] == 3
+    assert cache.get("m", "p1") is None
+    assert cache.get("m", "p4") == "p4"
+
+
+def test_delete_and_memory_only():
+    cache = LLMCache(path=None)
+    cache.set("m", "prompt", "bad response")
+    cache.delete("m", "prompt")
+    assert cache.get("m", "prompt") is None
+    assert cache.stats()["hit_ratio"] == 0.0
@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+from cloud_orchestrator.agents.common.lro import LROPoller, OperationFailed, OperationTimeout
+
+
+def _countdown(polls_until_done, value="DONE"):
+    calls = []
+
+    def check():
+        calls.append(threading.current_thread().name)
+        return len(calls) >= polls_until_done, value if len(calls) >= polls_until_done else "RUNNING"
+    return check, calls
+
+
+def test_many_operations_share_one_loop():
+    poller = LROPoller()
+    checks = [_countdown(3, value=i) for i in range(20)]
+    futures = [poller.watch(check, name=f"op{i}", initial_delay=0.01, max_delay=0.02)[1]
+               for i, (check, _) in enumerate(checks)]
+    assert [f.result(timeout=5) for f in futures] == list(range(20))
+    assert all(len(calls) == 3 for _, calls in checks)
+    # checks run on the small shared pool, never on one thread per operation
+    assert {name for _, calls in checks for name in calls} <= {f"lro-check_{i}" for i in range(4)}
+
+
+def test_failure_timeout_and_transient_errors():
+    poller = LROPoller()
+
+    def failing():
+        raise OperationFailed("quota exceeded")
+    op_id, future = poller.watch(failing, name="fail", initial_delay=0.01)
+    with pytest.raises(OperationFailed):
+        future.result(timeout=5)
+    assert poller.status(op_id)["state"] == "FAILED"
+
+    _, never = poller.watch(lambda: (False, "RUNNING"), name="slow", initial_delay=0.01, timeout=0.1)
+    with pytest.raises(OperationTimeout):
+        never.result(timeout=5)
+
+    blips = {"n": 0}
+
+    def flaky():
+        blips["n"] += 1
+        if blips["n"] < 3:
+            raise ConnectionError("reset")
+        return True, "ok"
+    done = []
+    _, future = poller.watch(flaky, name="flaky", initial_delay=0.01, on_done=done.append)
+    assert future.result(timeout=5) == "ok"
+    assert done == [future]
+
@@ -0,0 +1,48 @@
+import pytest
+
+from cloud_orchestrator.agents.common import metrics
+from cloud_orchestrator.agents.common.rate_limit import limited, rate_limited
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.Registry()
+    latency = registry.histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        latency.observe(value, stage="llm")
+    text = registry.render()
+    assert 'demo_seconds_bucket{stage="llm",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="llm",le="1"} 2' in text
+    assert 'demo_seconds_bucket{stage="llm",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="llm"} 3' in text
+
+
+def test_instrumented_tools_record_latency_errors_and_in_flight():
+    @rate_limited("test.googleapis.com")
+    def flaky_tool(fail: bool) -> dict:
+        if fail:
+            return {"status": "error", "message": "❌ nope"}
+        return {"status": "success"}
+
+    labels = {"stage": "tool", "name": "flaky_tool"}
+    before = metrics.STAGE_SECONDS.count(**labels)
+    flaky_tool(False)
+    flaky_tool(True)
+    assert metrics.STAGE_SECONDS.count(**labels) == before + 2
+    assert metrics.STAGE_ERRORS.value(**labels) >= 1
+    assert metrics.STAGE_IN_FLIGHT.value(**labels) == 0
+
+    with pytest.raises(ValueError):
+        with metrics.track("llm", "test-model"):
+            raise ValueError("boom")
+    assert metrics.STAGE_ERRORS.value(stage="llm", name="test-model") >= 1
+    limited("test.googleapis.com", lambda: None)
+    assert 'cloud_orchestrator_rate_limit_calls_total{service="test.googleapis.com"}' in metrics.render()
+
+
+def test_cache_collector_reports_hit_ratio():
+    registry = metrics.Registry()
+    registry.add_collector("caches", metrics.cache_collector(lambda: {"llm_response": (3, 1)}))
+    registry.add_collector("broken", lambda: iter([1 / 0]))
+    text = registry.render()
+    assert 'cloud_orchestrator_cache_hit_ratio{cache="llm_response"} 0.75' in text
+    assert 'cloud_orchestrator_cache_misses_total{cache="llm_response"} 1' in text
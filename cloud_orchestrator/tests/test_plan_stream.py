@@ -0,0 +1,32 @@
+from cloud_orchestrator.agents.planner_agent.tools.plan_stream import ToolCallStreamParser, iter_tool_calls
+
+RESPONSE = """```python
+[
+  {"action": "iam.create_sa", "params": {"project_id": "my-project", "display_name": "SA {x}"}},
+  {"action": "dataflow.launch_flex_template", "params": {
+    "project_id": "my-project", "parameters": {"inputTopic": "projects/p/topics/events]"}
+  }},
+  {'action': 'bigquery.create_dataset', 'params': {'project_id': None, 'dataset_id': 'it\\'s'}}
+]
+```"""
+
+
+def test_yields_each_call_as_soon_as_it_closes():
+    parser = ToolCallStreamParser()
+    first_close = RESPONSE.index("}},") + 2
+    assert parser.feed(RESPONSE[:first_close - 1]) == []
+    calls = parser.feed(RESPONSE[first_close - 1:first_close])
+    assert [c["action"] for c in calls] == ["iam.create_sa"]
+    assert calls[0]["params"]["display_name"] == "SA {x}"
+    assert not parser.complete
+
+    rest = parser.feed(RESPONSE[first_close:])
+    assert [c["action"] for c in rest] == ["dataflow.launch_flex_template", "bigquery.create_dataset"]
+    assert rest[1]["params"]["dataset_id"] == "it's"
+    assert parser.complete and not parser.errors
+
+
+def test_single_character_chunks():
+    calls = list(iter_tool_calls(iter(RESPONSE)))
+    assert len(calls) == 3
+    assert calls[1]["params"]["parameters"]["inputTopic"] == "projects/p/topics/events]"
@@ -0,0 +1,85 @@
+import threading
+import time
+
+from cloud_orchestrator.agents.planner_agent.tools import planner_tool
+from cloud_orchestrator.agents.planner_agent.tools.project_index import ProjectRecord, ProjectIndex
+
+
+def _projects(n=0):
+    named = [
+        ProjectRecord("acme-data-prod", "Acme Data Prod", "1", "ACTIVE", {"env": "prod", "team": "data"}),
+        ProjectRecord("acme-data-dev", "Acme Data Dev", "2", "ACTIVE", {"env": "dev", "team": "data"}),
+        ProjectRecord("billing-core", "Billing Core", "3", "ACTIVE", {"env": "prod"}),
+    ]
+    return named + [ProjectRecord(f"sandbox-{i:04d}", f"Sandbox {i}", str(10 + i), "ACTIVE", {}) for i in range(n)]
+
+
+def _ids(page):
+    return [p["project_id"] for p in page["projects"]]
+
+
+def test_search_ranks_filters_and_pages():
+    index = ProjectIndex(loader=lambda: _projects(50))
+    assert _ids(index.search("billing-core"))[0] == "billing-core"
+    assert _ids(index.search("acme data"))[:2] == ["acme-data-dev", "acme-data-prod"]  # name prefix
+    assert _ids(index.search("core")) == ["billing-core"]  # word prefix
+    assert _ids(index.search("bilingcore")) == ["billing-core"]  # fuzzy
+    assert _ids(index.search("", "env=prod,team")) == ["acme-data-prod"]
+
+    first = index.search("sandbox", page_size=20)
+    assert (first["total_matches"], len(first["projects"]), first["next_page_token"]) == (50, 20, "20")
+    last = index.search("sandbox", page_size=20, page_token="40")
+    assert len(last["projects"]) == 10 and last["next_page_token"] == ""
+
+
+def test_stale_index_is_served_while_refreshing():
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return _projects(len(loads))
+
+    index = ProjectIndex(ttl=0.05, loader=loader)
+    assert index.search()["total_projects"] == 4
+    time.sleep(0.1)
+    assert index.search()["total_projects"] == 4  # stale answer, refresh started
+    for _ in range(50):
+        if index.search()["total_projects"] == 5:
+            break
+        time.sleep(0.01)
+    assert index.search()["total_projects"] == 5
+
+
+def test_invalidate_discards_a_refresh_already_in_flight():
+    projects = _projects()
+    fetching, release = threading.Event(), threading.Event()
+
+    def loader():
+        listed = list(projects)
+        if index._snapshot is not None:  # the background refresh: hold it until the project exists
+            fetching.set()
+            release.wait(2)
+        return listed
+
+    index = ProjectIndex(ttl=0.05, loader=loader)
+    index.search()
+    time.sleep(0.1)
+    index.search()  # stale, starts the background refresh
+    assert fetching.wait(2)
+
+    projects.append(ProjectRecord("fresh-project", "Fresh Project", "99", "ACTIVE", {}))
+    index.invalidate()
+    assert _ids(index.search("fresh-project")) == ["fresh-project"]
+    release.set()
+    while index._refreshing:
+        time.sleep(0.01)
+    assert _ids(index.search("fresh-project")) == ["fresh-project"]  # the older list was dropped
+
+
+def test_list_gcp_projects_returns_one_page(monkeypatch):
+    index = ProjectIndex(loader=lambda: _projects(200))
+    monkeypatch.setattr(planner_tool, "get_project_index", lambda: index)
+    result = planner_tool.list_gcp_projects.func("acme", page_size=5)
+    assert result["status"] == "success"
+    assert _ids(result) == ["acme-data-dev", "acme-data-prod"]
+    assert result["total_projects"] == 203
@@ -0,0 +1,107 @@
+import subprocess
+import threading
+import time
+
+from cloud_orchestrator.agents.common import rate_limit
+from cloud_orchestrator.agents.common.gcp_client import GoogleAPIError
+from cloud_orchestrator.agents.common.rate_limit import (
+    ServiceLimiter, TokenBucket, is_throttled, rate_limited, run_limited,
+)
+
+
+def test_only_rejected_requests_count_as_throttled():
+    def failed(stderr):
+        return subprocess.CompletedProcess(["gcloud"], 1, stdout="", stderr=stderr)
+
+    assert is_throttled(failed("ERROR: (gcloud.pubsub.topics.create) HTTPError 429: Too Many Requests"))
+    assert is_throttled(subprocess.CalledProcessError(1, ["gcloud"], stderr="RESOURCE_EXHAUSTED: slow down"))
+    assert is_throttled(GoogleAPIError(429, "RESOURCE_EXHAUSTED", "Quota exceeded"))
+    assert is_throttled(GoogleAPIError(403, "PERMISSION_DENIED", "Rate", ["rateLimitExceeded"]))
+    # Successful output and tool results are never inspected
+    assert not is_throttled(subprocess.CompletedProcess(["gcloud"], 0, stdout="Created [vm-429].", stderr=""))
+    assert not is_throttled({"status": "error", "error": "HttpError 429 Too Many Requests"})
+    assert not is_throttled(failed("ERROR: Quota 'CPUS' exceeded. Limit: 8.0 in region us-central1."))
+    assert not is_throttled(failed("ERROR: instance vm-429 already exists"))
+
+
+def test_bucket_and_semaphore_bound_bursts():
+    limiter = ServiceLimiter("test.googleapis.com", rate=20, burst=2, concurrency=2)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def call():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return {"status": "success"}
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=limiter.call, args=(call,)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] <= 2
+    # 2 burst tokens, then 4 more at 20/s
+    assert time.monotonic() - start >= 0.18
+    assert limiter.stats["calls"] == 6
+
+
+def test_only_the_throttled_command_is_retried(monkeypatch):
+    monkeypatch.setattr(rate_limit, "BACKOFF_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(rate_limit, "_limiters", {})
+    commands = []
+
+    def run(cmd, **kwargs):
+        commands.append(cmd[2])
+        if cmd[2] == "versions" and commands.count("versions") < 3:
+            raise subprocess.CalledProcessError(1, cmd, stderr="ERROR: HTTPError 429: Too Many Requests")
+        return subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+
+    monkeypatch.setattr(subprocess, "run", run)
+
+    @rate_limited("retry.googleapis.com")
+    def create_secret(project_id: str, secret_id: str) -> dict:
+        """Create a secret and add its first version."""
+        run_limited(["gcloud", "secrets", "create", secret_id], check=True)
+        run_limited(["gcloud", "secrets", "versions", "add", secret_id], check=True)
+        return {"status": "success"}
+
+    assert create_secret("p", secret_id="s") == {"status": "success"}
+    # The create ran once; only the throttled version add was repeated
+    assert commands == ["create", "versions", "versions", "versions"]
+    assert create_secret.__name__ == "create_secret" and create_secret.__doc__ == "Create a secret and add its first version."
+    assert rate_limit.limiter_stats()["retry.googleapis.com"]["throttled"] == 2
+
+
+def test_waiting_tools_hold_no_limiter_slot(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_limiters", {"slow.googleapis.com": ServiceLimiter("slow.googleapis.com", 100, 10, 1)})
+    monkeypatch.setattr(subprocess, "run", lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 0, "", ""))
+    released = threading.Event()
+
+    @rate_limited("slow.googleapis.com")
+    def delete_cluster() -> dict:
+        run_limited(["gcloud", "container", "clusters", "delete", "--async"])
+        released.wait(5)  # stands in for the LRO wait
+        return {"status": "success"}
+
+    @rate_limited("slow.googleapis.com")
+    def list_clusters() -> dict:
+        return {"status": "success", "done": run_limited(["gcloud", "container", "clusters", "list"]).returncode == 0}
+
+    waiter = threading.Thread(target=delete_cluster)
+    waiter.start()
+    try:
+        start = time.monotonic()
+        assert list_clusters()["done"] and time.monotonic() - start < 1
+    finally:
+        released.set()
+        waiter.join()
+
+
+def test_paused_bucket_delays_other_callers():
+    bucket = TokenBucket(rate=100, burst=5)
+    bucket.pause(0.1)
+    assert bucket.acquire() >= 0.05
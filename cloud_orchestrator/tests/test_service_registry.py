@@ -0,0 +1,57 @@
+from cloud_orchestrator.agents.common import service_registry
+from cloud_orchestrator.agents.common.service_registry import ServiceRegistry, apis_by_project
+
+
+class _FakeRegistry(ServiceRegistry):
+    def __init__(self, enabled, **kwargs):
+        super().__init__(**kwargs)
+        self.remote = set(enabled)
+        self.list_calls = 0
+        self.batches = []
+
+    def _list_enabled(self, project_id):
+        self.list_calls += 1
+        return set(self.remote)
+
+    def enable(self, project_id, apis):
+        self.batches.append(sorted(apis))
+        self.remote.update(apis)
+        cached = self._enabled.get(project_id)
+        if cached:
+            cached[0].update(apis)
+
+
+def test_enabled_list_is_cached_and_only_missing_apis_are_enabled():
+    registry = _FakeRegistry({"pubsub.googleapis.com"})
+    assert registry.ensure_enabled("p", ["pubsub.googleapis.com"]) == []
+    assert registry.ensure_enabled("p", ["bigquery.googleapis.com", "dataflow.googleapis.com",
+                                         "pubsub.googleapis.com"]) == ["bigquery.googleapis.com",
+                                                                       "dataflow.googleapis.com"]
+    assert registry.ensure_enabled("p", ["bigquery.googleapis.com"]) == []
+    assert registry.batches == [["bigquery.googleapis.com", "dataflow.googleapis.com"]]
+    assert registry.list_calls == 1
+
+    registry.ttl = 0
+    registry.is_enabled("p", "pubsub.googleapis.com")
+    assert registry.list_calls == 2
+
+
+def test_plan_apis_are_grouped_per_project_in_one_batch(monkeypatch):
+    registry = _FakeRegistry(set())
+    monkeypatch.setattr(service_registry, "_registry", registry)
+    plan = [
+        {"action": "pubsub.create_topic", "params": {"project_id": "p1"}},
+        {"action": "bigquery.create_dataset", "params": {"project_id": "p1"}},
+        {"action": "bigquery.create_table", "params": {"project_id": "p1"}},
+        {"action": "gke.create_cluster", "params": {"project_id": "p2"}},
+        {"action": "unknown.thing", "params": {"project_id": "p2"}},
+        {"action": "pubsub.publish", "params": {}},
+    ]
+    assert apis_by_project(plan) == {
+        "p1": {"pubsub.googleapis.com", "bigquery.googleapis.com"},
+        "p2": {"container.googleapis.com"},
+    }
+    result = service_registry.enable_apis_for_plan(plan)
+    assert result["status"] == "success"
+    assert sorted(registry.batches) == [["bigquery.googleapis.com", "pubsub.googleapis.com"],
+                                        ["container.googleapis.com"]]
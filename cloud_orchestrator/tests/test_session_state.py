@@ -0,0 +1,75 @@
+import json
+import subprocess
+from types import SimpleNamespace
+
+from google.adk.sessions.state import State
+
+from cloud_orchestrator.agents.common.session_state import gcloud_account
+from cloud_orchestrator.agents.planner_agent.tools import planner_tool
+
+
+def _gcloud_config(tmp_path, monkeypatch, account, name="work"):
+    """Point gcloud's config dir at tmp_path with `account` set in configuration `name`."""
+    monkeypatch.setenv("CLOUDSDK_CONFIG", str(tmp_path))
+    monkeypatch.delenv("CLOUDSDK_CORE_ACCOUNT", raising=False)
+    monkeypatch.delenv("CLOUDSDK_ACTIVE_CONFIG_NAME", raising=False)
+    (tmp_path / "configurations").mkdir(exist_ok=True)
+    (tmp_path / "active_config").write_text(name)
+    core = f"account = {account}\n" if account else ""
+    (tmp_path / "configurations" / f"config_{name}").write_text(f"[core]\n{core}project = alpha\n")
+
+
+def _fake_gcloud(monkeypatch):
+    calls = []
+
+    def run(cmd, **kwargs):
+        calls.append(cmd[1:3])
+        account = gcloud_account()
+        out = json.dumps([{"account": account}] if account else []) if cmd[1:3] == ["auth", "list"] else ""
+        return subprocess.CompletedProcess(cmd, 0, stdout=out, stderr="")
+
+    monkeypatch.setattr(subprocess, "run", run)
+    return calls
+
+
+def test_cached_account_skips_gcloud_while_config_still_names_it(tmp_path, monkeypatch):
+    _gcloud_config(tmp_path, monkeypatch, "dev@example.com")
+    calls = _fake_gcloud(monkeypatch)
+    context = SimpleNamespace(state=State({}, {}))
+
+    for _ in range(2):
+        assert planner_tool.check_gcloud_auth.func(tool_context=context)["account"] == "dev@example.com"
+        assert planner_tool.set_active_project.func("alpha")["status"] == "success"
+    assert calls == [["auth", "list"], ["config", "set"], ["config", "set"]]
+
+    # Outside a session nothing is cached
+    planner_tool.check_gcloud_auth.func()
+    planner_tool.check_gcloud_auth.func()
+    assert calls[-2:] == [["auth", "list"], ["auth", "list"]]
+
+
+def test_cached_account_is_dropped_after_revoke_or_switch(tmp_path, monkeypatch):
+    _gcloud_config(tmp_path, monkeypatch, "dev@example.com")
+    calls = _fake_gcloud(monkeypatch)
+    context = SimpleNamespace(state=State({}, {}))
+    planner_tool.check_gcloud_auth.func(tool_context=context)
+
+    _gcloud_config(tmp_path, monkeypatch, "ops@example.com", name="ops")
+    assert planner_tool.check_gcloud_auth.func(tool_context=context)["account"] == "ops@example.com"
+    _gcloud_config(tmp_path, monkeypatch, None, name="ops")
+    assert planner_tool.check_gcloud_auth.func(tool_context=context)["authenticated"] is False
+    assert context.state["gcp_account"] == ""
+    assert calls.count(["auth", "list"]) == 3
+
+    monkeypatch.setenv("CLOUDSDK_CORE_ACCOUNT", "ci@example.com")
+    assert gcloud_account() == "ci@example.com"
+
+
+def test_expired_entries_are_refetched(tmp_path, monkeypatch):
+    _gcloud_config(tmp_path, monkeypatch, "dev@example.com")
+    calls = _fake_gcloud(monkeypatch)
+    context = SimpleNamespace(state=State({}, {}))
+    planner_tool.check_gcloud_auth.func(tool_context=context)
+    context.state["gcp_account_cached_at"] -= planner_tool.AUTH_STATE_TTL_SECONDS + 1
+    planner_tool.check_gcloud_auth.func(tool_context=context)
+    assert calls.count(["auth", "list"]) == 2
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from cloud_orchestrator.agents.common.single_flight import SingleFlight
+from cloud_orchestrator.agents.planner_agent.tools import planner_tool
+
+
+def _concurrently(n, target):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(target())) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    runs = []
+
+    def plan():
+        runs.append(1)
+        time.sleep(0.1)
+        return ["pubsub.create_topic"]
+
+    assert _concurrently(8, lambda: flight.do("key", plan)) == [["pubsub.create_topic"]] * 8
+    assert len(runs) == 1
+    assert flight.stats() == {"executions": 1, "shared": 7, "in_flight": 0}
+    flight.do("key", plan)
+    assert len(runs) == 2  # nothing is cached once the call finished
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", lambda: (_ for _ in ()).throw(RuntimeError("quota")))
+
+
+def test_streams_are_replayed_to_late_subscribers():
+    flight = SingleFlight()
+    runs = []
+
+    def events():
+        runs.append(1)
+        for step in range(3):
+            time.sleep(0.05)
+            yield step
+
+    first = flight.stream("key", events)
+    assert next(first) == 0
+    assert list(flight.stream("key", events)) == [0, 1, 2]
+    assert list(first) == [1, 2]
+    assert len(runs) == 1
+
+
+def test_call_llm_coalesces_whitespace_variants_only(monkeypatch):
+    calls = []
+
+    class Models:
+        def generate_content(self, model, contents):
+            calls.append(contents)
+            time.sleep(0.1)
+            return type("Response", (), {"text": " plan "})()
+
+    monkeypatch.setattr(planner_tool, "get_client", lambda: type("Client", (), {"models": Models()})())
+    prompts = iter(["Build  a pipeline", " Build a pipeline", "Build a pipeline ", "Build a\tpipeline"])
+    results = _concurrently(4, lambda: planner_tool.call_llm(next(prompts), use_cache=False))
+    assert results == ["plan"] * 4
+    assert len(calls) == 1
+
+    # Case is significant (resource names), so these run separately
+    prompts = iter(["create topic Orders", "create topic orders"])
+    _concurrently(2, lambda: planner_tool.call_llm(next(prompts), use_cache=False))
+    assert sorted(calls[1:]) == ["create topic Orders", "create topic orders"]
+    assert planner_tool.plan_key(" Build a  Pipeline", "p ") == ("Build a Pipeline", "p")
@@ -0,0 +1,33 @@
+from cloud_orchestrator.agents.guard_agent.tools.machine_types import machine_shape
+from cloud_orchestrator.agents.planner_agent.tools.usage_estimator import estimate_usage
+
+
+def test_machine_catalog_shapes():
+    assert machine_shape("n2-highmem-8")[1:4] == ("n2", 8, 64)
+    assert machine_shape("n2-highmem-8").cpu_metric == "n2_cpus"
+    assert machine_shape("e2-micro").vcpus == 2 and machine_shape("e2-micro").cpu_metric == "cpus"
+    assert machine_shape("custom-4-16384").memory_gb == 16
+    a2 = machine_shape("a2-highgpu-2g")
+    assert (a2.vcpus, a2.gpus, a2.gpu_metric) == (24, 2, "nvidia_a100_gpus")
+    assert machine_shape("zz-unknown-4") is None
+
+
+def test_usage_follows_params_and_real_regions():
+    estimate = estimate_usage([
+        {"action": "compute.create_vm", "params": {"zone": "europe-west4-b", "machine_type": "n2-standard-8"}},
+        {"action": "compute.create_vm", "params": {"zone": "us-east1-c"}},
+        {"action": "dataflow.launch_flex_template", "params": {
+            "region": "europe-west4", "parameters": {"maxNumWorkers": "5", "workerMachineType": "n1-standard-4"}}},
+        {"action": "pubsub.create_topic", "params": {"topic_id": "t"}},
+        {"action": "cloudrun.deploy_service", "params": {"region": "asia-east1"}},
+    ])
+    usage = estimate["planned_usage"]
+    compute = usage["compute.googleapis.com"]
+    assert compute["europe-west4"] == {"n2_cpus": 8, "instances": 6, "disks_total_storage": 1260, "cpus": 20}
+    assert compute["us-east1"]["cpus"] == 2
+    assert compute["global"]["cpus_all_regions"] == 30
+    assert usage["dataflow.googleapis.com"]["europe-west4"] == {"jobs": 1}
+    assert usage["run.googleapis.com"]["asia-east1"] == {"services": 1, "revisions": 1}
+    assert "us-central1" not in str(usage)
+    assert estimate["totals"]["europe-west4"]["memory_gb"] == 32 + 5 * 15
+    assert [c["source"] for c in estimate["calls"]] == ["params", "params", "params", "static", "static"]